@@ -0,0 +1,13 @@
+"""End-to-end benchmarks against stand-in system tools.
+
+Run from python-src:
+
+    python -m bench run -o before.json
+    python -m bench run -o after.json
+    python -m bench compare before.json after.json
+
+Each scenario runs in a fresh interpreter with fake checkupdates, yay,
+pacman, pactree, tailscale and ssh first on PATH and HOME in a scratch
+directory. Results record wall time, peak RSS and the number of
+subprocesses started.
+"""
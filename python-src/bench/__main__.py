@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import fields
+from pathlib import Path
+
+from bench.fakes import TOOLS, FakeTools
+from bench.fixtures import FixtureSpec, generate
+from bench.scenarios import SCENARIOS, Context
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+# Metrics where a higher value in the new run is a regression
+_COMPARED = ("peak_rss_kib", "subprocesses")
+
+
+def _git_revision() -> str:
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=SRC_DIR, timeout=10,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, cwd=SRC_DIR, timeout=10,
+        ).stdout.strip()
+    except Exception:
+        return ""
+    return f"{rev}-dirty" if rev and dirty else rev
+
+
+def _parse_settings(items: list[str]) -> list[tuple[str, str, object]]:
+    """'ssh.latency=0.2' -> ('ssh', 'latency', 0.2)."""
+    parsed = []
+    for item in items:
+        key, _, value = item.partition("=")
+        tool, _, setting = key.partition(".")
+        if tool not in TOOLS or not setting or not value:
+            raise SystemExit(f"bad --set value: {item!r} (expected tool.setting=value)")
+        try:
+            parsed.append((tool, setting, json.loads(value)))
+        except ValueError:
+            parsed.append((tool, setting, value))
+    return parsed
+
+
+def _run_child(args: argparse.Namespace) -> int:
+    """Run one scenario in this process and print its metrics as JSON."""
+    scenario = SCENARIOS[args.name]
+    config = json.loads(Path(os.environ["BENCH_FAKE_CONFIG"]).read_text())
+    call_log = Path(config["call_log"])
+    ctx = Context(fixtures=Path(config["fixtures"]), rows=args.rows, cycles=args.cycles)
+
+    app = None
+    if scenario.gui:
+        from PyQt6.QtWidgets import QApplication
+
+        app = QApplication(sys.argv[:1])
+
+    walls = []
+    calls: dict[str, int] = {}
+    metrics: dict = {}
+    for _ in range(args.repeat):
+        call_log.write_text("")
+        metrics = scenario.run(ctx)
+        walls.append(metrics.pop("wall_seconds"))
+        for tool in call_log.read_text().split():
+            calls[tool] = calls.get(tool, 0) + 1
+
+    result = {
+        "wall_seconds": statistics.median(walls),
+        "wall_min": min(walls),
+        "runs": walls,
+        # Linux reports kilobytes
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "subprocesses": sum(calls.values()) / args.repeat,
+        "subprocesses_by_tool": {t: n / args.repeat for t, n in sorted(calls.items())},
+        **metrics,
+    }
+    del app
+    print(json.dumps(result))
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    names = args.scenario or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(unknown)}")
+
+    spec = FixtureSpec(
+        packages=args.packages, aur=args.aur, hosts=args.hosts,
+        per_host=args.per_host, flatpaks=args.flatpaks, firmware=args.firmware, seed=args.seed,
+    )
+    workdir = Path(tempfile.mkdtemp(prefix="yay-sys-tray-bench-"))
+    fakes = FakeTools(workdir, generate(workdir / "fixtures", spec), seed=args.seed)
+    for tool, setting, value in _parse_settings(args.set):
+        fakes.set(tool, **{setting: value})
+    for item in args.record:
+        tool, _, path = item.partition("=")
+        fakes.record(tool, Path(path).resolve())
+    fakes.install()
+
+    env = fakes.env()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "rows": args.rows,
+            "cycles": args.cycles,
+            "fixtures": {f.name: getattr(spec, f.name) for f in fields(spec)},
+            "tools": fakes.settings,
+        },
+        "results": {},
+    }
+    try:
+        for name in names:
+            proc = subprocess.run(
+                [
+                    sys.executable, "-m", "bench", "_scenario", name,
+                    "--rows", str(args.rows), "--repeat", str(args.repeat),
+                    "--cycles", str(args.cycles),
+                ],
+                capture_output=True, text=True, cwd=SRC_DIR, env=env,
+            )
+            lines = proc.stdout.strip().splitlines()
+            if proc.returncode != 0 or not lines:
+                print(f"{name}: failed\n{proc.stderr.strip()}", file=sys.stderr)
+                report["results"][name] = {"failed": proc.stderr.strip()[-2000:]}
+                continue
+            result = json.loads(lines[-1])
+            report["results"][name] = result
+            print(
+                f"{name:24} {result['wall_seconds'] * 1000:10.1f} ms"
+                f" {result['peak_rss_kib'] / 1024:8.1f} MiB"
+                f" {result['subprocesses']:6.0f} proc"
+            )
+    finally:
+        if not args.keep:
+            fakes.cleanup()
+        else:
+            print(f"work directory kept: {workdir}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"results written to {args.output}")
+    return 1 if any("failed" in r for r in report["results"].values()) else 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    print(
+        f"base {base['meta'].get('revision') or args.base}"
+        f"  ->  new {new['meta'].get('revision') or args.new}"
+    )
+    regressions = 0
+    for name, after in new["results"].items():
+        before = base["results"].get(name)
+        if before is None or "failed" in before or "failed" in after:
+            print(f"{name}: not comparable")
+            continue
+        for metric, value in after.items():
+            if not (metric.endswith("_seconds") or metric in _COMPARED):
+                continue
+            old = before.get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(value, (int, float)):
+                continue
+            # Sub-millisecond timings are noise
+            if metric.endswith("_seconds") and max(old, value) < 0.001:
+                continue
+            change = (value - old) / old if old else 0.0
+            flag = ""
+            if change > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif change < -args.threshold:
+                flag = "  improved"
+            if metric.endswith("_seconds"):
+                shown = f"{old * 1000:10.1f} ms -> {value * 1000:10.1f} ms"
+            else:
+                shown = f"{old:10.0f}    -> {value:10.0f}   "
+            print(f"{name:24} {metric:20} {shown} {change:+7.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench",
+        description="Benchmark yay-sys-tray against stand-in system tools.",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    run = sub.add_parser("run", help="run scenarios (default)")
+    run.add_argument("-s", "--scenario", action="append", help="scenario to run (repeatable)")
+    run.add_argument("-o", "--output", help="write results to this JSON file")
+    run.add_argument("--repeat", type=int, default=3, help="runs per scenario (median is reported)")
+    run.add_argument("--rows", type=int, default=10_000, help="rows for the parser and dialog scenarios")
+    run.add_argument("--cycles", type=int, default=2000, help="check cycles for the soak scenario")
+    run.add_argument("--packages", type=int, default=500, help="local repo updates")
+    run.add_argument("--aur", type=int, default=50, help="local AUR updates")
+    run.add_argument("--flatpaks", type=int, default=20, help="local Flatpak updates")
+    run.add_argument("--firmware", type=int, default=2, help="local firmware updates")
+    run.add_argument("--hosts", type=int, default=50, help="remote hosts")
+    run.add_argument("--per-host", type=int, default=200, help="updates per remote host")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument(
+        "--set", action="append", default=[], metavar="TOOL.SETTING=VALUE",
+        help="tool setting, e.g. ssh.latency=0.5 or checkupdates.exit=1 (repeatable)",
+    )
+    run.add_argument(
+        "--record", action="append", default=[], metavar="TOOL=FILE",
+        help="answer with recorded real output, e.g. checkupdates=out.txt (repeatable)",
+    )
+    run.add_argument("--keep", action="store_true", help="keep the work directory")
+
+    compare = sub.add_parser("compare", help="compare two result files")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    compare.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="relative increase reported as a regression (default 0.10)",
+    )
+
+    sub.add_parser("list", help="list scenarios")
+
+    child = sub.add_parser("_scenario")
+    child.add_argument("name", choices=list(SCENARIOS))
+    child.add_argument("--rows", type=int, default=10_000)
+    child.add_argument("--repeat", type=int, default=1)
+    child.add_argument("--cycles", type=int, default=2000)
+
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in (*sub.choices, "-h", "--help"):
+        argv = ["run", *argv]
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return _compare(args)
+    if args.command == "list":
+        for s in SCENARIOS.values():
+            print(f"{s.name:24} {s.description}")
+        return 0
+    if args.command == "_scenario":
+        return _run_child(args)
+    return _run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Stand-in for checkupdates, yay, pacman, pactree, tailscale, ssh, flatpak and fwupdmgr.
+
+Invoked as 'fake_tool.py <tool> [args...]' by the wrappers FakeTools puts on
+PATH. Output comes from the fixture directory; latency, exit code and
+failure rate come from the per-tool settings in $BENCH_FAKE_CONFIG. Every
+invocation is appended to the call log so the suite can count subprocesses.
+
+Only the standard library is used, to keep the start-up cost close to that
+of the real tools.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+
+def _out(text: str) -> None:
+    sys.stdout.write(text)
+
+
+def _fixture(config: dict, settings: dict, name: str) -> str:
+    path = settings.get("stdout_file") or Path(config["fixtures"]) / name
+    try:
+        return Path(path).read_text()
+    except OSError:
+        return ""
+
+
+def _load_db(config: dict) -> dict[str, dict]:
+    try:
+        return json.loads((Path(config["fixtures"]) / "syncdb.json").read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _pacman(config: dict, settings: dict, args: list[str]) -> int:
+    if not args:
+        return 1
+    op, names = args[0], [a for a in args[1:] if not a.startswith("-")]
+    db = _load_db(config)
+    missing = [n for n in names if n not in db]
+    if op == "-Si":
+        for n in names:
+            if n not in db or not db[n]["repository"]:
+                continue
+            r = db[n]
+            _out(
+                f"Repository      : {r['repository']}\n"
+                f"Name            : {n}\n"
+                f"Version         : {r['new']}\n"
+                f"Description     : {r['description']}\n"
+                f"Architecture    : x86_64\n"
+                f"Depends On      : {'  '.join(r['depends']) or 'None'}\n"
+                f"Download Size   : {r['size'] / 1048576:.2f} MiB\n\n"
+            )
+    elif op == "-Qi":
+        for n in names:
+            if n in db:
+                r = db[n]
+                _out(
+                    f"Name            : {n}\n"
+                    f"Version         : {r['old']}\n"
+                    f"Description     : {r['description']}\n\n"
+                )
+    elif op == "-Q":
+        for n in names:
+            if n in db:
+                _out(f"{n} {db[n]['old']}\n")
+    else:
+        return 0
+    for n in missing:
+        sys.stderr.write(f"error: package '{n}' was not found\n")
+    return 1 if missing else 0
+
+
+def _pactree(config: dict, settings: dict, args: list[str]) -> int:
+    names = [a for a in args if not a.startswith("-")]
+    db = _load_db(config)
+    if not names or names[0] not in db:
+        sys.stderr.write(f"error: package '{names[0] if names else ''}' not found\n")
+        return 1
+    if "-r" in args:
+        def children(n):
+            return [p for p, r in db.items() if n in r["depends"]]
+    else:
+        def children(n):
+            return db.get(n, {}).get("depends", [])
+    seen = set()
+
+    def walk(name: str, prefix: str, depth: int):
+        deps = [] if name in seen or depth > 3 else children(name)
+        seen.add(name)
+        for i, dep in enumerate(deps):
+            last = i == len(deps) - 1
+            _out(f"{prefix}{'└─' if last else '├─'}{dep}\n")
+            walk(dep, prefix + ("  " if last else "│ "), depth + 1)
+
+    _out(names[0] + "\n")
+    walk(names[0], "", 1)
+    return 0
+
+
+def _ssh(config: dict, settings: dict, args: list[str], rng: random.Random) -> int:
+    rest = list(args)
+    while rest and rest[0].startswith("-"):
+        flag = rest.pop(0)
+        if flag in ("-o", "-i", "-p", "-l", "-F") and rest:
+            rest.pop(0)
+    if not rest:
+        return 255
+    host, command = rest[0], " ".join(rest[1:])
+    if host in settings.get("hang_hosts", ()):
+        # No answer at all, as from a host that dropped off the network
+        time.sleep(settings.get("hang", 60))
+        return 255
+    if rng.random() < settings.get("fail_rate", 0.0):
+        sys.stderr.write(f"ssh: connect to host {host} port 22: Connection timed out\n")
+        return 255
+    if command.startswith("echo;"):
+        _out("\n")
+        sys.stdout.flush()
+        command = command[5:].strip()
+    time.sleep(settings.get("command_latency", 0.0))
+    if command.startswith("checkupdates") or "pacman -Suw" in command:
+        text = _fixture(config, settings, f"hosts/{host}.txt")
+        _out(text)
+        return 0 if text.strip() else 2
+    if command.startswith("tail"):
+        _out(_fixture(config, settings, "pacman.log"))
+    return 0
+
+
+def main() -> int:
+    tool, args = sys.argv[1], sys.argv[2:]
+    config = json.loads(Path(os.environ["BENCH_FAKE_CONFIG"]).read_text())
+    settings = config.get("tools", {}).get(tool, {})
+    # Seeded from the arguments, so a given host fails the same way on every run
+    rng = random.Random(f"{config.get('seed', 1)}:{tool}:{' '.join(args)}")
+
+    with open(config["call_log"], "a") as log:
+        log.write(f"{tool}\n")
+
+    time.sleep(settings.get("latency", 0.0) + rng.uniform(0, settings.get("jitter", 0.0)))
+
+    if tool == "ssh":
+        return _ssh(config, settings, args, rng)
+    if rng.random() < settings.get("fail_rate", 0.0):
+        sys.stderr.write(settings.get("stderr") or f"{tool}: simulated failure\n")
+        return settings.get("fail_exit", 1)
+    if "exit" in settings:
+        sys.stderr.write(settings.get("stderr", ""))
+        return settings["exit"]
+
+    if tool == "checkupdates":
+        text = _fixture(config, settings, "checkupdates.txt")
+        _out(text)
+        return 0 if text.strip() else 2
+    if tool == "yay":
+        if args[:1] == ["-Qua"]:
+            text = _fixture(config, settings, "yay-Qua.txt")
+            _out(text)
+            return 0 if text.strip() else 1
+        return 0
+    if tool == "pacman":
+        return _pacman(config, settings, args)
+    if tool == "pactree":
+        return _pactree(config, settings, args)
+    if tool == "flatpak":
+        if args[:1] == ["list"]:
+            _out(_fixture(config, settings, "flatpak-list.txt"))
+        elif args[:2] == ["remote-ls", "--updates"]:
+            _out(_fixture(config, settings, "flatpak-updates.txt"))
+        return 0
+    if tool == "fwupdmgr":
+        text = _fixture(config, settings, "fwupd-updates.json")
+        if args[:1] != ["get-updates"] or not text.strip():
+            return 2
+        _out(text)
+        return 0
+    if tool == "tailscale":
+        if args[:1] == ["status"]:
+            _out(_fixture(config, settings, "tailscale-status.json"))
+        return 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import json
+import os
+import shutil
+import socket
+import sys
+import threading
+from pathlib import Path
+
+TOOLS = ["checkupdates", "yay", "pacman", "pactree", "tailscale", "ssh", "flatpak", "fwupdmgr"]
+
+FAKE_TOOL = Path(__file__).with_name("fake_tool.py")
+
+# Close to what the real tools take on a warm system with a local mirror
+DEFAULT_SETTINGS = {
+    "checkupdates": {"latency": 0.3},
+    "yay": {"latency": 0.2},
+    "pacman": {"latency": 0.01},
+    "pactree": {"latency": 0.01},
+    "tailscale": {"latency": 0.05},
+    "ssh": {"latency": 0.05, "jitter": 0.1, "fail_rate": 0.05},
+    "flatpak": {"latency": 0.15},
+    "fwupdmgr": {"latency": 0.2},
+}
+
+
+class FakeTools:
+    """A directory of stand-in binaries and their settings.
+
+    env() gives the environment to run the code under test in: the fakes
+    first on PATH, and HOME pointing into the work directory so the app's
+    config, cache and QSettings never touch the real ones.
+    """
+
+    def __init__(self, workdir: Path, fixtures: Path, seed: int = 1):
+        self.workdir = workdir
+        self.fixtures = fixtures
+        self.bin_dir = workdir / "bin"
+        self.home = workdir / "home"
+        self.call_log = workdir / "calls.log"
+        self.config_path = workdir / "fake-tools.json"
+        self.seed = seed
+        self.settings = {tool: dict(s) for tool, s in DEFAULT_SETTINGS.items()}
+
+    def set(self, tool: str, **settings) -> None:
+        """Change a tool's settings: latency, jitter, exit, fail_rate, fail_exit, stderr.
+
+        ssh also takes command_latency (after logging in) and hang_hosts,
+        hosts that never answer.
+        """
+        self.settings.setdefault(tool, {}).update(settings)
+
+    def record(self, tool: str, stdout_file: Path) -> None:
+        """Answer with recorded output from a real system instead of the fixture."""
+        self.set(tool, stdout_file=str(stdout_file))
+
+    def install(self) -> None:
+        self.bin_dir.mkdir(parents=True, exist_ok=True)
+        self.home.mkdir(parents=True, exist_ok=True)
+        for tool in TOOLS:
+            wrapper = self.bin_dir / tool
+            wrapper.write_text(
+                f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_TOOL}" {tool} "$@"\n'
+            )
+            wrapper.chmod(0o755)
+        self.write_config()
+
+    def write_config(self) -> None:
+        self.config_path.write_text(json.dumps({
+            "fixtures": str(self.fixtures),
+            "call_log": str(self.call_log),
+            "seed": self.seed,
+            "tools": self.settings,
+        }))
+
+    def env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        env["PATH"] = f"{self.bin_dir}{os.pathsep}{env.get('PATH', '')}"
+        env["HOME"] = str(self.home)
+        env["XDG_CONFIG_HOME"] = str(self.home / ".config")
+        env["XDG_CACHE_HOME"] = str(self.home / ".cache")
+        env["BENCH_FAKE_CONFIG"] = str(self.config_path)
+        # Read by the metadata lookup in place of pacman's sync databases
+        env["CHECKUPDATES_DB"] = str(self.fixtures / "pacman-db")
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        return env
+
+    def reset_calls(self) -> None:
+        self.call_log.write_text("")
+
+    def calls(self) -> dict[str, int]:
+        """Invocations per tool since the last reset."""
+        counts: dict[str, int] = {}
+        try:
+            lines = self.call_log.read_text().split()
+        except OSError:
+            return counts
+        for tool in lines:
+            counts[tool] = counts.get(tool, 0) + 1
+        return counts
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def change_settings(tool: str, **settings) -> None:
+    """Change a tool's settings from inside a running scenario."""
+    path = Path(os.environ["BENCH_FAKE_CONFIG"])
+    config = json.loads(path.read_text())
+    config.setdefault("tools", {}).setdefault(tool, {}).update(settings)
+    path.write_text(json.dumps(config))
+
+
+def tool_calls() -> dict[str, int]:
+    """Invocations per tool so far, from inside a running scenario."""
+    config = json.loads(Path(os.environ["BENCH_FAKE_CONFIG"]).read_text())
+    counts: dict[str, int] = {}
+    for tool in Path(config["call_log"]).read_text().split():
+        counts[tool] = counts.get(tool, 0) + 1
+    return counts
+
+
+class FakePowerSupply:
+    """A /sys/class/power_supply tree: an AC adapter, a laptop battery and a wireless mouse."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._write("AC", type="Mains", online="1")
+        self._write("BAT0", type="Battery", status="Charging", capacity="80")
+        # Peripheral batteries must not count as running on battery
+        self._write("hidpp_battery_0", type="Battery", scope="Device", status="Discharging", capacity="30")
+
+    def _write(self, supply: str, **attributes: str) -> None:
+        directory = self.root / supply
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, value in attributes.items():
+            (directory / name).write_text(value + "\n")
+
+    def unplug(self, percent: int = 40) -> None:
+        self._write("AC", online="0")
+        self._write("BAT0", status="Discharging", capacity=str(percent))
+
+    def plug_in(self) -> None:
+        self._write("AC", online="1")
+        self._write("BAT0", status="Charging")
+
+
+def fake_network(metered: bool = False):
+    """A stand-in for power.NetworkManagerMetered; set_metered() reports a change at once."""
+    from PyQt6.QtCore import QObject, pyqtSignal
+
+    class FakeNetwork(QObject):
+        changed = pyqtSignal()
+
+        def __init__(self):
+            super().__init__()
+            self.metered = metered
+
+        def read(self) -> bool:
+            return self.metered
+
+        def set_metered(self, value: bool) -> None:
+            self.metered = value
+            self.changed.emit()
+
+    return FakeNetwork()
+
+
+class StandInMirror:
+    """A TCP listener on localhost for the connectivity probe to reach.
+
+    While "online" every connection is accepted. go_offline() stops
+    accepting and fills the listen backlog, after which the kernel drops new
+    connection attempts, so they hang until the prober's deadline the way
+    they do when the network is down.
+    """
+
+    def __init__(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(0)
+        self.address = "127.0.0.1:%d" % self._server.getsockname()[1]
+        self._fillers: list[socket.socket] = []
+        self._online = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+        self.go_online()
+
+    def _accept(self):
+        while not self._closed:
+            if not self._online.wait(0.1):
+                continue
+            self._server.settimeout(0.05)
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                continue
+            conn.close()
+
+    def go_online(self) -> None:
+        for s in self._fillers:
+            s.close()
+        self._fillers.clear()
+        # Drain the queue right away, so the next attempt is not dropped
+        self._server.settimeout(0)
+        while True:
+            try:
+                self._server.accept()[0].close()
+            except OSError:
+                break
+        self._online.set()
+
+    def go_offline(self) -> None:
+        self._online.clear()
+        # Let a pending accept() time out before filling the queue
+        threading.Event().wait(0.1)
+        port = self._server.getsockname()[1]
+        while True:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.settimeout(0.2)
+            try:
+                s.connect(("127.0.0.1", port))
+            except OSError:
+                s.close()
+                return
+            self._fillers.append(s)
+
+    def close(self) -> None:
+        self._closed = True
+        self.go_online()
+        self._server.close()
@@ -0,0 +1,218 @@
+"""Generated output for the stand-in tools.
+
+Everything is derived from a seed, so two runs with the same spec see the
+same packages, hosts and failures. Any file can be replaced by recorded
+output from a real system (see FakeTools.record).
+"""
+
+import io
+import json
+import random
+import tarfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+BENCH_TAG = "tag:bench"
+
+_WORDS = [
+    "lib", "python", "qt6", "gtk4", "glib2", "perl", "rust", "go", "node", "mesa",
+    "vulkan", "xorg", "kde", "gnome", "ffmpeg", "gst", "pipewire", "openssl", "curl", "zstd",
+]
+_REPOS = ["core", "extra", "extra", "extra", "multilib"]
+# Always part of the generated set so restart detection is exercised
+_KERNEL_PACKAGES = ["linux", "systemd", "glibc", "mesa"]
+
+
+@dataclass
+class FixtureSpec:
+    packages: int = 500  # repo updates on the local system
+    aur: int = 50  # AUR updates on the local system
+    hosts: int = 50  # remote peers tagged with BENCH_TAG
+    per_host: int = 200  # updates per remote host
+    universe: int = 3000  # distinct packages the hosts draw from
+    repo_size: int = 15000  # packages in the sync databases, updated or not
+    cache_files: int = 20000  # package files in the stand-in pacman cache
+    flatpaks: int = 20  # Flatpak apps and runtimes with updates
+    firmware: int = 2  # devices with fwupd firmware updates
+    seed: int = 1
+
+
+def _version(rng: random.Random) -> tuple[str, str]:
+    major, minor, patch = rng.randint(0, 9), rng.randint(0, 30), rng.randint(0, 20)
+    old = f"{major}.{minor}.{patch}-{rng.randint(1, 3)}"
+    if rng.random() < 0.7:
+        new = f"{major}.{minor}.{patch + 1}-1"
+    else:
+        new = f"{major}.{minor + 1}.0-1"
+    return old, new
+
+
+def _sync_db(names: list[str], rng: random.Random) -> dict[str, dict]:
+    db = {}
+    for name in names:
+        old, new = _version(rng)
+        db[name] = {
+            "old": old,
+            "new": new,
+            "repository": rng.choice(_REPOS),
+            "description": f"The {name} package for benchmarking ({rng.choice(_WORDS)} support)",
+            "size": rng.randint(10_000, 80_000_000),
+            "installed": rng.randint(20_000, 300_000_000),
+            "depends": [],
+        }
+    for name in names:
+        db[name]["depends"] = sorted(rng.sample(names, min(len(names), rng.randint(0, 6))))
+    return db
+
+
+def _desc(fields: dict[str, object]) -> bytes:
+    return "".join(f"%{key}%\n{value}\n\n" for key, value in fields.items()).encode()
+
+
+def _write_pacman_db(directory: Path, db: dict[str, dict], filler: int, rng: random.Random) -> None:
+    """A pacman DBPath: gzipped sync databases and a local database of the old versions."""
+    repos: dict[str, list[tuple[str, str, dict]]] = {}
+    for name, r in db.items():
+        if r["repository"]:
+            repos.setdefault(r["repository"], []).append((name, r["new"], r))
+    for i in range(filler):
+        name = f"filler-{rng.choice(_WORDS)}{i}"
+        r = {"description": f"The {name} package", "size": rng.randint(10_000, 5_000_000)}
+        r["installed"] = r["size"] * 3
+        repos.setdefault(rng.choice(_REPOS), []).append((name, _version(rng)[1], r))
+
+    (directory / "sync").mkdir(parents=True, exist_ok=True)
+    for repo, packages in repos.items():
+        with tarfile.open(directory / "sync" / f"{repo}.db", "w:gz") as tar:
+            for name, version, r in packages:
+                data = _desc({
+                    "FILENAME": f"{name}-{version}-x86_64.pkg.tar.zst",
+                    "NAME": name,
+                    "VERSION": version,
+                    "DESC": r["description"],
+                    "CSIZE": r["size"],
+                    "ISIZE": r["installed"],
+                    "ARCH": "x86_64",
+                })
+                info = tarfile.TarInfo(f"{name}-{version}/desc")
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+    for name, r in db.items():
+        entry = directory / "local" / f"{name}-{r['old']}"
+        entry.mkdir(parents=True, exist_ok=True)
+        installed = r["installed"] * rng.randint(90, 110) // 100
+        (entry / "desc").write_bytes(
+            _desc({"NAME": name, "VERSION": r["old"], "SIZE": installed})
+        )
+
+
+def _write_package_cache(directory: Path, db: dict[str, dict], count: int, rng: random.Random) -> None:
+    """Sparse package files: several versions of installed packages, some uninstalled ones, signatures."""
+    directory.mkdir(parents=True, exist_ok=True)
+    names = list(db)
+    written = 0
+    while written < count:
+        installed = rng.random() < 0.9
+        name = rng.choice(names) if installed else f"removed-{rng.choice(_WORDS)}{written}"
+        for _ in range(rng.randint(1, 6)):
+            filename = f"{name}-{_version(rng)[1]}-x86_64.pkg.tar.zst"
+            with open(directory / filename, "wb") as f:
+                f.truncate(rng.randint(10_000, 50_000_000))
+            written += 1
+            if rng.random() < 0.3:
+                (directory / f"{filename}.sig").write_bytes(b"\0" * 119)
+                written += 1
+
+
+def _write_flatpak(directory: Path, count: int, rng: random.Random) -> None:
+    """'flatpak list' and 'flatpak remote-ls --updates' output, tab-separated like the real thing."""
+    installed, updates = [], []
+    for i in range(count):
+        app = f"org.bench.{rng.choice(_WORDS).capitalize()}{i}"
+        branch = "stable" if i % 4 else "23.08"
+        old, new = _version(rng)
+        installed.append(f"{app}\t{branch}\t{old}\t{rng.getrandbits(64):016x}\n")
+        updates.append(
+            f"{app}\t{branch}\t{new}\t{rng.getrandbits(64):016x}\t"
+            f"{rng.choice(_WORDS)} application\t{rng.randint(1, 400)}.{rng.randint(0, 9)} MB\n"
+        )
+    (directory / "flatpak-list.txt").write_text("".join(installed))
+    (directory / "flatpak-updates.txt").write_text("".join(updates))
+
+
+def _write_fwupd(directory: Path, count: int, rng: random.Random) -> None:
+    """'fwupdmgr get-updates --json' output; empty when there is nothing to update."""
+    devices = []
+    for i in range(count):
+        old, new = _version(rng)
+        devices.append({
+            "Name": f"Bench Device {i}",
+            "DeviceId": f"{rng.getrandbits(160):040x}",
+            "Version": old.split("-")[0],
+            "Releases": [{
+                "Version": new.split("-")[0],
+                "Summary": "Firmware for the bench device",
+                "Size": rng.randint(100_000, 30_000_000),
+            }],
+        })
+    (directory / "fwupd-updates.json").write_text(json.dumps({"Devices": devices}) if devices else "")
+
+
+def _update_lines(db: dict[str, dict], names: list[str]) -> str:
+    return "".join(f"{n} {db[n]['old']} -> {db[n]['new']}\n" for n in names)
+
+
+def generate(directory: Path, spec: FixtureSpec) -> Path:
+    """Write the fixture set for spec into directory and return it."""
+    rng = random.Random(spec.seed)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    universe = list(_KERNEL_PACKAGES)
+    while len(universe) < max(spec.universe, spec.packages, spec.per_host):
+        universe.append(f"{rng.choice(_WORDS)}-{rng.choice(_WORDS)}{len(universe)}")
+    db = _sync_db(universe, rng)
+
+    local = universe[: spec.packages]
+    (directory / "checkupdates.txt").write_text(_update_lines(db, local))
+
+    aur_db = _sync_db([f"{rng.choice(_WORDS)}-git{i}" for i in range(spec.aur)], rng)
+    (directory / "yay-Qua.txt").write_text(_update_lines(aur_db, list(aur_db)))
+    for record in aur_db.values():
+        record["repository"] = ""
+
+    _write_flatpak(directory, spec.flatpaks, rng)
+    _write_fwupd(directory, spec.firmware, rng)
+
+    (directory / "syncdb.json").write_text(json.dumps(db | aur_db))
+    _write_pacman_db(directory / "pacman-db", db, max(0, spec.repo_size - len(db)), rng)
+    _write_package_cache(directory / "pkgcache", db, spec.cache_files, rng)
+
+    hosts_dir = directory / "hosts"
+    hosts_dir.mkdir(exist_ok=True)
+    peers = {}
+    for i in range(spec.hosts):
+        hostname = f"bench{i:03d}"
+        names = sorted(rng.sample(universe, min(spec.per_host, len(universe))))
+        (hosts_dir / f"{hostname}.txt").write_text(_update_lines(db, names))
+        peers[f"nodekey:{i:064x}"] = {
+            "HostName": hostname,
+            "DNSName": f"{hostname}.tailnet.ts.net.",
+            "Online": True,
+            "Tags": [BENCH_TAG, "tag:server"],
+        }
+    (directory / "tailscale-status.json").write_text(
+        json.dumps({"BackendState": "Running", "Self": {"HostName": "bench-local"}, "Peer": peers})
+    )
+    (directory / "spec.json").write_text(json.dumps(asdict(spec)))
+    return directory
+
+
+def update_lines(count: int, seed: int = 1) -> str:
+    """'package old -> new' text of the given length, for parser benchmarks."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        old, new = _version(rng)
+        lines.append(f"{rng.choice(_WORDS)}-{rng.choice(_WORDS)}{i} {old} -> {new}")
+    return "\n".join(lines) + "\n"
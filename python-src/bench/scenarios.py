@@ -0,0 +1,637 @@
+"""Benchmark scenarios.
+
+Each scenario runs in its own interpreter with the stand-in tools on PATH
+(see __main__), takes a Context and returns its metrics. 'wall_seconds'
+is the timed part of one run; anything else it returns is reported as is.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from bench.fixtures import BENCH_TAG, update_lines
+
+
+@dataclass
+class Context:
+    fixtures: Path
+    rows: int  # list size for the parser and dialog scenarios
+    cycles: int = 2000  # simulated check cycles for the soak scenario
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[[Context], dict]
+    gui: bool
+    description: str
+
+
+SCENARIOS: dict[str, Scenario] = {}
+
+
+def scenario(name: str, gui: bool = False):
+    def register(func):
+        SCENARIOS[name] = Scenario(name, func, gui, (func.__doc__ or "").strip())
+        return func
+    return register
+
+
+def _process_events(rounds: int = 3):
+    from PyQt6.QtWidgets import QApplication
+
+    for _ in range(rounds):
+        QApplication.processEvents()
+
+
+def _sample_updates(count: int, seed: int = 1):
+    """Parsed updates with metadata filled in, without running pacman."""
+    from yay_sys_tray.checker import parse_update_output
+
+    repos = ["core", "extra", "extra", "multilib", "aur"]
+    updates = parse_update_output(update_lines(count, seed))
+    for i, u in enumerate(updates):
+        u.repository = repos[i % len(repos)]
+        u.arch = "x86_64" if u.repository != "aur" else ""
+        u.description = f"Description of {u.package}" if i % 7 else ""
+        u.download_size = (i * 7919) % 50_000_000
+    return updates
+
+
+def _fixture_hosts(ctx: Context):
+    from yay_sys_tray.checker import RESTART_PACKAGES, parse_update_output
+    from yay_sys_tray.tailscale import HostResult
+
+    hosts = []
+    for path in sorted((ctx.fixtures / "hosts").glob("*.txt")):
+        updates = parse_update_output(path.read_text())
+        restart = [u.package for u in updates if u.package in RESTART_PACKAGES]
+        hosts.append(HostResult(path.stem, updates, bool(restart), restart))
+    return hosts
+
+
+@scenario("parse_update_output")
+def parse_output(ctx: Context) -> dict:
+    """parse_update_output on a checkupdates listing of --rows lines."""
+    from yay_sys_tray.checker import parse_update_output
+
+    text = update_lines(ctx.rows)
+    rounds = 10
+    start = time.perf_counter()
+    for _ in range(rounds):
+        updates = parse_update_output(text)
+    return {"wall_seconds": (time.perf_counter() - start) / rounds, "updates": len(updates)}
+
+
+@scenario("update_checker")
+def update_checker(ctx: Context) -> dict:
+    """UpdateChecker.run: every update source at once, the sync database lookup and the reboot check."""
+    from yay_sys_tray.checker import UpdateChecker
+    from yay_sys_tray.config import AppConfig
+    from yay_sys_tray.metadata import MetadataCache
+    from yay_sys_tray.sources import create_sources
+
+    results, errors = [], []
+    checker = UpdateChecker(
+        metadata=MetadataCache(), sources=create_sources(AppConfig.update_sources),
+    )
+    checker.check_complete.connect(results.append)
+    checker.check_error.connect(errors.append)
+    start = time.perf_counter()
+    checker.run()
+    wall = time.perf_counter() - start
+    updates = results[0].updates if results else []
+    return {
+        "wall_seconds": wall,
+        "updates": len(updates),
+        "foreign": sum(1 for u in updates if not u.is_package),
+        "error": errors[0] if errors else None,
+        "source_errors": results[0].source_errors if results else {},
+    }
+
+
+@scenario("sync_db")
+def sync_db(ctx: Context) -> dict:
+    """Sizes for every fixture package: one pass over the sync databases plus the local database."""
+    from yay_sys_tray.syncdb import SyncDatabase, installed_sizes
+
+    names = {p.name.rsplit("-", 2)[0] for p in (ctx.fixtures / "pacman-db" / "local").iterdir()}
+    start = time.perf_counter()
+    found = SyncDatabase().lookup(names) or {}
+    installed = installed_sizes(names)
+    return {
+        "wall_seconds": time.perf_counter() - start,
+        "packages": len(found),
+        "installed": len(installed),
+    }
+
+
+@scenario("package_cache")
+def package_cache(ctx: Context) -> dict:
+    """Package cache index: first scan, rescan after a restart, first report, then scan and report with nothing new and after new downloads."""
+    import os
+    import tempfile
+
+    from yay_sys_tray.pkgcache import PackageCacheIndex
+    from yay_sys_tray.syncdb import installed_versions
+
+    cache = str(ctx.fixtures / "pkgcache")
+    installed = installed_versions(ctx.fixtures / "pacman-db")
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = Path(tmp) / "pkgcache.json"
+        start = time.perf_counter()
+        index = PackageCacheIndex(index_file)
+        index.scan([cache])
+        index.save()
+        cold = time.perf_counter() - start
+        cold_stats = index.last_stats
+
+        # A fresh process: load the saved index; the directory is unchanged
+        start = time.perf_counter()
+        index = PackageCacheIndex(index_file)
+        index.scan([cache])
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = index.report(3, installed)
+        first_report = time.perf_counter() - start
+
+        # Steady state: a check with nothing downloaded since the last one
+        start = time.perf_counter()
+        index.scan([cache])
+        index.report(3, installed)
+        unchanged = time.perf_counter() - start
+
+        # A few downloads since the last check
+        new = [os.path.join(cache, f"bench-new{i}-1.0-1-x86_64.pkg.tar.zst") for i in range(50)]
+        for path in new:
+            Path(path).write_bytes(b"\0" * 1024)
+        try:
+            start = time.perf_counter()
+            index.scan([cache])
+            incremental_stats = index.last_stats
+            report = index.report(3, installed)
+            incremental = time.perf_counter() - start
+        finally:
+            for path in new:
+                os.unlink(path)
+    return {
+        "wall_seconds": incremental,
+        "cold_seconds": cold,
+        "restart_seconds": warm,
+        "first_report_seconds": first_report,
+        "unchanged_seconds": unchanged,
+        "files": report.files,
+        "cold_stats": cold_stats,
+        "incremental_stats": incremental_stats,
+        "reclaimable_mib": report.reclaimable_size // 1048576,
+        "orphaned_mib": report.orphaned_size // 1048576,
+    }
+
+
+@scenario("tailscale_checker")
+def tailscale_checker(ctx: Context) -> dict:
+    """TailscaleChecker.run: peer discovery and checkupdates over SSH on every host."""
+    from yay_sys_tray.metadata import MetadataCache
+    from yay_sys_tray.tailscale import TailscaleChecker
+
+    results, errors = [], []
+    checker = TailscaleChecker([BENCH_TAG], timeout=5, metadata=MetadataCache())
+    checker.check_complete.connect(results.append)
+    checker.check_error.connect(errors.append)
+    start = time.perf_counter()
+    checker.run()
+    wall = time.perf_counter() - start
+    hosts = results[0].hosts if results else []
+    return {
+        "wall_seconds": wall,
+        "hosts": len(hosts),
+        "unreachable": sum(1 for h in hosts if h.error),
+        "updates": sum(len(h.updates) for h in hosts),
+        "error": errors[0] if errors else None,
+    }
+
+
+@scenario("record_memory")
+def record_memory(ctx: Context) -> dict:
+    """Memory held by 100k UpdateInfo rows across HostResults, enriched through MetadataCache.
+
+    The fixture hosts' listings are parsed again for as many hosts as it
+    takes, so every row is its own object as after a real check; what they
+    share is what interning and the metadata cache make them share.
+    """
+    import gc
+
+    from yay_sys_tray.checker import RESTART_PACKAGES, parse_update_output
+    from yay_sys_tray.diagnostics import rss_kib
+    from yay_sys_tray.metadata import MetadataCache
+    from yay_sys_tray.tailscale import HostResult
+
+    records = 100_000
+    listings = [p.read_text() for p in sorted((ctx.fixtures / "hosts").glob("*.txt"))]
+    listings = [text for text in listings if text.strip()]
+    metadata = MetadataCache()
+    gc.collect()
+    before = rss_kib()
+    start = time.perf_counter()
+    hosts: list[HostResult] = []
+    count = 0
+    while count < records:
+        updates = parse_update_output(listings[len(hosts) % len(listings)])[: records - count]
+        metadata.enrich(updates)
+        restart = [u.package for u in updates if u.package in RESTART_PACKAGES]
+        hosts.append(HostResult(f"host-{len(hosts)}", updates, bool(restart), restart))
+        count += len(updates)
+    wall = time.perf_counter() - start
+    gc.collect()
+    rss = rss_kib() - before
+    stats = metadata.stats()
+    return {
+        "wall_seconds": wall,
+        "records": count,
+        "hosts": len(hosts),
+        "rss_kib": rss,
+        "bytes_per_record": round(rss * 1024 / count),
+        "metadata_bytes": stats.approx_bytes,
+        "metadata_entries": stats.entries,
+    }
+
+
+@scenario("host_timeouts")
+def host_timeouts(ctx: Context) -> dict:
+    """Remote check with five hosts gone silent: learned per-host timeouts against the fixed one.
+
+    Three checks first teach HostLatency the fleet's login times; then five
+    hosts stop answering and the same check runs with fixed and with
+    learned timeouts (10 s maximum, 2 s minimum).
+    """
+    import tempfile
+
+    from bench.fakes import change_settings
+    from yay_sys_tray.tailscale import HostLatency, TailscaleChecker
+
+    latency = HostLatency(Path(tempfile.mkdtemp(prefix="latency-")) / "host-latency.json")
+
+    def check(learned: bool) -> tuple[float, list]:
+        results = []
+        checker = TailscaleChecker(
+            [BENCH_TAG], timeout=10, latency=latency if learned else None, timeout_min=2,
+        )
+        checker.check_complete.connect(results.append)
+        start = time.perf_counter()
+        checker.run()
+        return time.perf_counter() - start, results[0].hosts if results else []
+
+    for _ in range(3):
+        healthy, _ = check(True)
+    silent = [h.hostname for h in _fixture_hosts(ctx)[::10][:5]]
+    change_settings("ssh", hang_hosts=silent)
+    try:
+        fixed, _ = check(False)
+        wall, hosts = check(True)
+    finally:
+        change_settings("ssh", hang_hosts=[])
+    return {
+        "wall_seconds": wall,
+        "fixed_seconds": fixed,
+        "healthy_seconds": healthy,
+        "hosts": len(hosts),
+        "unreachable": sum(1 for h in hosts if h.error),
+    }
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float) -> bool:
+    from PyQt6.QtWidgets import QApplication
+
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        QApplication.processEvents()
+        time.sleep(0.005)
+    return True
+
+
+@scenario("connectivity_probe", gui=True)
+def connectivity_probe(ctx: Context) -> dict:
+    """Check Now with the network down: time to the offline state, then recovery once it is back.
+
+    A local listener stands in for the mirror; taking it "offline" makes
+    connections hang the way they do without a network.
+    """
+    from bench.fakes import StandInMirror
+    from yay_sys_tray.app import TrayApp
+    from yay_sys_tray.config import AppConfig
+    from yay_sys_tray.netprobe import parse_target, probe
+
+    mirror = StandInMirror()
+    target = parse_target(mirror.address)
+    rounds = 20
+    start = time.perf_counter()
+    for _ in range(rounds):
+        online = probe([target], tailscale=True)
+    probe_online = (time.perf_counter() - start) / rounds
+
+    config = AppConfig(check_interval_minutes=1440, animations=False, probe_host=mirror.address)
+    tray = TrayApp(config)
+    tray.timer.stop()
+    tray.is_arch = True
+    mirror.go_offline()
+    start = time.perf_counter()
+    tray.start_check()
+    went_offline = _wait_for(lambda: tray._offline is not None, 10)
+    wall = time.perf_counter() - start
+
+    # What the retry timer does once it fires, without waiting for it
+    mirror.go_online()
+    start = time.perf_counter()
+    tray._probe_while_offline()
+    recovered = _wait_for(lambda: tray._offline is None and tray.local_result is not None, 60)
+    recovery = time.perf_counter() - start
+    _wait_for(lambda: tray.checker is None and tray.prober is None and tray.cache_scanner is None, 10)
+    mirror.close()
+    tray.tray.hide()
+    tray.deleteLater()
+    _process_events()
+    if not went_offline:
+        raise AssertionError("the tray did not go offline within 10 s of the mirror going down")
+    if not recovered:
+        raise AssertionError("the tray did not check again within 60 s of the mirror coming back")
+    return {
+        "wall_seconds": wall,
+        "probe_online_seconds": probe_online,
+        "recovery_seconds": recovery,
+        "tailnet": online.tailnet,
+        "updates": len(tray.updates),
+    }
+
+
+@scenario("power_policy", gui=True)
+def power_policy(ctx: Context) -> dict:
+    """A check on battery, then plugging in, then a metered network, against fake power sources.
+
+    On battery the check must leave the remote hosts alone and stretch the
+    interval; plugging in must run the deferred remote check right away.
+    """
+    import tempfile
+
+    from bench.fakes import FakePowerSupply, fake_network, tool_calls
+    from yay_sys_tray.app import TrayApp
+    from yay_sys_tray.config import AppConfig
+    from yay_sys_tray.power import SysfsPower
+
+    supply = FakePowerSupply(Path(tempfile.mkdtemp(prefix="power-")))
+    network = fake_network()
+    config = AppConfig(
+        offline_probe=False, power_saving=False,
+        tailscale_enabled=True, tailscale_tags=BENCH_TAG.removeprefix("tag:"),
+    )
+    tray = TrayApp(config)
+    tray.is_arch = True
+    tray.power_monitor.power = SysfsPower(supply.root)
+    tray.power_monitor.network = network
+    supply.unplug(percent=35)
+    tray.config.power_saving = True
+    tray._apply_power_config()
+    stretched = tray.timer.interval() // 60000
+
+    def idle() -> bool:
+        return tray.checker is None and tray.tailscale_checker is None and tray.local_result is not None
+
+    before = tool_calls().get("ssh", 0)
+    start = time.perf_counter()
+    tray.start_check()
+    spinning = tray._spin_timer.isActive()
+    _wait_for(idle, 60)
+    wall = time.perf_counter() - start
+    ssh_on_battery = tool_calls().get("ssh", 0) - before
+    deferred = tray._power_deferred
+
+    # What the next poll of the power supplies does, without waiting for it
+    before = tool_calls().get("ssh", 0)
+    start = time.perf_counter()
+    supply.plug_in()
+    tray.power_monitor.refresh()
+    caught_up = _wait_for(lambda: idle() and bool(tray.remote_updates), 60)
+    catch_up = time.perf_counter() - start
+    ssh_on_ac = tool_calls().get("ssh", 0) - before
+    normal = tray.timer.interval() // 60000
+
+    network.set_metered(True)
+    metered = tray._saving and tray.timer.interval() // 60000 == stretched
+    tray.tray.hide()
+    tray.deleteLater()
+    _process_events()
+
+    problems = []
+    if ssh_on_battery:
+        problems.append(f"{ssh_on_battery} ssh call(s) on battery")
+    if spinning:
+        problems.append("the icon spun on battery")
+    if not deferred:
+        problems.append("the remote check was not marked as deferred")
+    if not caught_up:
+        problems.append("plugging in did not run the deferred remote check within 60 s")
+    if not metered:
+        problems.append("a metered connection did not stretch the interval")
+    if problems:
+        raise AssertionError("power policy not followed: " + "; ".join(problems))
+    return {
+        "wall_seconds": wall,
+        "catch_up_seconds": catch_up,
+        "ssh_on_ac": ssh_on_ac,
+        "interval_minutes": normal,
+        "battery_interval_minutes": stretched,
+    }
+
+
+@scenario("dialog_build", gui=True)
+def dialog_build(ctx: Context) -> dict:
+    """UpdatesDialog with --rows local updates: build and show, then refresh with one row changed."""
+    from yay_sys_tray.dialogs import UpdatesDialog
+
+    updates = _sample_updates(ctx.rows)
+    start = time.perf_counter()
+    dialog = UpdatesDialog(updates)
+    dialog.show()
+    _process_events()
+    build = time.perf_counter() - start
+
+    changed = updates[1:] + _sample_updates(1, seed=2)
+    start = time.perf_counter()
+    dialog.refresh(changed)
+    _process_events()
+    refresh = time.perf_counter() - start
+    dialog.close()
+    dialog.deleteLater()
+    _process_events()
+    return {"wall_seconds": build, "refresh_seconds": refresh, "rows": len(updates)}
+
+
+@scenario("dialog_fleet", gui=True)
+def dialog_fleet(ctx: Context) -> dict:
+    """UpdatesDialog with one tab per fixture host, the By package tab, and a search."""
+    from yay_sys_tray.dialogs import UpdatesDialog
+    from yay_sys_tray.tailscale import HostResult
+
+    updates = _sample_updates(100)
+    hosts = _fixture_hosts(ctx)
+    start = time.perf_counter()
+    dialog = UpdatesDialog(updates, hosts, on_update_hosts=lambda hostnames, restart: None)
+    dialog.show()
+    _process_events()
+    build = time.perf_counter() - start
+
+    hosts[0] = HostResult(hosts[0].hostname, hosts[0].updates[1:])
+    start = time.perf_counter()
+    dialog.refresh(updates, hosts)
+    _process_events()
+    refresh = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dialog._tabs.setCurrentWidget(dialog._matrix)
+    _process_events()
+    matrix = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dialog._search_edit.setText("lib")
+    _process_events()
+    search = time.perf_counter() - start
+    dialog.close()
+    dialog.deleteLater()
+    _process_events()
+    return {
+        "wall_seconds": build,
+        "refresh_seconds": refresh,
+        "matrix_seconds": matrix,
+        "search_seconds": search,
+        "hosts": len(hosts),
+    }
+
+
+@scenario("delegate_paint", gui=True)
+def delegate_paint(ctx: Context) -> dict:
+    """Repaint the update list while scrolling through --rows cards, with warm and cold caches.
+
+    The warm pass repeats the scroll once every card on the way has been
+    laid out; the cold pass drops the delegate's layout, icon and chrome
+    caches before each frame, as after a resize or theme change.
+    """
+    from yay_sys_tray.dialogs import UpdatesDialog
+    from yay_sys_tray.index import LOCAL_HOST
+
+    dialog = UpdatesDialog(_sample_updates(ctx.rows))
+    dialog.resize(700, 900)
+    dialog.show()
+    _process_events()
+    view = dialog._panes[LOCAL_HOST].view
+    delegate = view.itemDelegate()
+    bar = view.verticalScrollBar()
+    frames = 60
+
+    def scroll(cold: bool) -> float:
+        start = time.perf_counter()
+        for i in range(frames):
+            bar.setValue(bar.maximum() * i // frames)
+            if cold:
+                delegate.invalidate()
+            view.viewport().grab()
+        return (time.perf_counter() - start) / frames
+
+    scroll(cold=False)
+    warm = scroll(cold=False)
+    cold = scroll(cold=True)
+    dialog.close()
+    dialog.deleteLater()
+    _process_events()
+    return {
+        "wall_seconds": warm,
+        "cold_seconds": cold,
+        "cache_speedup": round(cold / warm, 1) if warm else None,
+        "frames": frames,
+    }
+
+
+@scenario("soak", gui=True)
+def soak(ctx: Context) -> dict:
+    """--cycles simulated check cycles through the tray; fails if memory keeps growing.
+
+    Results churn with a fixed period: packages and hosts come and go, hosts
+    time out, a check fails, the updates window is opened and closed. Memory
+    is compared between period boundaries after a warm-up tenth of the
+    cycles, using the diagnostics mode's sampling and tracemalloc snapshots.
+    """
+    import gc
+    import tempfile
+    import tracemalloc
+
+    from yay_sys_tray.app import TrayApp
+    from yay_sys_tray.checker import CheckResult
+    from yay_sys_tray.config import AppConfig
+    from yay_sys_tray.diagnostics import Diagnostics, allocation_diff
+    from yay_sys_tray.tailscale import HostResult, RemoteCheckResult
+
+    period = 20
+    config = AppConfig(check_interval_minutes=1440, tailscale_enabled=False, animations=False)
+    tray = TrayApp(config)
+    tray.timer.stop()
+    diagnostics = Diagnostics(directory=Path(tempfile.mkdtemp(prefix="soak-")), frames=1)
+
+    hosts_pool = [(h.hostname, h.updates[:40]) for h in _fixture_hosts(ctx)[:6]]
+    updates_pool = [_sample_updates(60, seed=s) for s in range(1, 5)]
+
+    def cycle(i: int):
+        phase = i % period
+        if phase == period - 1:
+            tray._on_check_error("checkupdates exited with 1")
+            return
+        tray._on_check_complete(CheckResult(updates_pool[phase % 4][phase:], False, []))
+        hosts = [
+            HostResult(name, updates[phase % 5:], error="timed out" if (phase + n) % 7 == 0 else None)
+            for n, (name, updates) in enumerate(hosts_pool[: 1 + phase % len(hosts_pool)])
+        ]
+        tray._on_remote_check_complete(RemoteCheckResult(hosts))
+        if phase == period // 2:
+            tray._open_updates_dialog()
+            _process_events()
+            tray._updates_dialog.close()
+        _process_events(1)
+
+    # Tracing starts before the warm-up, so that data replaced by a later
+    # cycle is traced both when it is allocated and when it is freed
+    diagnostics.start()
+    cycles = max(ctx.cycles // period, 2) * period
+    warmup = max(ctx.cycles // 10 // period, 1) * period
+    for i in range(warmup):
+        cycle(i)
+    gc.collect()
+    _process_events()
+    first = diagnostics.sample()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    for i in range(warmup, cycles):
+        cycle(i)
+    wall = (time.perf_counter() - start) / (cycles - warmup)
+    gc.collect()
+    _process_events()
+    last = diagnostics.sample()
+    after = tracemalloc.take_snapshot()
+    diagnostics.stop()
+    tray.tray.hide()
+    tray.deleteLater()
+    _process_events()
+
+    growth = {
+        "rss_growth_kib": last["rss_kib"] - first["rss_kib"],
+        "object_growth": last["objects"] - first["objects"],
+        "traced_growth_kib": last["traced_kib"] - first["traced_kib"],
+    }
+    # RSS is reported but not held to a bound: the allocator does not hand
+    # freed memory back promptly enough for it to be a reliable signal
+    if growth["traced_growth_kib"] > 512 or growth["object_growth"] > 1000:
+        raise AssertionError(
+            f"memory grew over {cycles - warmup} cycles: {growth}\n"
+            + "\n".join(allocation_diff(before, after))
+        )
+    return {"wall_seconds": wall, "cycles": cycles, **growth}
@@ -1,4 +1,54 @@
+import argparse
+import json
 import sys
+import time
+
+
+# Options that send one of the control commands, in --help order
+_OPTIONS = {
+    "check": ("--check-now", "check for updates now"),
+    "show": ("--show", "open the updates window"),
+    "quit": ("--quit", "quit the running instance"),
+    "status": ("--status", "print the current state as JSON"),
+    "snapshot": (
+        "--snapshot",
+        "write a memory snapshot report (needs diagnostics enabled) and print its path",
+    ),
+}
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    from yay_sys_tray.ipc import COMMANDS
+
+    parser = argparse.ArgumentParser(
+        prog="yay-sys-tray",
+        description="Arch Linux system tray update checker. Only one instance runs per "
+        "user; with one already running, these options are sent to it.",
+    )
+    group = parser.add_mutually_exclusive_group()
+    for command in COMMANDS:
+        flag, help_text = _OPTIONS[command]
+        group.add_argument(flag, dest="command", action="store_const", const=command, help=help_text)
+    return parser.parse_args(argv)
+
+
+def _forward(command: str | None) -> int | None:
+    """Hand the command to a running instance. Returns an exit code, or None if none runs."""
+    from yay_sys_tray.ipc import send_command
+
+    reply = send_command(command or "show")
+    if reply is None:
+        return None
+    if not reply.get("ok"):
+        print(reply.get("error", "failed"), file=sys.stderr)
+        return 1
+    if command == "status":
+        print(json.dumps(reply["result"], indent=2))
+    elif command == "snapshot":
+        print(reply["result"])
+    elif command is None:
+        print("yay-sys-tray is already running", file=sys.stderr)
+    return 0
 
 
 def main():
@@ -11,12 +61,36 @@ def main():
         )
         sys.exit(1)
 
+    # After the PyQt6 check: the command list lives with the Qt socket code
+    command = _parse_args(sys.argv[1:]).command
+
+    from yay_sys_tray.ipc import ControlServer, InstanceLock
+
+    # A second launch hands over to the first instead of running its own checks
+    code = _forward(command)
+    if code is not None:
+        sys.exit(code)
+    if command in ("quit", "status", "snapshot"):
+        print("yay-sys-tray is not running", file=sys.stderr)
+        sys.exit(1)
+    lock = InstanceLock()
+    if not lock.acquire():
+        # Another instance is starting up; give it a moment to listen
+        for _ in range(20):
+            code = _forward(command)
+            if code is not None:
+                sys.exit(code)
+            time.sleep(0.25)
+        print("yay-sys-tray is starting but not answering", file=sys.stderr)
+        sys.exit(1)
+
+    from PyQt6.QtCore import QTimer
     from PyQt6.QtWidgets import QSystemTrayIcon
 
     from yay_sys_tray.app import TrayApp
     from yay_sys_tray.config import AppConfig
 
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1])
     app.setQuitOnLastWindowClosed(False)
     app.setApplicationName("Yay Update Checker")
 
@@ -32,7 +106,18 @@ def main():
     tray = TrayApp(config)
     tray.show()
 
-    sys.exit(app.exec())
+    server = ControlServer(tray.control_handlers())
+    if not server.listen():
+        print("yay-sys-tray: control socket unavailable", file=sys.stderr)
+    if command == "check":
+        QTimer.singleShot(0, tray.start_check)
+    elif command == "show":
+        QTimer.singleShot(0, tray.show_updates_dialog)
+
+    code = app.exec()
+    server.close()
+    lock.release()
+    sys.exit(code)
 
 
 if __name__ == "__main__":
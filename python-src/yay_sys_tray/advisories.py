@@ -0,0 +1,244 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from yay_sys_tray.checker import UpdateInfo
+from yay_sys_tray.config import CACHE_DIR
+
+# The feed arch-audit reads: every AVG group with affected and fixed versions
+DEFAULT_FEED_URL = "https://security.archlinux.org/issues/all.json"
+FEED_CACHE = CACHE_DIR / "advisories.json"
+
+SEVERITIES = ("Unknown", "Low", "Medium", "High", "Critical")
+_SEVERITY_RANK = {name: rank for rank, name in enumerate(SEVERITIES)}
+
+
+def severity_rank(severity: str) -> int:
+    return _SEVERITY_RANK.get(severity, 0)
+
+
+@dataclass(slots=True, frozen=True)
+class Advisory:
+    group: str  # AVG-1234
+    severity: str
+    type: str
+    affected: str  # version the group was reported against
+    fixed: str  # first fixed version
+    advisories: tuple[str, ...]  # ASA-202405-01, ...
+    issues: tuple[str, ...]  # CVE ids
+
+    @property
+    def label(self) -> str:
+        return self.advisories[0] if self.advisories else self.group
+
+
+def highest_severity(advisories: tuple[Advisory, ...]) -> str:
+    if not advisories:
+        return ""
+    return max((a.severity for a in advisories), key=severity_rank)
+
+
+# -- pacman's version comparison (libalpm vercmp) --
+
+def _is_alnum(c: str) -> bool:
+    return c.isascii() and c.isalnum()
+
+
+def _rpmvercmp(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    i = j = 0
+    seg1 = seg2 = 0  # end of the previous segment
+    while i < len(a) and j < len(b):
+        while i < len(a) and not _is_alnum(a[i]):
+            i += 1
+        while j < len(b) and not _is_alnum(b[j]):
+            j += 1
+        if i >= len(a) or j >= len(b):
+            break
+        # Different separator lengths decide on their own
+        if i - seg1 != j - seg2:
+            return -1 if i - seg1 < j - seg2 else 1
+        seg1, seg2 = i, j
+        isnum = a[seg1].isdigit()
+        test = str.isdigit if isnum else str.isalpha
+        while seg1 < len(a) and a[seg1].isascii() and test(a[seg1]):
+            seg1 += 1
+        while seg2 < len(b) and b[seg2].isascii() and test(b[seg2]):
+            seg2 += 1
+        one, two = a[i:seg1], b[j:seg2]
+        if not two:
+            # Numeric segments beat alpha ones
+            return 1 if isnum else -1
+        if isnum:
+            one, two = one.lstrip("0"), two.lstrip("0")
+            if len(one) != len(two):
+                return 1 if len(one) > len(two) else -1
+        if one != two:
+            return -1 if one < two else 1
+        i, j = seg1, seg2
+    rest1, rest2 = a[i:], b[j:]
+    if not rest1 and not rest2:
+        return 0
+    # A remaining alpha segment never beats an empty string
+    if (not rest1 and not rest2[:1].isalpha()) or rest1[:1].isalpha():
+        return -1
+    return 1
+
+
+def _parse_evr(evr: str) -> tuple[str, str, str | None]:
+    digits = 0
+    while digits < len(evr) and evr[digits].isdigit():
+        digits += 1
+    if digits < len(evr) and evr[digits] == ":":
+        epoch, rest = evr[:digits] or "0", evr[digits + 1:]
+    else:
+        epoch, rest = "0", evr
+    version, dash, release = rest.rpartition("-")
+    if not dash:
+        return epoch, rest, None
+    return epoch, version, release
+
+
+def vercmp(a: str, b: str) -> int:
+    """Compare two pacman versions like vercmp(8): -1, 0 or 1."""
+    if a == b:
+        return 0
+    epoch1, ver1, rel1 = _parse_evr(a)
+    epoch2, ver2, rel2 = _parse_evr(b)
+    result = _rpmvercmp(epoch1, epoch2)
+    if result == 0:
+        result = _rpmvercmp(ver1, ver2)
+        if result == 0 and rel1 is not None and rel2 is not None:
+            result = _rpmvercmp(rel1, rel2)
+    return result
+
+
+class AdvisoryIndex:
+    """Package -> advisories with a fixed version, compiled from the feed.
+
+    fixes() answers whether moving from one version to another installs a fix:
+    like arch-audit, every version older than the fixed one counts as affected.
+    Answers are memoized per (package, old, new), so tagging the same update
+    on many hosts costs one dictionary lookup each, and packages without any
+    advisory are skipped before any version is compared.
+    """
+
+    def __init__(self, entries: dict[str, tuple[Advisory, ...]] | None = None):
+        self._entries = entries or {}
+        self._fixes: dict[tuple[str, str, str], tuple[Advisory, ...]] = {}
+
+    @classmethod
+    def from_feed(cls, groups: list[dict]) -> "AdvisoryIndex":
+        entries: dict[str, list[Advisory]] = {}
+        for group in groups:
+            fixed = group.get("fixed")
+            if not fixed or group.get("status") == "Not affected":
+                continue
+            advisory = Advisory(
+                group=group.get("name", ""),
+                severity=group.get("severity") or "Unknown",
+                type=group.get("type") or "",
+                affected=group.get("affected") or "",
+                fixed=fixed,
+                advisories=tuple(group.get("advisories") or ()),
+                issues=tuple(group.get("issues") or ()),
+            )
+            for package in group.get("packages") or ():
+                entries.setdefault(package, []).append(advisory)
+        return cls({pkg: tuple(advs) for pkg, advs in entries.items()})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fixes(self, package: str, old_version: str, new_version: str) -> tuple[Advisory, ...]:
+        candidates = self._entries.get(package)
+        if not candidates:
+            return ()
+        key = (package, old_version, new_version)
+        found = self._fixes.get(key)
+        if found is None:
+            found = tuple(
+                a for a in candidates
+                if vercmp(old_version, a.fixed) < 0 <= vercmp(new_version, a.fixed)
+            )
+            self._fixes[key] = found
+        return found
+
+    def tag(self, updates: list[UpdateInfo]) -> None:
+        """Set the advisories each update fixes, in place."""
+        entries = self._entries
+        for u in updates:
+            u.advisories = (
+                self.fixes(u.package, u.old_version, u.new_version)
+                if u.package in entries else ()
+            )
+
+
+def load_feed(path: Path = FEED_CACHE) -> list[dict] | None:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, list) else None
+
+
+def feed_age(path: Path = FEED_CACHE) -> float | None:
+    """Seconds since the cached feed was written, or None without a cache."""
+    try:
+        return time.time() - os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class AdvisoryFetcher(QThread):
+    """Load the advisory feed and compile it into an AdvisoryIndex.
+
+    The cached copy is used as is unless it is older than max_age. The source
+    is a URL or a local file (e.g. one kept current by arch-audit's cron job).
+    A failed download falls back to the cached copy.
+    """
+
+    loaded = pyqtSignal(object)  # AdvisoryIndex
+    error = pyqtSignal(str)
+
+    def __init__(self, source: str = DEFAULT_FEED_URL, max_age: float = 6 * 3600,
+                 cache: Path = FEED_CACHE):
+        super().__init__()
+        self.source = source
+        self.max_age = max_age
+        self.cache = cache
+
+    def run(self):
+        age = feed_age(self.cache)
+        groups = load_feed(self.cache) if age is not None and age < self.max_age else None
+        if groups is None:
+            try:
+                groups = self._download()
+            except Exception as e:
+                self.error.emit(f"Advisory feed unavailable: {e}")
+                groups = load_feed(self.cache)
+        if groups is not None:
+            self.loaded.emit(AdvisoryIndex.from_feed(groups))
+
+    def _download(self) -> list[dict]:
+        if "://" in self.source:
+            # Imported here: urllib pulls in ssl and http, which the tray otherwise never needs
+            import urllib.request
+
+            with urllib.request.urlopen(self.source, timeout=30) as response:
+                raw = response.read()
+        else:
+            raw = Path(self.source).expanduser().read_bytes()
+        groups = json.loads(raw)
+        if not isinstance(groups, list):
+            raise ValueError("unexpected feed format")
+        self.cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache.with_suffix(".tmp")
+        tmp.write_bytes(raw)
+        tmp.replace(self.cache)
+        return groups
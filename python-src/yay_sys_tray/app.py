@@ -1,21 +1,60 @@
+import shlex
+import sys
+import time
 from datetime import datetime, timedelta
 
 from PyQt6.QtCore import QObject, QProcess, Qt, QTimer
 from PyQt6.QtGui import QAction, QIcon
-from PyQt6.QtWidgets import QApplication, QMenu, QSystemTrayIcon
-
-from yay_sys_tray.checker import CheckResult, UpdateChecker, UpdateInfo
+from PyQt6.QtWidgets import QApplication, QMenu, QMessageBox, QSystemTrayIcon
+
+from yay_sys_tray.advisories import (
+    FEED_CACHE,
+    AdvisoryFetcher,
+    AdvisoryIndex,
+    highest_severity,
+    severity_rank,
+)
+from yay_sys_tray.checker import (
+    RESTART_PACKAGES,
+    CheckResult,
+    UpdateChecker,
+    UpdateInfo,
+    format_size,
+    size_summary,
+)
 from yay_sys_tray.config import AppConfig, is_arch_linux
+from yay_sys_tray.depgraph import GraphLoader
+from yay_sys_tray.diagnostics import DIAGNOSTICS_DIR, Diagnostics, rss_kib
+from yay_sys_tray.fleet import FleetResult, FleetUpdater
+from yay_sys_tray.history import CheckStats, HistoryStore
 from yay_sys_tray.icons import (
     create_bounce_icon,
     create_checking_frames,
     create_error_icon,
+    create_offline_icon,
     create_ok_icon,
     create_reboot_icon,
     create_restart_icon,
+    create_security_icon,
     create_updates_icon,
 )
-from yay_sys_tray.tailscale import HostResult, RemoteCheckResult, TailscaleChecker
+from yay_sys_tray.index import LOCAL_HOST, UpdateIndex
+from yay_sys_tray.metadata import MetadataCache
+from yay_sys_tray.netprobe import ConnectivityProbe, ProbeResult
+from yay_sys_tray.pacmanlog import (
+    Reconciler,
+    ReconcileResult,
+    apply_changes,
+    log_size,
+    reconcile_host,
+)
+from yay_sys_tray.power import PowerMonitor, PowerState
+from yay_sys_tray.pkgcache import CacheCleaner, CacheReport, CacheScanner, PackageCacheIndex
+from yay_sys_tray.prefetch import PrefetchResult, Prefetcher, cachedir_args, clear_prefetch_dir
+from yay_sys_tray.sources import SOURCES, UpdateSource, create_sources
+from yay_sys_tray.state import StateDiff, UpdateState, describe_updates
+from yay_sys_tray.tailscale import HostLatency, HostResult, RemoteCheckResult, TailscaleChecker
+from yay_sys_tray.watcher import PacmanWatcher
 
 TERMINAL_CMDS = {
     "kitty": ["kitty", "--hold"],
@@ -25,6 +64,18 @@ TERMINAL_CMDS = {
     "xterm": ["xterm", "-hold", "-e"],
 }
 
+# Remote hosts listed by name in the tooltip; the rest are only counted
+TOOLTIP_MAX_HOSTS = 5
+# Seconds between connectivity probes while offline, doubling up to the maximum
+OFFLINE_RETRY_MIN = 15
+OFFLINE_RETRY_MAX = 300
+
+
+def host_urgency(host: HostResult) -> tuple:
+    """Sort key putting hosts that need a restart first, then unreachable ones,
+    then the most pending updates."""
+    return (not host.needs_restart, not host.error, -len(host.updates), host.hostname)
+
 
 class TrayApp(QObject):
     def __init__(self, config: AppConfig):
@@ -35,10 +86,50 @@ class TrayApp(QObject):
         self.local_result: CheckResult | None = None
         self.remote_updates: list[HostResult] = []
         self.checker: UpdateChecker | None = None
+        self.prober: ConnectivityProbe | None = None
+        self._offline: ProbeResult | None = None
+        self._tailnet_status = ""
         self.tailscale_checker: TailscaleChecker | None = None
+        self.host_latency = HostLatency()
         self.update_process: QProcess | None = None
+        self._remote_processes: dict[str, QProcess] = {}
+        self.fleet_updater: FleetUpdater | None = None
+        self._fleet_status: dict[str, str] = {}  # hostname -> rollout state, while one runs
+        self._fleet_counts = (0, 0, 0)  # done, failed, total
+        self.host_rechecker: TailscaleChecker | None = None
+        self.prefetcher: Prefetcher | None = None
+        self.graph_loader: GraphLoader | None = None
+        self.advisory_index = AdvisoryIndex()
+        self.advisory_fetcher: AdvisoryFetcher | None = None
+        self._advisory_error = ""  # why the last download failed, until one succeeds
+        self._advisory_failed = False  # the running fetch reported an error
+        self._reconcilers: dict[str, Reconciler] = {}
+        self._log_offset = log_size()
+        self._reconcile_again: set[str] = set()
+        self._chained_sources: list[UpdateSource] = []  # sources whose update commands followed yay
+        self._recheck_sources: list[UpdateSource] = []  # re-checked by the next local reconcile
+        self._prefetch_status = ""
+        self._prefetch_consumed = False
+        self.package_cache = PackageCacheIndex()
+        self.cache_scanner: CacheScanner | None = None
+        self.cache_cleaner: CacheCleaner | None = None
+        self._cache_report: CacheReport | None = None
+        self._cache_status = ""
+        self._tooltip_lines: list[str] = []
+        self._power_status = ""
+        self._power_deferred = False  # remote checks or prefetch skipped to save power
+        self.metadata = MetadataCache()
+        self.update_index = UpdateIndex()
+        self.history: HistoryStore | None = None
+        self._check_stats: CheckStats | None = None
+        self._check_clock = 0.0
+        self._apply_history_config()
         self.last_check_time: datetime | None = None
-        self._old_count = 0
+        self._check_error: str | None = None
+        self.state = UpdateState()
+        self._icon_key: tuple | None = None
+        self._icon_stale = False
+        self._tooltip = ""
         self._updates_dialog = None
         self._settings_dialog = None
 
@@ -58,7 +149,7 @@ class TrayApp(QObject):
         # Tray icon
         self.tray = QSystemTrayIcon()
         self.tray.setIcon(create_ok_icon())
-        self.tray.setToolTip("Yay Update Checker - No checks yet")
+        self._set_tooltip("Yay Update Checker - No checks yet")
         self.tray.activated.connect(self._on_tray_activated)
 
         # Context menu
@@ -78,6 +169,40 @@ class TrayApp(QObject):
         self.action_update.setEnabled(self.is_arch)
         self.menu.addAction(self.action_update)
 
+        self.action_update_hosts = QAction("Update All Hosts")
+        self.action_update_hosts.triggered.connect(lambda: self.update_all_hosts(restart=False))
+        self.action_update_hosts.setEnabled(False)
+        self.action_update_hosts.setVisible(self.config.tailscale_enabled)
+        self.menu.addAction(self.action_update_hosts)
+
+        self.action_cancel_hosts = QAction("Cancel Host Updates")
+        self.action_cancel_hosts.triggered.connect(self.cancel_host_updates)
+        self.action_cancel_hosts.setVisible(False)
+        self.menu.addAction(self.action_cancel_hosts)
+
+        # Filled from the current results each time it opens
+        self.menu_hosts = QMenu("Hosts")
+        self.menu_hosts.aboutToShow.connect(self._populate_hosts_menu)
+        self._hosts_menu_dirty = True
+        self.action_hosts = self.menu.addMenu(self.menu_hosts)
+        self.action_hosts.setVisible(False)
+
+        self.action_clean_cache = QAction("Clean Package Cache")
+        self.action_clean_cache.triggered.connect(self.clean_package_cache)
+        self.action_clean_cache.setEnabled(False)
+        self.action_clean_cache.setVisible(self.is_arch)
+        self.menu.addAction(self.action_clean_cache)
+
+        self.action_cancel_prefetch = QAction("Cancel Download")
+        self.action_cancel_prefetch.triggered.connect(self.cancel_prefetch)
+        self.action_cancel_prefetch.setVisible(False)
+        self.menu.addAction(self.action_cancel_prefetch)
+
+        self.action_snapshot = QAction("Take Memory Snapshot")
+        self.action_snapshot.triggered.connect(self._on_snapshot_action)
+        self.action_snapshot.setVisible(False)
+        self.menu.addAction(self.action_snapshot)
+
         self.menu.addSeparator()
 
         self.action_settings = QAction("Settings")
@@ -90,38 +215,462 @@ class TrayApp(QObject):
 
         self.action_quit = QAction("Quit")
         self.action_quit.triggered.connect(QApplication.quit)
+        QApplication.instance().aboutToQuit.connect(self._on_about_to_quit)
         self.menu.addAction(self.action_quit)
 
         self.tray.setContextMenu(self.menu)
 
-        # Periodic check timer
+        # Periodic check timer, stretched on battery or metered networks
         self.timer = QTimer()
         self.timer.timeout.connect(self.start_check)
+        self.power_monitor = PowerMonitor(parent=self)
+        self.power_monitor.changed.connect(self._on_power_changed)
+        self._saving = False
+        self._apply_power_config()
         self._restart_timer()
 
+        # Full check deferred after an upgrade has been reconciled
+        self._deferred_check = QTimer()
+        self._deferred_check.setSingleShot(True)
+        self._deferred_check.timeout.connect(self.start_check)
+
+        # While offline, a quiet probe re-arms the check once the network is back
+        self._offline_timer = QTimer()
+        self._offline_timer.setSingleShot(True)
+        self._offline_timer.timeout.connect(self._probe_while_offline)
+        self._offline_retry = OFFLINE_RETRY_MIN
+
         # Initial check after a short delay
         QTimer.singleShot(2000, self.start_check)
 
+        # Opt-in memory diagnostics
+        self.diagnostics = Diagnostics(self.config.diagnostics_interval_minutes, parent=self)
+        self._apply_diagnostics_config()
+
+        # Security advisory feed, on its own schedule
+        self._advisory_timer = QTimer()
+        self._advisory_timer.timeout.connect(self._refresh_advisories)
+        self._apply_advisory_config()
+
+        # Build the dependency graph in the background so the first
+        # dependency view opens instantly
+        if self.is_arch:
+            QTimer.singleShot(5000, self._refresh_dependency_graph)
+
+        # Pick up transactions run outside the tray (pacman by hand, config management)
+        self.pacman_watcher: PacmanWatcher | None = None
+        if self.is_arch:
+            self.pacman_watcher = PacmanWatcher(parent=self)
+            self.pacman_watcher.log_appended.connect(lambda: self._reconcile(LOCAL_HOST))
+            self.pacman_watcher.db_changed.connect(self._refresh_dependency_graph)
+
     def show(self):
         self.tray.show()
 
+    # -- Control socket --
+
+    def control_handlers(self) -> dict:
+        """Handlers for the commands accepted by the control socket."""
+        return {
+            "status": self.status,
+            "check": lambda: self.start_check() or "started",
+            "show": lambda: self.show_updates_dialog() or "shown",
+            "quit": lambda: QTimer.singleShot(0, QApplication.quit) or "quitting",
+            "snapshot": self.memory_snapshot,
+        }
+
+    def status(self) -> dict:
+        """Current results as plain data, straight from memory."""
+        result = self.local_result
+        checking = any(
+            t is not None and t.isRunning()
+            for t in (self.prober, self.checker, self.tailscale_checker)
+        )
+        next_check = None
+        if self.last_check_time is not None:
+            next_check = self.last_check_time + timedelta(minutes=self._check_interval())
+        reboot = result.reboot_info if result is not None else None
+        return {
+            "checking": checking,
+            "last_check": self.last_check_time.isoformat() if self.last_check_time else None,
+            "next_check": next_check.isoformat() if next_check else None,
+            "error": self._check_error,
+            "offline": self._offline.detail if self._offline is not None else None,
+            "power_saving": self.power_monitor.state.describe() if self._saving else None,
+            "total": len(self.updates) + sum(len(h.updates) for h in self.remote_updates),
+            "reboot_needed": bool(reboot and reboot.needed),
+            "package_cache": {
+                "total_size": self._cache_report.total_size,
+                "reclaimable_size": self._cache_report.reclaimable_size,
+                "orphaned_size": self._cache_report.orphaned_size,
+            } if self._cache_report is not None else None,
+            "local": {
+                "needs_restart": bool(result and result.needs_restart),
+                "source_errors": dict(result.source_errors) if result is not None else {},
+                "updates": [
+                    {
+                        "package": u.package,
+                        "old_version": u.old_version,
+                        "new_version": u.new_version,
+                        "repository": u.repository,
+                        "download_size": u.download_size,
+                        "installed_delta": u.installed_delta,
+                        "advisories": [a.label for a in u.advisories],
+                    }
+                    for u in self.updates
+                ],
+            },
+            "hosts": [
+                {
+                    "hostname": h.hostname,
+                    "updates": len(h.updates),
+                    "download_size": sum(u.download_size for u in h.updates),
+                    "needs_restart": h.needs_restart,
+                    "security": sum(1 for u in h.updates if u.advisories),
+                    "error": h.error,
+                    "connect_seconds": h.connect_seconds,
+                    "command_seconds": h.command_seconds,
+                }
+                for h in sorted(self.remote_updates, key=host_urgency)
+            ],
+        }
+
+    def _on_about_to_quit(self):
+        """Stop background work before the objects it reports to are torn down."""
+        for timer in (self.timer, self._deferred_check, self._offline_timer, self._advisory_timer):
+            timer.stop()
+        self.tray.hide()
+        # These can take many minutes, so their subprocesses are killed
+        for worker in (self.fleet_updater, self.prefetcher):
+            if worker is not None:
+                worker.cancel()
+        # The rest run their subprocesses with timeouts, so waiting is bounded;
+        # the cache cleaner's privileged rm is left to finish
+        workers = [
+            self.prober, self.checker, self.tailscale_checker, self.host_rechecker,
+            self.fleet_updater, self.prefetcher, self.graph_loader, self.advisory_fetcher,
+            self.cache_scanner, self.cache_cleaner, *self._reconcilers.values(),
+        ]
+        for worker in workers:
+            if worker is not None:
+                worker.wait()
+        dialogs = sys.modules.get("yay_sys_tray.dialogs")
+        if dialogs is not None:  # only imported once a window was opened
+            dialogs.wait_for_workers()
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+
+    def _apply_diagnostics_config(self):
+        self.diagnostics.set_interval(self.config.diagnostics_interval_minutes)
+        if self.config.diagnostics_enabled:
+            self.diagnostics.start()
+        else:
+            self.diagnostics.stop()
+        self.action_snapshot.setVisible(self.config.diagnostics_enabled)
+
+    def memory_snapshot(self) -> str:
+        """Write a tracemalloc report; returns its path."""
+        if not self.diagnostics.active:
+            raise RuntimeError("memory diagnostics are off (enable them in Settings)")
+        return self.diagnostics.snapshot()
+
+    def _on_snapshot_action(self):
+        path = self.memory_snapshot()
+        self.tray.showMessage(
+            "Memory Snapshot", f"Written to {path}",
+            QSystemTrayIcon.MessageIcon.Information, 5000,
+        )
+
+    def _apply_history_config(self):
+        if not self.config.history_enabled:
+            if self.history is not None:
+                self.history.close()
+                self.history = None
+            return
+        if self.history is None:
+            self.history = HistoryStore(retention_days=self.config.history_retention_days)
+        self.history.retention_days = self.config.history_retention_days
+
+    def _record_history(self):
+        """Queue the current results for the history store (written off the GUI thread)."""
+        if self.history is None:
+            return
+        snapshot = {h.hostname: h.updates for h in self.remote_updates if not h.error}
+        if self.is_arch:
+            snapshot[LOCAL_HOST] = self.updates
+        check, self._check_stats = self._check_stats, None
+        if check is not None:
+            check.unreachable = sum(1 for h in self.remote_updates if h.error)
+        self.history.record(snapshot, check)
+
+    def _apply_advisory_config(self):
+        if not self.config.advisories_enabled:
+            self._advisory_timer.stop()
+            if len(self.advisory_index):
+                self._on_advisories_loaded(AdvisoryIndex())
+            self._set_advisory_error("")
+            return
+        self._advisory_timer.start(self.config.advisories_refresh_hours * 3600 * 1000)
+        self._refresh_advisories()
+
+    def _refresh_advisories(self):
+        """Load the cached advisory feed, downloading it first when it is due."""
+        if self.advisory_fetcher is not None or not self.config.advisories_enabled:
+            return
+        self.advisory_fetcher = AdvisoryFetcher(
+            self.config.advisories_feed,
+            max_age=self.config.advisories_refresh_hours * 3600,
+        )
+        self._advisory_failed = False
+        self.advisory_fetcher.loaded.connect(self._on_advisories_loaded)
+        self.advisory_fetcher.error.connect(self._on_advisory_error)
+        self.advisory_fetcher.finished.connect(self._on_advisory_fetcher_finished)
+        self.advisory_fetcher.start()
+
+    def _advisory_fetch_stale(self) -> bool:
+        """The running fetch is for a feed the settings have since replaced."""
+        fetcher = self.advisory_fetcher
+        return fetcher is not None and fetcher.source != self.config.advisories_feed
+
+    def _on_advisories_loaded(self, index: AdvisoryIndex):
+        if self._advisory_fetch_stale():
+            return
+        self.advisory_index = index
+        if self.local_result is None:
+            return
+        self._update_tray_state(notify=False)
+        # Tags changed in place, which the keyed state does not see
+        if self._updates_dialog is not None and self.state:
+            self._updates_dialog.refresh(self.updates, self.remote_updates)
+
+    def _on_advisory_error(self, message: str):
+        if self._advisory_fetch_stale():
+            return
+        self._advisory_failed = True
+        self._set_advisory_error(message)
+
+    def _on_advisory_fetcher_finished(self):
+        stale = self._advisory_fetch_stale()
+        if not stale and not self._advisory_failed:
+            self._set_advisory_error("")
+        self.advisory_fetcher = None
+        if stale:
+            # It may have cached the old feed after the settings removed it
+            FEED_CACHE.unlink(missing_ok=True)
+            self._refresh_advisories()
+
+    def _set_advisory_error(self, message: str):
+        if message == self._advisory_error:
+            return
+        self._advisory_error = message
+        if self.local_result is not None:
+            self._update_tray_state(notify=False)
+
+    # -- Package cache --
+
+    def _scan_package_cache(self):
+        """Update the package cache index in the background; cheap when nothing changed."""
+        if self.cache_scanner is not None or self.cache_cleaner is not None:
+            return
+        self.cache_scanner = CacheScanner(self.package_cache, keep=self.config.cache_keep_versions)
+        self.cache_scanner.scanned.connect(self._on_cache_scanned)
+        self.cache_scanner.finished.connect(self._on_cache_scanner_finished)
+        self.cache_scanner.start()
+
+    def _on_cache_scanned(self, report: CacheReport):
+        self._cache_report = report
+        self._cache_status = f"Package cache: {format_size(report.total_size)}"
+        if report.clean_size:
+            self._cache_status += f", {format_size(report.clean_size)} reclaimable"
+            self.action_clean_cache.setText(f"Clean Package Cache ({format_size(report.clean_size)})")
+        else:
+            self.action_clean_cache.setText("Clean Package Cache")
+        self.action_clean_cache.setEnabled(bool(report.clean_size) and self.cache_cleaner is None)
+        # Leave a "checking", error or offline tooltip alone; the next state update includes the line
+        if (self.local_result is not None and self._check_error is None and self._offline is None
+                and not self._spin_timer.isActive()):
+            self._refresh_tooltip()
+
+    def _on_cache_scanner_finished(self):
+        self.cache_scanner = None
+
+    def clean_package_cache(self):
+        """Remove what the last scan found reclaimable, after confirmation."""
+        report = self._cache_report
+        if report is None or not report.clean_paths or self.cache_cleaner is not None:
+            return
+        old = sum(1 for p in report.reclaimable if not p.endswith(".sig"))
+        orphaned = sum(1 for p in report.orphaned if not p.endswith(".sig"))
+        answer = QMessageBox.question(
+            None,
+            "Clean Package Cache",
+            f"Remove {old} old package version(s) ({format_size(report.reclaimable_size)}) and "
+            f"{orphaned} package(s) no longer installed ({format_size(report.orphaned_size)})?\n\n"
+            f"The newest {self.config.cache_keep_versions} version(s) of each installed "
+            f"package are kept.",
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        self.cache_cleaner = CacheCleaner(self.package_cache, report.clean_paths)
+        self.cache_cleaner.cleaned.connect(self._on_cache_cleaned)
+        self.cache_cleaner.finished.connect(self._on_cache_cleaner_finished)
+        self.action_clean_cache.setEnabled(False)
+        self.cache_cleaner.start()
+
+    def _on_cache_cleaned(self, freed: int, error: str):
+        if error:
+            self.tray.showMessage(
+                "Package Cache", f"Cleaning failed: {error}",
+                QSystemTrayIcon.MessageIcon.Warning, 5000,
+            )
+        else:
+            self.tray.showMessage(
+                "Package Cache", f"Freed {format_size(freed)}",
+                QSystemTrayIcon.MessageIcon.Information, 5000,
+            )
+
+    def _on_cache_cleaner_finished(self):
+        self.cache_cleaner = None
+        # The cleaner already dropped the removed files from the index
+        self._scan_package_cache()
+
+    def _refresh_dependency_graph(self):
+        if self.graph_loader is not None:
+            return
+        self.graph_loader = GraphLoader()
+        self.graph_loader.finished.connect(self._on_graph_loader_finished)
+        self.graph_loader.start()
+
+    def _on_graph_loader_finished(self):
+        self.graph_loader = None
+
+    def _check_interval(self) -> int:
+        """Minutes between periodic checks, stretched while saving power."""
+        minutes = self.config.check_interval_minutes
+        if self._saving:
+            minutes *= self.config.power_saving_interval_factor
+        return minutes
+
     def _restart_timer(self):
-        interval_ms = self.config.check_interval_minutes * 60 * 1000
+        interval_ms = self._check_interval() * 60 * 1000
         self.timer.start(interval_ms)
 
+    # -- Power and metered networks --
+
+    def _apply_power_config(self):
+        if self.config.power_saving:
+            self.power_monitor.start()
+        else:
+            self.power_monitor.stop()
+        self._on_power_changed(self.power_monitor.state)
+
+    def _on_power_changed(self, state: PowerState):
+        saving = self.config.power_saving and state.constrained
+        self._power_status = f"Saving power: {state.describe()}" if saving else ""
+        changed = saving != self._saving
+        self._saving = saving
+        if changed:
+            if saving:
+                self._stop_spin_animation()
+                self._stop_bounce()
+            self._restart_timer()
+        checking = any(t is not None for t in (self.prober, self.checker, self.tailscale_checker))
+        if self._tooltip_lines and not checking and self._check_error is None and self._offline is None:
+            self._refresh_tooltip()
+        if not changed or saving:
+            return
+        # Conditions improved: catch up on what was skipped or is overdue
+        overdue = self.last_check_time is not None and (
+            datetime.now() - self.last_check_time
+            >= timedelta(minutes=self.config.check_interval_minutes)
+        )
+        if self._power_deferred or overdue:
+            self.start_check()
+
     def start_check(self):
+        self._deferred_check.stop()
         if self.checker is not None and self.checker.isRunning():
             return
         if self.tailscale_checker is not None and self.tailscale_checker.isRunning():
             return
+        if self.prober is not None and self.prober.isRunning():
+            return
+        self.cancel_prefetch()
         self._stop_bounce()
         self._start_spin()
-        self.tray.setToolTip("Checking for updates...")
+        self._set_tooltip("Checking for updates...")
         self.action_check.setEnabled(False)
-        self._old_count = len(self.updates) + sum(
-            len(h.updates) for h in self.remote_updates
+        self._check_stats = CheckStats(started=time.time())
+
+        if self.config.offline_probe and (self.is_arch or self.config.tailscale_enabled):
+            # Fail fast when offline instead of waiting for every timeout
+            self.prober = self._create_prober()
+            self.prober.probed.connect(self._on_probed)
+            self.prober.start()
+            return
+        self._run_checks()
+
+    def _create_prober(self) -> ConnectivityProbe:
+        # Without local checks, only Tailscale (or a configured host) tells whether the network is up
+        prober = ConnectivityProbe(
+            self.config.probe_host, mirrors=self.is_arch, tailscale=self.config.tailscale_enabled,
         )
+        prober.finished.connect(self._on_prober_finished)
+        return prober
 
+    def _on_prober_finished(self):
+        self.prober = None
+
+    def _on_probed(self, result: ProbeResult):
+        if not result.online:
+            self._go_offline(result)
+            return
+        self._back_online()
+        self._tailnet_status = "" if result.tailnet_up else f"Tailscale: {result.tailnet}"
+        self._run_checks()
+
+    def _go_offline(self, result: ProbeResult):
+        self._offline = result
+        self._check_stats = None
+        self._stop_spin()
+        self._show_state_icon(("offline",))
+        lines = [f"Offline: {result.detail}", "Checking again when the network is back"]
+        if self.last_check_time is not None:
+            total = len(self.updates) + sum(len(h.updates) for h in self.remote_updates)
+            lines.append(f"{total} update(s) as of {self._format_time()}")
+        self._set_tooltip("\n".join(lines))
+        self.action_check.setEnabled(True)
+        if not self._offline_timer.isActive():
+            self._offline_timer.start(self._offline_retry * 1000)
+
+    def _back_online(self):
+        self._offline = None
+        self._offline_timer.stop()
+        self._offline_retry = OFFLINE_RETRY_MIN
+
+    def _probe_while_offline(self):
+        """Re-probe without the spinner; a full check starts once it succeeds."""
+        if self._offline is None or self.prober is not None:
+            return
+        self.prober = self._create_prober()
+        self.prober.probed.connect(self._on_reprobed)
+        self.prober.start()
+
+    def _on_reprobed(self, result: ProbeResult):
+        if result.online:
+            self._back_online()
+            QTimer.singleShot(0, self.start_check)
+            return
+        self._offline = result
+        self._offline_retry = min(self._offline_retry * 2, OFFLINE_RETRY_MAX)
+        self._offline_timer.start(self._offline_retry * 1000)
+
+    def _run_checks(self):
+        self._check_clock = time.monotonic()
+        if not self._saving:
+            # Remote checks and prefetch run this time
+            self._power_deferred = False
         if not self.is_arch:
             # Skip local check; feed an empty result to chain into Tailscale
             self._on_check_complete(
@@ -131,7 +680,7 @@ class TrayApp(QObject):
                 self.action_check.setEnabled(True)
             return
 
-        self.checker = UpdateChecker()
+        self.checker = UpdateChecker(self.metadata, create_sources(self.config.update_sources))
         self.checker.check_complete.connect(self._on_check_complete)
         self.checker.check_error.connect(self._on_check_error)
         self.checker.finished.connect(self._on_thread_finished)
@@ -140,7 +689,8 @@ class TrayApp(QObject):
     # -- Spin animation (checking) --
 
     def _start_spin(self):
-        if not self.config.animations:
+        self._icon_stale = True
+        if not self.config.animations or self._saving:
             self.tray.setIcon(self._spin_frames[0])
             return
         self._spin_index = 0
@@ -150,6 +700,12 @@ class TrayApp(QObject):
     def _stop_spin(self):
         self._spin_timer.stop()
 
+    def _stop_spin_animation(self):
+        """Hold the first spinner frame, e.g. when power saving starts mid-check."""
+        if self._spin_timer.isActive():
+            self._spin_timer.stop()
+            self.tray.setIcon(self._spin_frames[0])
+
     def _spin_tick(self):
         self._spin_index = (self._spin_index + 1) % len(self._spin_frames)
         self.tray.setIcon(self._spin_frames[self._spin_index])
@@ -157,7 +713,7 @@ class TrayApp(QObject):
     # -- Bounce animation (updates found) --
 
     def _start_bounce(self, icon: QIcon, interval: int = 250, ticks: int = 8):
-        if not self.config.animations:
+        if not self.config.animations or self._saving:
             return
         self._bounce_icon = icon
         self._bounce_small = create_bounce_icon(icon, 0.65)
@@ -187,12 +743,23 @@ class TrayApp(QObject):
         self.updates = result.updates
         self.local_result = result
         self.last_check_time = datetime.now()
-
-        # Chain remote check if Tailscale is enabled
-        if self.config.tailscale_enabled:
+        self._check_error = None
+        if self._check_stats is not None and self.is_arch:
+            self._check_stats.local_seconds = time.monotonic() - self._check_clock
+        self._check_clock = time.monotonic()
+        if self.is_arch:
+            self._scan_package_cache()
+
+        # Chain remote check if Tailscale is enabled and connected
+        if self.config.tailscale_enabled and not self._tailnet_status:
             tags = [f"tag:{t.strip()}" for t in self.config.tailscale_tags.split(",") if t.strip()]
+            if tags and self._saving:
+                # Keep the last remote results; the hosts are checked once power is back
+                self._power_deferred = True
+                self._update_tray_state()
+                return
             if tags:
-                self.tailscale_checker = TailscaleChecker(tags, self.config.tailscale_timeout)
+                self.tailscale_checker = self._remote_checker(tags)
                 self.tailscale_checker.check_complete.connect(self._on_remote_check_complete)
                 self.tailscale_checker.check_error.connect(self._on_remote_check_error)
                 self.tailscale_checker.finished.connect(self._on_remote_thread_finished)
@@ -202,44 +769,72 @@ class TrayApp(QObject):
         self.remote_updates = []
         self._update_tray_state()
 
+    def _remote_checker(self, tags: list[str], hostnames: list[str] | None = None) -> TailscaleChecker:
+        return TailscaleChecker(
+            tags,
+            self.config.tailscale_timeout,
+            metadata=self.metadata,
+            hostnames=hostnames,
+            latency=self.host_latency,
+            timeout_min=self.config.tailscale_timeout_min,
+            command_timeout=self.config.tailscale_command_timeout,
+        )
+
     def _on_remote_check_complete(self, result: RemoteCheckResult):
         self.remote_updates = result.hosts
+        if self._check_stats is not None:
+            self._check_stats.remote_seconds = time.monotonic() - self._check_clock
         self._update_tray_state()
 
     def _on_remote_check_error(self, error_msg: str):
         self.remote_updates = []
         self._update_tray_state()
 
-    def _update_tray_state(self):
+    def _update_tray_state(self, notify: bool = True):
         self._stop_spin()
         result = self.local_result
         if result is None:
             return
+        if self.prefetcher is None:
+            self._prefetch_status = ""
+
+        # Unreachable hosts keep their last known entries in the state
+        snapshot = {h.hostname: h.updates for h in self.remote_updates if not h.error}
+        snapshot[LOCAL_HOST] = result.updates
+        for host_updates in snapshot.values():
+            self.advisory_index.tag(host_updates)
+        security_keys = {
+            (host, u.package, u.new_version)
+            for host, host_updates in snapshot.items() for u in host_updates if u.advisories
+        }
+        diff = self.state.apply(snapshot, {LOCAL_HOST} | {h.hostname for h in self.remote_updates})
+
+        self.update_index.update_host(LOCAL_HOST, result.updates)
+        for host in self.remote_updates:
+            self.update_index.update_host(host.hostname, host.updates)
+        self.update_index.retain_hosts(
+            {LOCAL_HOST} | {h.hostname for h in self.remote_updates}
+        )
+        self.metadata.retain(
+            {(u.package, u.new_version) for u in result.updates}
+            | {(u.package, u.new_version) for h in self.remote_updates for u in h.updates}
+        )
+        self._record_history()
 
         local_count = len(result.updates)
         remote_update_count = sum(len(h.updates) for h in self.remote_updates)
         remote_needs_restart = any(h.needs_restart for h in self.remote_updates)
         total_count = local_count + remote_update_count
         any_restart = result.needs_restart or remote_needs_restart
+        severity = max(
+            (highest_severity(u.advisories) for ups in snapshot.values() for u in ups if u.advisories),
+            key=severity_rank, default="",
+        )
 
         # Build tooltip
         lines = []
         if self.remote_updates:
-            if self.is_arch:
-                local_label = f"Local: {local_count} update(s)"
-                if result.needs_restart:
-                    local_label += " (restart)"
-                lines.append(local_label)
-            for host in self.remote_updates:
-                if host.error:
-                    lines.append(f"{host.hostname}: unreachable")
-                elif host.updates:
-                    label = f"{host.hostname}: {len(host.updates)} update(s)"
-                    if host.needs_restart:
-                        label += " (restart)"
-                    lines.append(label)
-                else:
-                    lines.append(f"{host.hostname}: up to date")
+            lines.extend(self._fleet_summary_lines(result, local_count))
         else:
             if total_count == 0:
                 if self.is_arch:
@@ -248,52 +843,182 @@ class TrayApp(QObject):
                     lines.append("Local checks disabled")
             else:
                 lines.append(f"{total_count} update(s) available")
+                sizes = size_summary(result.updates)
+                if sizes:
+                    lines.append(sizes)
                 if result.needs_restart:
                     lines.append(f"Restart: {', '.join(result.restart_packages)}")
-        lines.append(f"Last check: {self._format_time()}  |  Next: {self._format_next_check()}")
 
-        # Set icon
+        for name, error in result.source_errors.items():
+            lines.append(f"{SOURCES[name].label}: {error}")
+        if self._advisory_error:
+            lines.append(self._advisory_error)
+
+        if security_keys:
+            lines.insert(
+                0, f"Security: {len(security_keys)} update(s) fix advisories ({severity})"
+            )
+
+        # Set icon, only when what it shows has changed
         reboot = result.reboot_info
         if total_count == 0 and reboot and reboot.needed:
-            icon = create_reboot_icon()
-            self.tray.setIcon(icon)
-            self.action_show.setEnabled(False)
-            self._start_bounce(icon, interval=1000, ticks=16)
+            icon_key = ("reboot", reboot.running_kernel)
             lines.insert(0, "Restart required")
             lines.insert(1, f"Running: {reboot.running_kernel}")
             if reboot.installed_kernel:
                 lines.insert(2, f"Installed: {reboot.installed_kernel}")
         elif total_count == 0:
-            self.tray.setIcon(create_ok_icon())
-            self.action_show.setEnabled(False)
+            icon_key = ("ok",)
+        elif security_keys:
+            icon_key = ("security", total_count)
         elif any_restart:
-            icon = create_restart_icon(total_count)
-            self.tray.setIcon(icon)
-            self.action_show.setEnabled(True)
-            self._start_bounce(icon)
+            icon_key = ("restart", total_count)
         else:
-            icon = create_updates_icon(total_count)
-            self.tray.setIcon(icon)
-            self.action_show.setEnabled(True)
-            self._start_bounce(icon)
+            icon_key = ("updates", total_count)
+        self.action_show.setEnabled(total_count > 0)
+        self._show_state_icon(icon_key)
 
-        self.tray.setToolTip("\n".join(lines))
+        self._tooltip_lines = lines
+        self._refresh_tooltip()
+        self._update_fleet_action()
+        self._hosts_menu_dirty = True
+        self.action_hosts.setVisible(bool(self.remote_updates))
 
-        # Refresh open updates dialog with latest data
+        # Refresh open updates dialog in place, keeping tabs and scroll positions
         if self._updates_dialog is not None:
-            self._updates_dialog.destroyed.disconnect(self._on_updates_dialog_closed)
-            self._updates_dialog.close()
-            self._updates_dialog = None
-            if total_count > 0:
-                self._open_updates_dialog()
+            if total_count == 0:
+                self._updates_dialog.close()
+            elif diff.changed:
+                self._updates_dialog.refresh(self.updates, self.remote_updates)
 
         if total_count > 0:
-            self._maybe_notify(total_count, self._old_count, restart=any_restart)
+            if notify:
+                self._maybe_notify(diff, total_count, restart=any_restart, security=security_keys)
+            self._start_prefetch()
+
+    def _show_state_icon(self, key: tuple):
+        if key == self._icon_key and not self._icon_stale:
+            return
+        changed = key != self._icon_key
+        self._icon_key = key
+        self._icon_stale = False
+        kind = key[0]
+        if kind == "reboot":
+            icon = create_reboot_icon()
+        elif kind == "ok":
+            icon = create_ok_icon()
+        elif kind == "offline":
+            icon = create_offline_icon()
+        elif kind == "restart":
+            icon = create_restart_icon(key[1])
+        elif kind == "security":
+            icon = create_security_icon(key[1])
+        else:
+            icon = create_updates_icon(key[1])
+        self.tray.setIcon(icon)
+        # Only a real change bounces; restoring the icon after a spin does not
+        if not changed:
+            self._bounce_icon = icon
+        elif kind == "reboot":
+            self._start_bounce(icon, interval=1000, ticks=16)
+        elif kind not in ("ok", "offline"):
+            self._start_bounce(icon)
+
+    def _fleet_summary_lines(self, result: CheckResult, local_count: int) -> list[str]:
+        """Tooltip lines for a fleet: totals plus the most urgent hosts.
+
+        The size is bounded regardless of the fleet size; the Hosts submenu
+        lists every host.
+        """
+        hosts = self.remote_updates
+        pending = [h for h in hosts if h.updates and not h.error]
+        restart = sum(1 for h in hosts if h.needs_restart and not h.error)
+        unreachable = sum(1 for h in hosts if h.error)
+        lines = []
+        if self.is_arch:
+            local_label = f"Local: {local_count} update(s)"
+            download = sum(u.download_size for u in result.updates)
+            if download:
+                local_label += f", {format_size(download)}"
+            if result.needs_restart:
+                local_label += " (restart)"
+            lines.append(local_label)
+        summary = f"Hosts: {len(pending)}/{len(hosts)} with updates"
+        if restart:
+            summary += f", {restart} need restart"
+        if unreachable:
+            summary += f", {unreachable} unreachable"
+        lines.append(summary)
+        urgent = sorted((h for h in hosts if h.updates or h.error), key=host_urgency)
+        for host in urgent[:TOOLTIP_MAX_HOSTS]:
+            lines.append(f"  {self._host_label(host)}")
+        if len(urgent) > TOOLTIP_MAX_HOSTS:
+            lines.append(f"  and {len(urgent) - TOOLTIP_MAX_HOSTS} more")
+        return lines
+
+    @staticmethod
+    def _host_label(host: HostResult) -> str:
+        if host.error:
+            return f"{host.hostname}: unreachable"
+        if not host.updates:
+            return f"{host.hostname}: up to date"
+        label = f"{host.hostname}: {len(host.updates)} update(s)"
+        download = sum(u.download_size for u in host.updates)
+        if download:
+            label += f", {format_size(download)}"
+        if host.needs_restart:
+            label += " (restart)"
+        return label
+
+    def _populate_hosts_menu(self):
+        """Rebuild the Hosts submenu, only if the results changed since it was last built."""
+        if not self._hosts_menu_dirty:
+            return
+        self._hosts_menu_dirty = False
+        self.menu_hosts.clear()
+        for host in sorted(self.remote_updates, key=host_urgency):
+            hostname = host.hostname
+            label = self._host_label(host)
+            if hostname in self._fleet_status:
+                label += f" [{self._fleet_status[hostname]}]"
+            submenu = self.menu_hosts.addMenu(label)
+            if host.updates and not host.error:
+                action = submenu.addAction("Update")
+                action.triggered.connect(lambda _=False, h=hostname: self._run_remote_update(h))
+                action.setEnabled(hostname not in self._remote_processes)
+                if host.needs_restart:
+                    action = submenu.addAction("Update and Restart")
+                    action.triggered.connect(
+                        lambda _=False, h=hostname: self._run_remote_update(h, restart=True)
+                    )
+                    action.setEnabled(hostname not in self._remote_processes)
+            action = submenu.addAction("Check Again")
+            action.triggered.connect(lambda _=False, h=hostname: self._recheck_hosts([h]))
+
+    def _set_tooltip(self, text: str):
+        if text != self._tooltip:
+            self._tooltip = text
+            self.tray.setToolTip(text)
+
+    def _refresh_tooltip(self):
+        lines = list(self._tooltip_lines)
+        if self._prefetch_status:
+            lines.append(self._prefetch_status)
+        if self._cache_status:
+            lines.append(self._cache_status)
+        if self._tailnet_status and self.config.tailscale_enabled:
+            lines.append(self._tailnet_status)
+        if self._power_status:
+            lines.append(self._power_status)
+        lines.append(f"Last check: {self._format_time()}  |  Next: {self._format_next_check()}")
+        self._set_tooltip("\n".join(lines))
 
     def _on_check_error(self, error_msg: str):
+        self._check_error = error_msg
         self._stop_spin()
+        self._icon_key = ("error",)
         self.tray.setIcon(create_error_icon())
-        self.tray.setToolTip(f"Error: {error_msg}")
+        self._set_tooltip(f"Error: {error_msg}")
 
     def _on_thread_finished(self):
         self.checker = None
@@ -305,23 +1030,98 @@ class TrayApp(QObject):
         if self.checker is None:
             self.action_check.setEnabled(True)
 
-    def _maybe_notify(self, new_count: int, old_count: int, restart: bool = False):
+    def _maybe_notify(
+        self,
+        diff: StateDiff,
+        total_count: int,
+        restart: bool = False,
+        security: set | None = None,
+    ):
         if self.config.notify == "never":
             return
-        if self.config.notify == "new_only" and new_count <= old_count:
+        if self.config.notify == "new_only" and not diff.added:
             return
-        if restart:
+        new_security = diff.added & security if security else set()
+        if new_security or (security and not diff.added):
+            title = "Security Updates Available"
+            icon = QSystemTrayIcon.MessageIcon.Critical
+        elif restart:
             title = "Updates Available (Restart Required)"
             icon = QSystemTrayIcon.MessageIcon.Warning
         else:
             title = "Updates Available"
             icon = QSystemTrayIcon.MessageIcon.Information
-        self.tray.showMessage(
-            title,
-            f"{new_count} package update(s) available",
-            icon,
-            5000,
+        if new_security:
+            message = f"Fixes advisories: {describe_updates(new_security)}"
+            if total_count > len(new_security):
+                message += f"\n{total_count} package update(s) pending in total"
+        elif diff.added:
+            message = f"New: {describe_updates(diff.added)}"
+            if total_count > len(diff.added):
+                message += f"\n{total_count} package update(s) pending in total"
+        else:
+            message = f"{total_count} package update(s) available"
+        self.tray.showMessage(title, message, icon, 5000)
+
+    # -- Background prefetch --
+
+    def _start_prefetch(self):
+        if not self.config.prefetch_enabled or self.prefetcher is not None:
+            return
+        if self._saving:
+            self._power_deferred = True
+            return
+        local = self.is_arch and any(u.is_package and u.repository != "aur" for u in self.updates)
+        hosts = [h.hostname for h in self._fleet_hosts()]
+        if not local and not hosts:
+            return
+        self._set_prefetch_status("Downloading updates...")
+        self.prefetcher = Prefetcher(
+            local=local,
+            hostnames=hosts,
+            parallel=self.config.prefetch_parallel,
+            rate_kib=self.config.prefetch_rate_kib,
+            timeout=self.config.tailscale_timeout,
         )
+        self.prefetcher.progress.connect(self._on_prefetch_progress)
+        self.prefetcher.prefetch_complete.connect(self._on_prefetch_complete)
+        self.prefetcher.finished.connect(self._on_prefetch_thread_finished)
+        self.action_cancel_prefetch.setVisible(True)
+        self.prefetcher.start()
+
+    def cancel_prefetch(self):
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+
+    def _on_prefetch_progress(self, done: int, total: int):
+        self._set_prefetch_status(f"Downloaded: {format_size(done)} of {format_size(total)}")
+
+    def _on_prefetch_complete(self, result: PrefetchResult):
+        parts = []
+        if result.total_bytes:
+            parts.append(
+                f"Downloaded: {format_size(result.downloaded_bytes)} of "
+                f"{format_size(result.total_bytes)}"
+            )
+        if result.hosts_done or result.host_errors:
+            parts.append(
+                f"{len(result.hosts_done)}/{len(result.hosts_done) + len(result.host_errors)}"
+                " host(s) prefetched"
+            )
+        if result.cancelled:
+            parts.append("download cancelled")
+        elif result.errors and not result.downloaded_bytes:
+            parts.append(f"Download failed: {result.errors[0]}")
+        self._set_prefetch_status(", ".join(parts))
+
+    def _set_prefetch_status(self, status: str):
+        self._prefetch_status = status
+        if self._tooltip_lines:
+            self._refresh_tooltip()
+
+    def _on_prefetch_thread_finished(self):
+        self.prefetcher = None
+        self.action_cancel_prefetch.setVisible(False)
 
     def launch_update(self):
         self._run_local_update(restart=False)
@@ -330,17 +1130,26 @@ class TrayApp(QObject):
         self._self_update_pending = any(
             u.package == "yay-sys-tray-git" for u in self.updates
         )
+        self.cancel_prefetch()
+        self._prefetch_consumed = True
         terminal = self.config.terminal
+        yay_cmd = ["yay", "-Syu"] + cachedir_args()
+        if self.config.noconfirm:
+            yay_cmd.append("--noconfirm")
+        # Flatpak, firmware and other sources that yay does not update follow it
+        pending = {u.repository for u in self.updates}
+        chained = [
+            (source, command)
+            for source in create_sources(self.config.update_sources)
+            if source.name in pending
+            and (command := source.update_command(self.config.noconfirm))
+        ]
+        self._chained_sources = [source for source, _ in chained]
+        commands = [yay_cmd] + [command for _, command in chained]
         if restart:
-            cmd = "yay -Syu"
-            if self.config.noconfirm:
-                cmd += " --noconfirm"
-            cmd += " && sudo reboot"
-            yay_cmd = ["bash", "-c", cmd]
-        else:
-            yay_cmd = ["yay", "-Syu"]
-            if self.config.noconfirm:
-                yay_cmd.append("--noconfirm")
+            commands.append(["sudo", "reboot"])
+        if len(commands) > 1:
+            yay_cmd = ["bash", "-c", " && ".join(shlex.join(c) for c in commands)]
         prefix = TERMINAL_CMDS.get(terminal, [terminal, "-e"])
         self.update_process = QProcess(self)
         self.update_process.finished.connect(self._on_update_finished)
@@ -355,9 +1164,128 @@ class TrayApp(QObject):
             cmd += " && sudo reboot"
         ssh_cmd = ["ssh", hostname, cmd]
         prefix = TERMINAL_CMDS.get(terminal, [terminal, "-e"])
-        self.update_process = QProcess(self)
-        self.update_process.finished.connect(self._on_update_finished)
-        self.update_process.start(prefix[0], prefix[1:] + ssh_cmd)
+        if hostname in self._remote_processes:
+            return
+        process = QProcess(self)
+        process.finished.connect(lambda: self._on_remote_update_finished(hostname))
+        self._remote_processes[hostname] = process
+        self._hosts_menu_dirty = True
+        process.start(prefix[0], prefix[1:] + ssh_cmd)
+
+    # -- Rolling fleet update --
+
+    def _fleet_hosts(self) -> list[HostResult]:
+        return [h for h in self.remote_updates if h.updates and not h.error]
+
+    def _update_fleet_action(self):
+        self.action_update_hosts.setVisible(self.config.tailscale_enabled)
+        self.action_update_hosts.setEnabled(
+            self.fleet_updater is None and bool(self._fleet_hosts())
+        )
+        self.action_cancel_hosts.setVisible(self.fleet_updater is not None)
+
+    def update_all_hosts(self, restart: bool = False):
+        """Upgrade every remote host with pending updates in the background."""
+        self.update_hosts([h.hostname for h in self._fleet_hosts()], restart)
+
+    def update_hosts(self, hostnames: list[str], restart: bool = False):
+        """Upgrade the given remote hosts in the background."""
+        if self.fleet_updater is not None:
+            return
+        wanted = set(hostnames)
+        hosts = [h for h in self._fleet_hosts() if h.hostname in wanted]
+        if not hosts:
+            return
+        self.fleet_updater = FleetUpdater(
+            [h.hostname for h in hosts],
+            reboot_hosts=[h.hostname for h in hosts if h.needs_restart] if restart else None,
+            parallel=self.config.fleet_parallel,
+            max_failures=self.config.fleet_max_failures,
+            timeout=self.config.tailscale_timeout,
+        )
+        self.fleet_updater.host_status.connect(self._on_fleet_host_status)
+        self.fleet_updater.progress.connect(self._on_fleet_progress)
+        self.fleet_updater.rollout_complete.connect(self._on_fleet_complete)
+        self.fleet_updater.finished.connect(self._on_fleet_thread_finished)
+        self._update_fleet_action()
+        self._on_fleet_progress(0, 0, len(hosts))
+        self.fleet_updater.start()
+
+    def cancel_host_updates(self):
+        """Stop a running rollout; hosts mid-upgrade are interrupted, the rest skipped."""
+        if self.fleet_updater is None:
+            return
+        self.fleet_updater.cancel()
+        self.action_cancel_hosts.setEnabled(False)
+        self._set_tooltip("Cancelling host updates...")
+
+    def _on_fleet_host_status(self, hostname: str, status: str):
+        self._fleet_status[hostname] = status
+        self._hosts_menu_dirty = True
+        self._on_fleet_progress(*self._fleet_counts)
+
+    def _on_fleet_progress(self, done: int, failed: int, total: int):
+        self._fleet_counts = (done, failed, total)
+        if self.fleet_updater is not None and self.fleet_updater.is_cancelled:
+            return  # keep showing "Cancelling" until the rollout winds down
+        tip = f"Updating hosts: {done + failed}/{total}"
+        if failed:
+            tip += f" ({failed} failed)"
+        busy = sorted(
+            h for h, status in self._fleet_status.items() if status in ("updating", "rebooting")
+        )
+        for hostname in busy[:TOOLTIP_MAX_HOSTS]:
+            tip += f"\n  {hostname}: {self._fleet_status[hostname]}"
+        if len(busy) > TOOLTIP_MAX_HOSTS:
+            tip += f"\n  and {len(busy) - TOOLTIP_MAX_HOSTS} more"
+        self._set_tooltip(tip)
+
+    def _on_fleet_complete(self, result: FleetResult):
+        cancelled = self.fleet_updater is not None and self.fleet_updater.is_cancelled
+        lines = [f"{len(result.succeeded)} host(s) updated"]
+        if result.rebooted:
+            lines.append(f"{len(result.rebooted)} rebooted")
+        if result.failed:
+            lines.append("Failed: " + ", ".join(sorted(result.failed)))
+        for hostname, error in sorted(result.reboot_failed.items()):
+            lines.append(f"Not rebooted: {hostname}: {error}")
+        if result.skipped:
+            lines.append(f"Stopped early, {len(result.skipped)} host(s) skipped")
+        self.tray.showMessage(
+            "Host Updates Cancelled" if cancelled else "Host Updates Finished",
+            "\n".join(lines),
+            QSystemTrayIcon.MessageIcon.Warning if result.failed or result.reboot_failed
+            else QSystemTrayIcon.MessageIcon.Information,
+            5000,
+        )
+        if result.affected:
+            self._recheck_hosts(result.affected)
+
+    def _on_fleet_thread_finished(self):
+        self.fleet_updater = None
+        self._fleet_status.clear()
+        self._hosts_menu_dirty = True
+        self.action_cancel_hosts.setEnabled(True)
+        self._update_fleet_action()
+
+    def _recheck_hosts(self, hostnames: list[str]):
+        """Re-check only the given remote hosts and merge them into the current results."""
+        if self.host_rechecker is not None and self.host_rechecker.isRunning():
+            return
+        self.host_rechecker = self._remote_checker([], hostnames)
+        self.host_rechecker.check_complete.connect(self._on_host_recheck_complete)
+        self.host_rechecker.finished.connect(self._on_host_rechecker_finished)
+        self.host_rechecker.start()
+
+    def _on_host_recheck_complete(self, result: RemoteCheckResult):
+        fresh = {h.hostname: h for h in result.hosts}
+        self.remote_updates = [fresh.pop(h.hostname, h) for h in self.remote_updates]
+        self.remote_updates.extend(fresh.values())
+        self.remote_updates.sort(key=lambda h: h.hostname)
+        self._update_tray_state()
+
+    def _on_host_rechecker_finished(self):
+        self.host_rechecker = None
 
     def _run_remove(self, package: str, flags: str):
         terminal = self.config.terminal
@@ -371,11 +1299,92 @@ class TrayApp(QObject):
 
     def _on_update_finished(self):
         self.update_process = None
+        chained, self._chained_sources = self._chained_sources, []
+        if self._prefetch_consumed:
+            self._prefetch_consumed = False
+            self._prefetch_status = ""
+            clear_prefetch_dir()
+        if self.is_arch and self.pacman_watcher is None:
+            self._refresh_dependency_graph()
         if getattr(self, "_self_update_pending", False):
             self._self_update_pending = False
             self._restart_service()
             return
-        self.start_check()
+        self._reconcile(LOCAL_HOST, chained)
+
+    def _on_remote_update_finished(self, hostname: str):
+        self._remote_processes.pop(hostname, None)
+        self._hosts_menu_dirty = True
+        self._reconcile(hostname)
+
+    # -- Post-update reconciliation --
+
+    def _reconcile(self, hostname: str, sources: list[UpdateSource] | None = None):
+        """Drop what an upgrade installed from the results instead of re-checking everything.
+
+        sources are non-pacman sources whose updates also ran; pacman.log
+        does not record those, so they are checked again.
+        """
+        self._recheck_sources.extend(sources or [])
+        if hostname in self._reconcilers:
+            # More log entries may have landed after this read started
+            self._reconcile_again.add(hostname)
+            return
+        recheck = []
+        if hostname == LOCAL_HOST:
+            recheck, self._recheck_sources = self._recheck_sources, []
+        worker = Reconciler(hostname, self._log_offset, self.config.tailscale_timeout, recheck)
+        worker.reconciled.connect(self._on_reconciled)
+        worker.finished.connect(lambda: self._on_reconciler_finished(hostname))
+        self._reconcilers[hostname] = worker
+        worker.start()
+
+    def _on_reconciler_finished(self, hostname: str):
+        self._reconcilers.pop(hostname, None)
+        if hostname in self._reconcile_again:
+            self._reconcile_again.discard(hostname)
+            self._reconcile(hostname)
+
+    def _on_reconciled(self, result: ReconcileResult):
+        if result.hostname == LOCAL_HOST:
+            if result.error or self.local_result is None:
+                self.start_check()
+                return
+            self._log_offset = result.log_offset
+            rechecked = result.rechecked
+            if not result.changes and not rechecked:
+                return
+            updates = apply_changes(self.updates, result.changes)
+            if rechecked:
+                updates = [u for u in updates if u.repository not in rechecked]
+                for fresh in result.source_updates.values():
+                    updates.extend(fresh)
+            source_errors = {
+                name: error for name, error in self.local_result.source_errors.items()
+                if name not in rechecked
+            }
+            source_errors.update(result.source_errors)
+            restart_pkgs = [u.package for u in updates if u.package in RESTART_PACKAGES]
+            self.updates = updates
+            self.local_result = CheckResult(
+                updates=updates,
+                needs_restart=len(restart_pkgs) > 0,
+                restart_packages=restart_pkgs,
+                reboot_info=result.reboot_info or self.local_result.reboot_info,
+                source_errors=source_errors,
+            )
+        else:
+            if result.error:
+                self._recheck_hosts([result.hostname])
+                return
+            self.remote_updates = [
+                reconcile_host(h, result.changes) if h.hostname == result.hostname else h
+                for h in self.remote_updates
+            ]
+        self._update_tray_state(notify=False)
+        # The network check still runs to pick up anything new, just not right away
+        if not self._deferred_check.isActive():
+            self._deferred_check.start(self.config.recheck_interval_minutes * 60 * 1000)
 
     def _restart_service(self):
         """Restart the systemd user service to pick up the new version."""
@@ -404,6 +1413,9 @@ class TrayApp(QObject):
             remote_hosts=self.remote_updates,
             on_update=self._run_local_update if self.is_arch else None,
             on_remote_update=self._run_remote_update,
+            on_update_all_hosts=self.update_all_hosts,
+            index=self.update_index,
+            on_update_hosts=self.update_hosts,
             on_remove=self._run_remove if self.is_arch else None,
         )
         self._updates_dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
@@ -421,7 +1433,9 @@ class TrayApp(QObject):
             self._settings_dialog.activateWindow()
             return
 
-        self._settings_dialog = SettingsDialog(self.config, is_arch=self.is_arch)
+        self._settings_dialog = SettingsDialog(
+            self.config, is_arch=self.is_arch, history=self.history,
+        )
         self._settings_dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         self._settings_dialog.accepted.connect(self._on_settings_accepted)
         self._settings_dialog.destroyed.connect(self._on_settings_dialog_closed)
@@ -429,6 +1443,8 @@ class TrayApp(QObject):
 
     def _on_settings_accepted(self):
         old_passwordless = self.config.passwordless_updates
+        old_feed = self.config.advisories_feed
+        old_keep = self.config.cache_keep_versions
         self.config = self._settings_dialog.get_config()
         self.config.save()
         self.config.manage_autostart()
@@ -436,7 +1452,16 @@ class TrayApp(QObject):
             if not self.config.manage_passwordless_updates():
                 self.config.passwordless_updates = old_passwordless
                 self.config.save()
+        self._apply_power_config()
         self._restart_timer()
+        self._update_fleet_action()
+        self._apply_history_config()
+        if self.config.advisories_feed != old_feed:
+            FEED_CACHE.unlink(missing_ok=True)
+        self._apply_advisory_config()
+        self._apply_diagnostics_config()
+        if self.is_arch and self.config.cache_keep_versions != old_keep:
+            self._scan_package_cache()
 
     def _on_settings_dialog_closed(self):
         self._settings_dialog = None
@@ -444,7 +1469,13 @@ class TrayApp(QObject):
     def show_about_dialog(self):
         from yay_sys_tray.dialogs import AboutDialog
 
-        dialog = AboutDialog()
+        diagnostics = [
+            self.metadata.stats().summary(),
+            f"Memory: {rss_kib() // 1024} MiB resident",
+        ]
+        if self.diagnostics.active:
+            diagnostics.append(f"Memory diagnostics: {DIAGNOSTICS_DIR}")
+        dialog = AboutDialog(diagnostics=diagnostics)
         dialog.exec()
 
     def _on_tray_activated(self, reason):
@@ -470,7 +1501,7 @@ class TrayApp(QObject):
 
     def _format_next_check(self) -> str:
         if self.last_check_time:
-            next_time = self.last_check_time + timedelta(minutes=self.config.check_interval_minutes)
+            next_time = self.last_check_time + timedelta(minutes=self._check_interval())
             now = datetime.now()
             if next_time.date() == now.date():
                 return next_time.strftime("%H:%M")
@@ -1,6 +1,8 @@
 import os
 import subprocess
-from dataclasses import dataclass
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 from PyQt6.QtCore import QThread, pyqtSignal
 
@@ -16,30 +18,83 @@ RESTART_PACKAGES = {
     "nvidia-lts",
 }
 
+# Update sources whose items are not pacman packages (see sources.py)
+FOREIGN_SOURCES = frozenset({"flatpak", "fwupd"})
 
-@dataclass
+
+@dataclass(slots=True)
 class UpdateInfo:
     package: str
     old_version: str
     new_version: str
     description: str = ""
     repository: str = ""
-    url: str = ""
-
-
-@dataclass
+    arch: str = ""
+    download_size: int = 0
+    installed_delta: int = 0
+    advisories: tuple = ()  # advisories.Advisory entries this update fixes
+
+    @property
+    def url(self) -> str:
+        """Package page, built on demand instead of stored for every row."""
+        if self.repository == "aur":
+            return f"https://aur.archlinux.org/packages/{self.package}"
+        if self.repository and self.arch:
+            return f"https://archlinux.org/packages/{self.repository}/{self.arch}/{self.package}/"
+        return ""
+
+    @property
+    def has_url(self) -> bool:
+        return self.repository == "aur" or bool(self.repository and self.arch)
+
+    @property
+    def is_package(self) -> bool:
+        """A pacman package, as opposed to e.g. a Flatpak app or a firmware update."""
+        return self.repository not in FOREIGN_SOURCES
+
+
+@dataclass(slots=True, frozen=True)
 class RebootInfo:
     needed: bool
     running_kernel: str
     installed_kernel: str
 
 
-@dataclass
+@dataclass(slots=True)
 class CheckResult:
     updates: list[UpdateInfo]
     needs_restart: bool
     restart_packages: list[str]
     reboot_info: RebootInfo | None = None
+    # Source name -> error, for optional sources that failed; their updates are missing
+    source_errors: dict[str, str] = field(default_factory=dict)
+
+
+def format_size(size: int) -> str:
+    """Format a byte count the way pacman does (KiB, MiB, GiB)."""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.2f} GiB"
+
+
+def size_summary(updates: list[UpdateInfo], installed_label: str = "installed") -> str:
+    """Total download and installed-size change, e.g. '312.4 MiB download, +48.0 MiB installed'.
+
+    The installed change is only known for local updates, so it is left out
+    when none of the updates carry one.
+    """
+    download = sum(u.download_size for u in updates)
+    delta = sum(u.installed_delta for u in updates)
+    parts = []
+    if download:
+        parts.append(f"{format_size(download)} download")
+    if delta:
+        sign = "+" if delta > 0 else "-"
+        parts.append(f"{sign}{format_size(abs(delta))} {installed_label}")
+    return ", ".join(parts)
 
 
 def parse_update_output(output: str) -> list[UpdateInfo]:
@@ -51,18 +106,19 @@ def parse_update_output(output: str) -> list[UpdateInfo]:
             continue
         parts = line.split()
         if len(parts) >= 4 and parts[-2] == "->":
+            # Every host reports the same names and versions; share one copy
             updates.append(
                 UpdateInfo(
-                    package=parts[0],
-                    old_version=parts[1],
-                    new_version=parts[-1],
+                    package=sys.intern(parts[0]),
+                    old_version=sys.intern(parts[1]),
+                    new_version=sys.intern(parts[-1]),
                 )
             )
     return updates
 
 
-def fetch_descriptions(packages: list[str]) -> dict[str, str]:
-    """Fetch package descriptions from the local pacman database."""
+def fetch_descriptions(packages: list[str]) -> dict[str, str] | None:
+    """Fetch package descriptions from the local pacman database; None if pacman failed to run."""
     if not packages:
         return {}
     try:
@@ -79,33 +135,7 @@ def fetch_descriptions(packages: list[str]) -> dict[str, str]:
                 descriptions[name] = line.split(":", 1)[1].strip()
         return descriptions
     except Exception:
-        return {}
-
-
-def fetch_repositories(packages: list[str]) -> dict[str, tuple[str, str]]:
-    """Fetch repository name and architecture from the pacman sync database."""
-    if not packages:
-        return {}
-    try:
-        result = subprocess.run(
-            ["pacman", "-Si"] + packages,
-            capture_output=True, text=True, timeout=10,
-        )
-        repos: dict[str, tuple[str, str]] = {}
-        current_repo = ""
-        current_name = ""
-        for line in result.stdout.splitlines():
-            if line.startswith("Repository"):
-                current_repo = line.split(":", 1)[1].strip()
-            elif line.startswith("Name"):
-                current_name = line.split(":", 1)[1].strip()
-            elif line.startswith("Architecture") and current_name:
-                arch = line.split(":", 1)[1].strip()
-                repos[current_name] = (current_repo, arch)
-                current_name = ""
-        return repos
-    except Exception:
-        return {}
+        return None
 
 
 def check_reboot_needed() -> RebootInfo:
@@ -145,70 +175,71 @@ def check_reboot_needed() -> RebootInfo:
     )
 
 
+def source_error(source, error: Exception) -> str:
+    """What to show for a source whose check raised error."""
+    if isinstance(error, FileNotFoundError):
+        return f"Command not found: {error.filename}"
+    if isinstance(error, subprocess.TimeoutExpired):
+        what = "Update check timed out" if source.required else "timed out"
+        return f"{what} after {source.timeout} seconds"
+    return str(error)
+
+
 class UpdateChecker(QThread):
+    """Check every update source at once and merge what they found.
+
+    Each source runs on its own worker with its own timeout, so the check
+    takes as long as the slowest source rather than all of them in turn.
+    Pacman packages are then described from the sync databases in one pass.
+    """
+
     check_complete = pyqtSignal(object)  # CheckResult
     check_error = pyqtSignal(str)
 
+    def __init__(self, metadata=None, sources: list | None = None):
+        super().__init__()
+        # Shared MetadataCache; created per run when not supplied
+        self.metadata = metadata
+        # sources.UpdateSource instances; repositories and AUR when not supplied
+        self.sources = sources
+
     def run(self):
         try:
-            updates = []
-            repo_packages: list[UpdateInfo] = []
-
-            # checkupdates syncs a temp database copy, so results are always fresh
-            repo = subprocess.run(
-                ["checkupdates"],
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
-            # checkupdates: exit 0 = updates, exit 2 = no updates, exit 1 = error
-            if repo.returncode == 1:
-                self.check_error.emit(
-                    f"checkupdates error: {repo.stderr.strip()}"
+            if self.sources is None:
+                from yay_sys_tray.sources import AurSource, RepoSource
+
+                self.sources = [RepoSource(), AurSource()]
+            sources = [s for s in self.sources if s.available()]
+            with ThreadPoolExecutor(max_workers=len(sources) + 1) as pool:
+                reboot = pool.submit(check_reboot_needed)
+                checks = [(s, pool.submit(s.check)) for s in sources]
+                updates: list[UpdateInfo] = []
+                source_errors: dict[str, str] = {}
+                for source, future in checks:
+                    try:
+                        updates.extend(future.result())
+                    except Exception as e:
+                        if source.required:
+                            self.check_error.emit(source_error(source, e))
+                            return
+                        source_errors[source.name] = source_error(source, e)
+
+                packages = [u for u in updates if u.is_package]
+                if self.metadata is None:
+                    from yay_sys_tray.metadata import MetadataCache
+
+                    self.metadata = MetadataCache()
+                self.metadata.enrich(packages)
+                self.metadata.apply_local(packages)
+
+                restart_pkgs = [u.package for u in packages if u.package in RESTART_PACKAGES]
+                result = CheckResult(
+                    updates=updates,
+                    needs_restart=len(restart_pkgs) > 0,
+                    restart_packages=restart_pkgs,
+                    reboot_info=reboot.result(),
+                    source_errors=source_errors,
                 )
-                return
-            if repo.returncode == 0:
-                repo_packages = parse_update_output(repo.stdout)
-                updates.extend(repo_packages)
-
-            # Check AUR packages separately via yay
-            aur = subprocess.run(
-                ["yay", "-Qua"],
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
-            # yay -Qua: exit 0 = updates, exit 1 = no updates
-            if aur.returncode == 0 and aur.stdout.strip():
-                aur_packages = parse_update_output(aur.stdout)
-                for u in aur_packages:
-                    u.repository = "aur"
-                    u.url = f"https://aur.archlinux.org/packages/{u.package}"
-                updates.extend(aur_packages)
-
-            descs = fetch_descriptions([u.package for u in updates])
-            for u in updates:
-                u.description = descs.get(u.package, "")
-
-            if repo_packages:
-                repos = fetch_repositories([u.package for u in repo_packages])
-                for u in repo_packages:
-                    info = repos.get(u.package)
-                    if info:
-                        u.repository, arch = info
-                        u.url = f"https://archlinux.org/packages/{u.repository}/{arch}/{u.package}/"
-
-            restart_pkgs = [u.package for u in updates if u.package in RESTART_PACKAGES]
-            result = CheckResult(
-                updates=updates,
-                needs_restart=len(restart_pkgs) > 0,
-                restart_packages=restart_pkgs,
-                reboot_info=check_reboot_needed(),
-            )
             self.check_complete.emit(result)
-        except FileNotFoundError as e:
-            self.check_error.emit(f"Command not found: {e.filename}")
-        except subprocess.TimeoutExpired:
-            self.check_error.emit("Update check timed out after 120 seconds")
         except Exception as e:
             self.check_error.emit(str(e))
@@ -2,11 +2,12 @@ import getpass
 import json
 import shutil
 import subprocess
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
 CONFIG_DIR = Path.home() / ".config" / "yay-sys-tray"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+CACHE_DIR = Path.home() / ".cache" / "yay-sys-tray"
 
 SERVICE_NAME = "yay-sys-tray.service"
 
@@ -16,6 +17,13 @@ def is_arch_linux() -> bool:
     return Path("/etc/arch-release").exists()
 
 
+def _default_feed() -> str:
+    # Imported here: advisories reads CACHE_DIR from this module
+    from yay_sys_tray.advisories import DEFAULT_FEED_URL
+
+    return DEFAULT_FEED_URL
+
+
 def _detect_terminal() -> str:
     for term in ("kitty", "alacritty", "konsole", "xterm"):
         if shutil.which(term):
@@ -36,7 +44,38 @@ class AppConfig:
     # Tailscale remote checking
     tailscale_enabled: bool = False
     tailscale_tags: str = "server,arch"
-    tailscale_timeout: int = 10
+    tailscale_timeout: int = 10  # longest wait to log in; hosts without history get it
+    # Per-host timeouts are learned from past checks, within these bounds
+    tailscale_timeout_min: int = 2
+    tailscale_command_timeout: int = 120
+    # Rolling "Update all hosts"
+    fleet_parallel: int = 4
+    fleet_max_failures: int = 2
+    # Background download of pending packages after a check
+    prefetch_enabled: bool = False
+    prefetch_parallel: int = 2
+    prefetch_rate_kib: int = 0  # 0 = unlimited
+    # SQLite history of check results
+    history_enabled: bool = True
+    history_retention_days: int = 365
+    # Security advisories (arch-audit feed) marking updates that fix vulnerabilities
+    advisories_enabled: bool = True
+    advisories_feed: str = field(default_factory=_default_feed)
+    advisories_refresh_hours: int = 6
+    # Package cache monitor: old versions beyond this many are reclaimable
+    cache_keep_versions: int = 3
+    # Quick reachability check before the checks; "" probes the first pacman mirrors
+    offline_probe: bool = True
+    probe_host: str = ""
+    # On battery or a metered connection: checks this many times further apart,
+    # and no prefetch, remote checks or animations until the power or network is back
+    power_saving: bool = True
+    power_saving_interval_factor: int = 4
+    # Where local updates come from (sources.SOURCES); sources that are not installed are skipped
+    update_sources: str = "repo,aur,flatpak,fwupd"
+    # Opt-in memory diagnostics (RSS/object samples, tracemalloc snapshots)
+    diagnostics_enabled: bool = False
+    diagnostics_interval_minutes: int = 5
 
     def __post_init__(self):
         if not self.terminal:
@@ -0,0 +1,178 @@
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+LOCAL_DB = Path("/var/lib/pacman/local")
+
+# A dependency such as 'glibc>=2.38' or 'sh: for scripts' names the part before
+# any version constraint or description
+_DEP_NAME = re.compile(r"[<>=:]")
+
+
+@dataclass
+class _PackageRecord:
+    name: str
+    depends: tuple[str, ...]
+    provides: tuple[str, ...]
+
+
+def _dep_name(dep: str) -> str:
+    return _DEP_NAME.split(dep, 1)[0].strip()
+
+
+def desc_sections(text: str) -> dict[str, list[str]]:
+    """Split a pacman DB 'desc' file into its %SECTION% value lists."""
+    sections: dict[str, list[str]] = {}
+    current: list[str] | None = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%"):
+            current = sections.setdefault(line, [])
+        elif not line:
+            current = None
+        elif current is not None:
+            current.append(line)
+    return sections
+
+
+def parse_desc(path: Path) -> _PackageRecord | None:
+    """Read the name, dependencies and provisions from a local DB 'desc' file."""
+    try:
+        text = path.read_text(errors="replace")
+    except OSError:
+        return None
+    sections = desc_sections(text)
+    names = sections.get("%NAME%")
+    if not names:
+        return None
+    return _PackageRecord(
+        name=names[0],
+        depends=tuple(_dep_name(d) for d in sections.get("%DEPENDS%", [])),
+        provides=tuple(_dep_name(p) for p in sections.get("%PROVIDES%", [])),
+    )
+
+
+class DependencyGraph:
+    """Adjacency index of installed packages built from the local pacman DB.
+
+    Each entry directory (name-version-release) is parsed once; reload() only
+    reads directories that appeared since the last load, so it is cheap to
+    call after every transaction. Dependencies on virtual packages resolve to
+    the installed provider.
+    """
+
+    def __init__(self, db_path: Path = LOCAL_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._records: dict[str, _PackageRecord] = {}  # entry dir name -> record
+        self._mtime: float | None = None
+        self._deps: dict[str, tuple[str, ...]] = {}
+        self._rdeps: dict[str, tuple[str, ...]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._mtime is not None
+
+    def is_stale(self) -> bool:
+        """True if the local DB changed since the last load."""
+        try:
+            return os.stat(self.db_path).st_mtime != self._mtime
+        except OSError:
+            return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._mtime = None
+
+    def reload(self) -> bool:
+        """Sync with the local DB. Returns False if it cannot be read."""
+        try:
+            mtime = os.stat(self.db_path).st_mtime
+            entries = [e.name for e in os.scandir(self.db_path) if e.is_dir()]
+        except OSError:
+            return False
+        with self._lock:
+            if mtime == self._mtime:
+                return True
+            present = set(entries)
+            records = {k: v for k, v in self._records.items() if k in present}
+        for entry in entries:
+            if entry not in records:
+                record = parse_desc(self.db_path / entry / "desc")
+                if record is not None:
+                    records[entry] = record
+        deps, rdeps = _build_adjacency(records.values())
+        with self._lock:
+            self._records = records
+            self._deps = deps
+            self._rdeps = rdeps
+            self._mtime = mtime
+        return True
+
+    def ensure_loaded(self) -> bool:
+        if self.loaded and not self.is_stale():
+            return True
+        return self.reload()
+
+    def __contains__(self, package: str) -> bool:
+        return package in self._deps
+
+    def dependencies(self, package: str) -> tuple[str, ...]:
+        """Direct dependencies, resolved to installed package names where possible."""
+        return self._deps.get(package, ())
+
+    def required_by(self, package: str) -> tuple[str, ...]:
+        """Installed packages that directly depend on package."""
+        return self._rdeps.get(package, ())
+
+
+def _build_adjacency(
+    records,
+) -> tuple[dict[str, tuple[str, ...]], dict[str, tuple[str, ...]]]:
+    names = {r.name for r in records}
+    providers: dict[str, str] = {}
+    for r in records:
+        for p in r.provides:
+            if p not in names:
+                providers.setdefault(p, r.name)
+
+    deps: dict[str, tuple[str, ...]] = {}
+    reverse: dict[str, set[str]] = {}
+    for r in records:
+        resolved = []
+        for d in r.depends:
+            target = d if d in names else providers.get(d, d)
+            if target not in resolved:
+                resolved.append(target)
+            reverse.setdefault(target, set()).add(r.name)
+        deps[r.name] = tuple(sorted(resolved))
+    rdeps = {name: tuple(sorted(users)) for name, users in reverse.items()}
+    return deps, rdeps
+
+
+_graph = DependencyGraph()
+
+
+def local_graph() -> DependencyGraph:
+    """The shared graph of the local system's installed packages."""
+    return _graph
+
+
+class GraphLoader(QThread):
+    """Load or refresh the shared dependency graph off the GUI thread."""
+
+    loaded = pyqtSignal(bool)  # True if the local DB could be read
+
+    def __init__(self, graph: DependencyGraph | None = None):
+        super().__init__()
+        self.graph = graph or _graph
+
+    def run(self):
+        try:
+            ok = self.graph.ensure_loaded()
+        except Exception:
+            ok = False
+        self.loaded.emit(ok)
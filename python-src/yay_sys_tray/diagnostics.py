@@ -0,0 +1,212 @@
+import gc
+import json
+import os
+import signal
+import socket
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QSocketNotifier, QTimer
+
+from yay_sys_tray.config import CACHE_DIR
+
+DIAGNOSTICS_DIR = CACHE_DIR / "diagnostics"
+SAMPLES_FILE = "samples.jsonl"
+# The samples file is cut back to its newer half past this size
+MAX_SAMPLES_BYTES = 1024 * 1024
+TOP_TYPES = 15
+TOP_ALLOCATIONS = 25
+
+
+def rss_kib() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def type_counts() -> Counter:
+    """Objects tracked by the garbage collector, per type name (PyQt wrappers included)."""
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+
+
+def allocation_diff(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                    limit: int = TOP_ALLOCATIONS) -> list[str]:
+    """The source lines whose allocations grew the most between two snapshots."""
+    stats = _filtered(after).compare_to(_filtered(before), "lineno")
+    return [str(s) for s in stats[:limit]]
+
+
+class Diagnostics(QObject):
+    """Opt-in memory diagnostics for the long-running tray.
+
+    Every interval, RSS, the number of GC-tracked objects and the types whose
+    counts grew are appended to samples.jsonl. snapshot() (menu action,
+    control socket or SIGUSR1) takes a tracemalloc snapshot and writes the
+    allocations that grew since the previous one to a snapshot-*.txt file.
+    Tracing only starts when diagnostics are enabled, since it slows every
+    allocation down.
+    """
+
+    def __init__(self, interval_minutes: int = 5, directory: Path = DIAGNOSTICS_DIR,
+                 frames: int = 10, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.frames = frames
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.sample)
+        self.set_interval(interval_minutes)
+        self._counts: Counter | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._started_tracing = False
+        self._wakeup: tuple[socket.socket, socket.socket] | None = None
+        self._notifier: QSocketNotifier | None = None
+        self._previous_handler = None
+
+    @property
+    def active(self) -> bool:
+        return self._timer.isActive()
+
+    def set_interval(self, minutes: int) -> None:
+        self._timer.setInterval(max(1, minutes) * 60 * 1000)
+
+    def start(self) -> None:
+        if self.active:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._install_signal_handler()
+        self._timer.start()
+        self.sample()
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._remove_signal_handler()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._snapshot = None
+        self._counts = None
+
+    def sample(self) -> dict:
+        """Record RSS and object counts, with the types that grew since the last sample."""
+        counts = type_counts()
+        grown = {}
+        if self._counts is not None:
+            delta = counts - self._counts
+            grown = dict(delta.most_common(TOP_TYPES))
+        self._counts = counts
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rss_kib": rss_kib(),
+            "objects": sum(counts.values()),
+            "grown": grown,
+        }
+        if tracemalloc.is_tracing():
+            record["traced_kib"] = tracemalloc.get_traced_memory()[0] // 1024
+        self._append(record)
+        return record
+
+    def snapshot(self) -> str:
+        """Take a tracemalloc snapshot and write the growth since the previous one.
+
+        Returns the path of the report.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        gc.collect()
+        current = tracemalloc.take_snapshot()
+        counts = type_counts()
+        lines = [
+            f"RSS: {rss_kib()} KiB, traced: {tracemalloc.get_traced_memory()[0] // 1024} KiB, "
+            f"objects: {sum(counts.values())}",
+            "",
+        ]
+        if self._snapshot is None:
+            lines.append("Largest allocations (no earlier snapshot to compare with):")
+            stats = _filtered(current).statistics("lineno")[:TOP_ALLOCATIONS]
+            lines += [str(s) for s in stats]
+        else:
+            lines.append("Allocations grown since the previous snapshot:")
+            lines += allocation_diff(self._snapshot, current)
+        lines += ["", "Most common object types:"]
+        lines += [f"{count:10d}  {name}" for name, count in counts.most_common(TOP_TYPES)]
+        self._snapshot = current
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"snapshot-{time.strftime('%Y%m%d-%H%M%S')}.txt"
+        path.write_text("\n".join(lines) + "\n")
+        return str(path)
+
+    def _append(self, record: dict) -> None:
+        path = self.directory / SAMPLES_FILE
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            if path.stat().st_size > MAX_SAMPLES_BYTES:
+                lines = path.read_text().splitlines(keepends=True)
+                path.write_text("".join(lines[len(lines) // 2:]))
+        except OSError:
+            pass
+
+    # -- SIGUSR1 --
+
+    def _install_signal_handler(self) -> None:
+        """Take a snapshot on SIGUSR1.
+
+        Python handlers only run when the interpreter gets control, which it
+        does not while Qt waits for events; the wakeup fd turns the signal
+        into a socket read that the event loop does see.
+        """
+        if self._wakeup is not None:
+            return
+        try:
+            reader, writer = socket.socketpair()
+            reader.setblocking(False)
+            writer.setblocking(False)
+            signal.set_wakeup_fd(writer.fileno(), warn_on_full_buffer=False)
+            self._previous_handler = signal.signal(signal.SIGUSR1, lambda *_: None)
+        except (OSError, ValueError):
+            # ValueError: not on the main thread
+            return
+        self._wakeup = (reader, writer)
+        self._notifier = QSocketNotifier(reader.fileno(), QSocketNotifier.Type.Read, self)
+        self._notifier.activated.connect(self._on_wakeup)
+
+    def _remove_signal_handler(self) -> None:
+        if self._wakeup is None:
+            return
+        self._notifier.setEnabled(False)
+        self._notifier.deleteLater()
+        self._notifier = None
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGUSR1, self._previous_handler or signal.SIG_DFL)
+        for sock in self._wakeup:
+            sock.close()
+        self._wakeup = None
+
+    def _on_wakeup(self):
+        try:
+            received = self._wakeup[0].recv(64)
+        except OSError:
+            return
+        if signal.SIGUSR1 in received:
+            self.snapshot()
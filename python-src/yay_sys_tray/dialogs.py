@@ -1,9 +1,35 @@
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
+from dataclasses import replace
 from typing import Callable
 
-from PyQt6.QtCore import QEvent, QPointF, QRectF, QSettings, QSize, Qt, QUrl
-from PyQt6.QtGui import QColor, QDesktopServices, QFont, QPainter, QPainterPath, QPen
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QEvent,
+    QModelIndex,
+    QPointF,
+    QRectF,
+    QSettings,
+    QSize,
+    Qt,
+    QThread,
+    QUrl,
+    pyqtSignal,
+)
+from PyQt6.QtGui import (
+    QColor,
+    QDesktopServices,
+    QFont,
+    QFontMetrics,
+    QPainter,
+    QPainterPath,
+    QPen,
+    QPixmap,
+    QStaticText,
+    QTransform,
+)
 from PyQt6.QtWidgets import QMenu, QToolTip
 from PyQt6.QtWidgets import (
     QCheckBox,
@@ -15,8 +41,7 @@ from PyQt6.QtWidgets import (
     QLabel,
     QLayout,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QPushButton,
     QSpinBox,
     QStyledItemDelegate,
@@ -24,15 +49,22 @@ from PyQt6.QtWidgets import (
     QTabWidget,
     QTextEdit,
     QToolButton,
+    QTreeWidget,
+    QTreeWidgetItem,
     QVBoxLayout,
     QWidget,
     QWidgetItem,
 )
 
-from yay_sys_tray.checker import RESTART_PACKAGES, UpdateInfo
+from yay_sys_tray.advisories import highest_severity, severity_rank
+from yay_sys_tray.checker import RESTART_PACKAGES, UpdateInfo, format_size, size_summary
 from yay_sys_tray.config import AppConfig
+from yay_sys_tray.depgraph import GraphLoader, local_graph
+from yay_sys_tray.history import HistoryStore, PendingUpdate
 from yay_sys_tray.icons import create_app_icon
-from yay_sys_tray.tailscale import discover_all_tags
+from yay_sys_tray.index import LOCAL_HOST, UpdateIndex
+from yay_sys_tray.sources import SOURCES
+from yay_sys_tray.tailscale import TagDiscoverer, cached_tags
 
 
 class FlowLayout(QLayout):
@@ -87,6 +119,8 @@ class FlowLayout(QLayout):
         right = rect.right() - m.right()
 
         for item in self._items:
+            if item.isEmpty():
+                continue
             sz = item.sizeHint()
             if x + sz.width() > right and row_height > 0:
                 x = rect.x() + m.left()
@@ -116,6 +150,21 @@ QPushButton:hover {{
 """
 
 
+# Workers outlive a dialog closed before they finish
+_running_workers: set[QThread] = set()
+
+
+def _keep_until_finished(worker: QThread) -> None:
+    _running_workers.add(worker)
+    worker.finished.connect(lambda: _running_workers.discard(worker))
+
+
+def wait_for_workers() -> None:
+    """Block until the workers of closed dialogs are done, before quitting."""
+    for worker in list(_running_workers):
+        worker.wait()
+
+
 class TagPillWidget(QWidget):
     """Displays Tailscale tags as toggleable pill buttons."""
 
@@ -123,23 +172,58 @@ class TagPillWidget(QWidget):
         super().__init__(parent)
         self._layout = FlowLayout(self, spacing=6)
         self._buttons: dict[str, QPushButton] = {}
+        self._selected = set(selected_tags)
+
+        # Saved and previously discovered tags show at once; discovery runs
+        # in the background and adds the rest
+        self._add_tags(set(cached_tags() or []) | self._selected)
+
+        self._status = QLabel()
+        self._status.setStyleSheet("color: gray; font-style: italic;")
+        self._layout.addWidget(self._status)
+        self._set_status("Looking up tags…")
+
+        discoverer = TagDiscoverer()
+        discoverer.tags_found.connect(self._on_tags_found)
+        discoverer.error.connect(self._on_discovery_error)
+        _keep_until_finished(discoverer)
+        discoverer.start()
+
+    def _add_tags(self, tags):
+        new = sorted(set(tags) - set(self._buttons))
+        if not new:
+            return
+        # Take the status label out so the pills stay sorted ahead of it
+        status = getattr(self, "_status", None)
+        if status is not None:
+            self._layout.removeWidget(status)
+        for tag in sorted(set(self._buttons) | set(new)):
+            btn = self._buttons.get(tag)
+            if btn is None:
+                btn = QPushButton(tag)
+                btn.setCheckable(True)
+                btn.setChecked(tag in self._selected)
+                btn.setEnabled(self.isEnabled())
+                btn.toggled.connect(lambda _, b=btn: self._update_style(b))
+                self._buttons[tag] = btn
+                self._update_style(btn)
+            else:
+                self._layout.removeWidget(btn)
+            self._layout.addWidget(btn)
+        self._buttons = {tag: self._buttons[tag] for tag in sorted(self._buttons)}
+        if status is not None:
+            self._layout.addWidget(status)
 
-        available = discover_all_tags()
-        all_tags = sorted(set(available) | set(selected_tags))
+    def _set_status(self, text: str):
+        self._status.setText(text)
+        self._status.setVisible(bool(text))
 
-        for tag in all_tags:
-            btn = QPushButton(tag)
-            btn.setCheckable(True)
-            btn.setChecked(tag in selected_tags)
-            btn.toggled.connect(lambda _, b=btn: self._update_style(b))
-            self._buttons[tag] = btn
-            self._layout.addWidget(btn)
-            self._update_style(btn)
+    def _on_tags_found(self, tags: list[str]):
+        self._add_tags(tags)
+        self._set_status("" if self._buttons else "No tags found")
 
-        if not all_tags:
-            label = QLabel("No tags found")
-            label.setStyleSheet("color: gray; font-style: italic;")
-            self._layout.addWidget(label)
+    def _on_discovery_error(self, message: str):
+        self._set_status(f"Could not load tags: {message}")
 
     def _update_style(self, btn: QPushButton):
         if btn.isChecked():
@@ -197,9 +281,56 @@ class DurationWidget(QWidget):
         return (self._days.value() * 24 + self._hours.value()) * 60 + self._minutes.value()
 
 
+def _format_span(seconds: float) -> str:
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.0f} h"
+    return f"{seconds / 86400:.0f} days"
+
+
+def _history_summary(
+    oldest: list[PendingUpdate],
+    averages: dict[str, float],
+    latency: tuple[float | None, float | None],
+    now: float,
+) -> str:
+    """A few lines on what the history store has recorded, for the Settings dialog."""
+    lines = []
+    if oldest:
+        u = oldest[0]
+        where = f" on {u.host}" if u.host != LOCAL_HOST else ""
+        lines.append(f"Oldest pending: {u.package}{where}, {_format_span(now - u.first_seen)}")
+    if LOCAL_HOST in averages:
+        lines.append(f"Time to update here: {_format_span(averages[LOCAL_HOST])} on average")
+    remote = [v for host, v in averages.items() if host != LOCAL_HOST]
+    if remote:
+        lines.append(
+            f"Time to update on {len(remote)} host(s): "
+            f"{_format_span(sum(remote) / len(remote))} on average"
+        )
+    local_seconds, remote_seconds = latency
+    if local_seconds is not None or remote_seconds is not None:
+        parts = []
+        if local_seconds is not None:
+            parts.append(f"{local_seconds:.1f} s local")
+        if remote_seconds is not None:
+            parts.append(f"{remote_seconds:.1f} s remote")
+        lines.append("Checks over 30 days: " + ", ".join(parts))
+    return "\n".join(lines) or "Nothing recorded yet"
+
+
 class SettingsDialog(QDialog):
-    def __init__(self, config: AppConfig, is_arch: bool = True, parent=None):
+    # Carries the history figures from the history thread
+    _history_loaded = pyqtSignal(str)
+
+    def __init__(
+        self,
+        config: AppConfig,
+        is_arch: bool = True,
+        history: HistoryStore | None = None,
+        parent=None,
+    ):
         super().__init__(parent)
+        self._config = config
         self.setWindowTitle("Yay Update Checker - Settings")
         self.setWindowIcon(create_app_icon())
         self.setMinimumWidth(400)
@@ -235,6 +366,22 @@ class SettingsDialog(QDialog):
         self.autostart_check.setEnabled(is_arch)
         general_layout.addRow("Autostart:", self.autostart_check)
 
+        enabled_sources = {n.strip() for n in config.update_sources.split(",")}
+        self.source_checks: dict[str, QCheckBox] = {}
+        sources_widget = QWidget()
+        sources_layout = QHBoxLayout(sources_widget)
+        sources_layout.setContentsMargins(0, 0, 0, 0)
+        for name, source in SOURCES.items():
+            check = QCheckBox(source.label)
+            check.setChecked(name in enabled_sources)
+            if source.command:
+                check.setToolTip(f"Skipped when {source.command} is not installed")
+            sources_layout.addWidget(check)
+            self.source_checks[name] = check
+        sources_layout.addStretch()
+        sources_widget.setEnabled(is_arch)
+        general_layout.addRow("Check:", sources_widget)
+
         self.animations_check = QCheckBox("Animate tray icon")
         self.animations_check.setChecked(config.animations)
         general_layout.addRow("Animations:", self.animations_check)
@@ -250,6 +397,126 @@ class SettingsDialog(QDialog):
         self.passwordless_check.setEnabled(is_arch)
         general_layout.addRow("Passwordless:", self.passwordless_check)
 
+        self.prefetch_check = QCheckBox("Download updates in the background")
+        self.prefetch_check.setChecked(config.prefetch_enabled)
+        general_layout.addRow("Prefetch:", self.prefetch_check)
+
+        self.prefetch_rate_spin = QSpinBox()
+        self.prefetch_rate_spin.setRange(0, 1024 * 1024)
+        self.prefetch_rate_spin.setSingleStep(256)
+        self.prefetch_rate_spin.setSuffix(" KiB/s")
+        self.prefetch_rate_spin.setSpecialValueText("Unlimited")
+        self.prefetch_rate_spin.setValue(config.prefetch_rate_kib)
+        self.prefetch_rate_spin.setToolTip(
+            "Shared by this machine's downloads; each remote host gets the same limit"
+        )
+        general_layout.addRow("Prefetch limit:", self.prefetch_rate_spin)
+
+        self.prefetch_parallel_spin = QSpinBox()
+        self.prefetch_parallel_spin.setRange(1, 8)
+        self.prefetch_parallel_spin.setSuffix(" at once")
+        self.prefetch_parallel_spin.setValue(config.prefetch_parallel)
+        general_layout.addRow("Prefetch downloads:", self.prefetch_parallel_spin)
+
+        for w in (self.prefetch_rate_spin, self.prefetch_parallel_spin):
+            self.prefetch_check.toggled.connect(w.setEnabled)
+            w.setEnabled(config.prefetch_enabled)
+
+        self.history_check = QCheckBox("Keep a history of check results")
+        self.history_check.setChecked(config.history_enabled)
+        general_layout.addRow("History:", self.history_check)
+
+        self.history_retention_spin = QSpinBox()
+        self.history_retention_spin.setRange(7, 3650)
+        self.history_retention_spin.setSuffix(" days")
+        self.history_retention_spin.setValue(config.history_retention_days)
+        self.history_retention_spin.setEnabled(config.history_enabled)
+        self.history_check.toggled.connect(self.history_retention_spin.setEnabled)
+        general_layout.addRow("Keep history for:", self.history_retention_spin)
+
+        if history is not None:
+            self.history_label = QLabel("Loading...")
+            self.history_label.setEnabled(False)
+            self._history_loaded.connect(self.history_label.setText)
+            general_layout.addRow("", self.history_label)
+            self._load_history(history)
+
+        self.advisories_check = QCheckBox("Flag updates that fix security advisories")
+        self.advisories_check.setChecked(config.advisories_enabled)
+        general_layout.addRow("Security:", self.advisories_check)
+
+        self.advisories_feed_edit = QLineEdit(config.advisories_feed)
+        self.advisories_feed_edit.setToolTip("URL or local file of an arch-audit style JSON feed")
+        general_layout.addRow("Advisory feed:", self.advisories_feed_edit)
+
+        self.advisories_refresh_spin = QSpinBox()
+        self.advisories_refresh_spin.setRange(1, 168)
+        self.advisories_refresh_spin.setSuffix(" hours")
+        self.advisories_refresh_spin.setValue(config.advisories_refresh_hours)
+        general_layout.addRow("Refresh feed every:", self.advisories_refresh_spin)
+
+        for w in (self.advisories_feed_edit, self.advisories_refresh_spin):
+            self.advisories_check.toggled.connect(w.setEnabled)
+            w.setEnabled(config.advisories_enabled)
+
+        self.cache_keep_spin = QSpinBox()
+        self.cache_keep_spin.setRange(1, 20)
+        self.cache_keep_spin.setSuffix(" versions")
+        self.cache_keep_spin.setValue(config.cache_keep_versions)
+        self.cache_keep_spin.setToolTip(
+            "\"Clean Package Cache\" keeps this many versions of each installed package "
+            "and removes packages that are no longer installed"
+        )
+        general_layout.addRow("Package cache keeps:", self.cache_keep_spin)
+
+        self.offline_probe_check = QCheckBox("Skip checks while the network is down")
+        self.offline_probe_check.setChecked(config.offline_probe)
+        self.offline_probe_check.setToolTip(
+            "Connect to a mirror first (under a second) instead of waiting for the checks "
+            "to time out; checks again when the network is back"
+        )
+        general_layout.addRow("Offline detection:", self.offline_probe_check)
+
+        self.probe_host_edit = QLineEdit(config.probe_host)
+        self.probe_host_edit.setPlaceholderText("first pacman mirrors")
+        self.probe_host_edit.setToolTip("Host, host:port or URL to connect to")
+        self.probe_host_edit.setEnabled(config.offline_probe)
+        self.offline_probe_check.toggled.connect(self.probe_host_edit.setEnabled)
+        general_layout.addRow("Probe host:", self.probe_host_edit)
+
+        self.power_saving_check = QCheckBox("Save power and data on battery or metered networks")
+        self.power_saving_check.setChecked(config.power_saving)
+        self.power_saving_check.setToolTip(
+            "Check less often and skip background downloads, remote checks and animations "
+            "until the charger or an unmetered network is back"
+        )
+        general_layout.addRow("Power saving:", self.power_saving_check)
+
+        self.power_factor_spin = QSpinBox()
+        self.power_factor_spin.setRange(1, 24)
+        self.power_factor_spin.setPrefix("\u00d7")
+        self.power_factor_spin.setValue(config.power_saving_interval_factor)
+        self.power_factor_spin.setToolTip("How much longer the check interval gets while saving power")
+        self.power_factor_spin.setEnabled(config.power_saving)
+        self.power_saving_check.toggled.connect(self.power_factor_spin.setEnabled)
+        general_layout.addRow("Stretch interval:", self.power_factor_spin)
+
+        self.diagnostics_check = QCheckBox("Record memory use and allow tracemalloc snapshots")
+        self.diagnostics_check.setChecked(config.diagnostics_enabled)
+        self.diagnostics_check.setToolTip(
+            "Samples go to ~/.cache/yay-sys-tray/diagnostics; take a snapshot from the "
+            "tray menu, with 'yay-sys-tray --snapshot' or by sending SIGUSR1"
+        )
+        general_layout.addRow("Diagnostics:", self.diagnostics_check)
+
+        self.diagnostics_interval_spin = QSpinBox()
+        self.diagnostics_interval_spin.setRange(1, 1440)
+        self.diagnostics_interval_spin.setSuffix(" minutes")
+        self.diagnostics_interval_spin.setValue(config.diagnostics_interval_minutes)
+        self.diagnostics_interval_spin.setEnabled(config.diagnostics_enabled)
+        self.diagnostics_check.toggled.connect(self.diagnostics_interval_spin.setEnabled)
+        general_layout.addRow("Sample memory every:", self.diagnostics_interval_spin)
+
         tabs.addTab(general_widget, "General")
 
         # --- Tailscale Tab ---
@@ -268,12 +535,49 @@ class SettingsDialog(QDialog):
         self.tailscale_timeout_spin.setRange(5, 60)
         self.tailscale_timeout_spin.setSuffix(" seconds")
         self.tailscale_timeout_spin.setValue(config.tailscale_timeout)
+        self.tailscale_timeout_spin.setToolTip(
+            "Longest wait to log in to a host. Each host's timeout is learned from how "
+            "long it took before, between the minimum and this"
+        )
         tailscale_layout.addRow("SSH timeout:", self.tailscale_timeout_spin)
 
-        self.tailscale_enabled_check.toggled.connect(self.tag_pills.setEnabled)
-        self.tailscale_enabled_check.toggled.connect(self.tailscale_timeout_spin.setEnabled)
-        self.tag_pills.setEnabled(config.tailscale_enabled)
-        self.tailscale_timeout_spin.setEnabled(config.tailscale_enabled)
+        self.tailscale_timeout_min_spin = QSpinBox()
+        self.tailscale_timeout_min_spin.setRange(1, 60)
+        self.tailscale_timeout_min_spin.setSuffix(" seconds")
+        self.tailscale_timeout_min_spin.setValue(config.tailscale_timeout_min)
+        tailscale_layout.addRow("Minimum SSH timeout:", self.tailscale_timeout_min_spin)
+
+        self.tailscale_command_spin = QSpinBox()
+        self.tailscale_command_spin.setRange(15, 900)
+        self.tailscale_command_spin.setSuffix(" seconds")
+        self.tailscale_command_spin.setValue(config.tailscale_command_timeout)
+        self.tailscale_command_spin.setToolTip(
+            "Longest time checkupdates may take on a host that is slow but answering"
+        )
+        tailscale_layout.addRow("Check timeout:", self.tailscale_command_spin)
+
+        self.fleet_parallel_spin = QSpinBox()
+        self.fleet_parallel_spin.setRange(1, 32)
+        self.fleet_parallel_spin.setSuffix(" at once")
+        self.fleet_parallel_spin.setValue(config.fleet_parallel)
+        tailscale_layout.addRow("Host updates:", self.fleet_parallel_spin)
+
+        self.fleet_failures_spin = QSpinBox()
+        self.fleet_failures_spin.setRange(1, 100)
+        self.fleet_failures_spin.setSuffix(" failed hosts")
+        self.fleet_failures_spin.setValue(config.fleet_max_failures)
+        tailscale_layout.addRow("Stop after:", self.fleet_failures_spin)
+
+        for w in (
+            self.tag_pills,
+            self.tailscale_timeout_spin,
+            self.tailscale_timeout_min_spin,
+            self.tailscale_command_spin,
+            self.fleet_parallel_spin,
+            self.fleet_failures_spin,
+        ):
+            self.tailscale_enabled_check.toggled.connect(w.setEnabled)
+            w.setEnabled(config.tailscale_enabled)
 
         tabs.addTab(tailscale_widget, "Tailscale")
 
@@ -285,19 +589,61 @@ class SettingsDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
+    def _load_history(self, history: HistoryStore):
+        now = time.time()
+        queries = (
+            history.oldest_pending(),
+            history.average_time_to_update(),
+            history.check_latency(now - 30 * 86400),
+        )
+
+        # The store runs its queries in order, so the last one finishing means all have
+        def done(_future):
+            try:
+                text = _history_summary(*(q.result() for q in queries), now)
+            except Exception as e:
+                text = f"History unavailable: {e}"
+            try:
+                self._history_loaded.emit(text)
+            except RuntimeError:
+                pass  # the dialog was closed meanwhile
+
+        queries[-1].add_done_callback(done)
+
     def get_config(self) -> AppConfig:
-        return AppConfig(
+        return replace(
+            self._config,
             check_interval_minutes=max(5, self.interval_widget.value()),
             notify=self.notify_combo.currentText(),
             terminal=self.terminal_edit.text().strip(),
             noconfirm=self.noconfirm_check.isChecked(),
             autostart=self.autostart_check.isChecked(),
             animations=self.animations_check.isChecked(),
+            update_sources=",".join(n for n, c in self.source_checks.items() if c.isChecked()),
             recheck_interval_minutes=self.recheck_spin.value(),
             passwordless_updates=self.passwordless_check.isChecked(),
+            prefetch_enabled=self.prefetch_check.isChecked(),
+            prefetch_rate_kib=self.prefetch_rate_spin.value(),
+            prefetch_parallel=self.prefetch_parallel_spin.value(),
+            history_enabled=self.history_check.isChecked(),
+            history_retention_days=self.history_retention_spin.value(),
+            advisories_enabled=self.advisories_check.isChecked(),
+            advisories_feed=self.advisories_feed_edit.text().strip() or self._config.advisories_feed,
+            advisories_refresh_hours=self.advisories_refresh_spin.value(),
+            cache_keep_versions=self.cache_keep_spin.value(),
+            offline_probe=self.offline_probe_check.isChecked(),
+            probe_host=self.probe_host_edit.text().strip(),
+            power_saving=self.power_saving_check.isChecked(),
+            power_saving_interval_factor=self.power_factor_spin.value(),
+            diagnostics_enabled=self.diagnostics_check.isChecked(),
+            diagnostics_interval_minutes=self.diagnostics_interval_spin.value(),
             tailscale_enabled=self.tailscale_enabled_check.isChecked(),
             tailscale_tags=",".join(self.tag_pills.selected()),
             tailscale_timeout=self.tailscale_timeout_spin.value(),
+            tailscale_timeout_min=self.tailscale_timeout_min_spin.value(),
+            tailscale_command_timeout=self.tailscale_command_spin.value(),
+            fleet_parallel=self.fleet_parallel_spin.value(),
+            fleet_max_failures=self.fleet_failures_spin.value(),
         )
 
 
@@ -310,10 +656,53 @@ def _version_diff_index(old: str, new: str) -> int:
     return min_len
 
 
+def _static_text(text: str, font: QFont) -> QStaticText:
+    static = QStaticText(text)
+    static.setTextFormat(Qt.TextFormat.PlainText)
+    static.setPerformanceHint(QStaticText.PerformanceHint.AggressiveCaching)
+    static.prepare(QTransform(), font)
+    return static
+
+
+class _CardLayout:
+    """Precomputed text, paths and positions for one update card."""
+
+    def __init__(self):
+        self.card_path = QPainterPath()
+        self.card_bg = QColor()
+        self.name_font = QFont()
+        self.name_text = QStaticText()
+        self.name_pos = QPointF()
+        self.badge_font = QFont()
+        self.badges: list[tuple[QPainterPath, QColor, QColor, QPointF, QStaticText]] = []
+        self.version_font = QFont()
+        self.version_spans: list[tuple[str, QPointF, QStaticText]] = []
+        self.icons: dict[str, QRectF] = {}
+        self.icon_glyphs: list[tuple[str, QFont, QPointF, QStaticText]] = []
+
+
+def _advisory_text(update: UpdateInfo) -> str:
+    lines = ["Fixes:"]
+    for a in update.advisories:
+        lines.append(f"{a.label} ({a.severity}, {a.type or 'unknown'}): fixed in {a.fixed}")
+        if a.issues:
+            more = f" and {len(a.issues) - 4} more" if len(a.issues) > 4 else ""
+            lines.append(f"  {', '.join(a.issues[:4])}{more}")
+    return "\n".join(lines)
+
+
+def _card_tooltip(update: UpdateInfo) -> str:
+    parts = [size_summary([update])]
+    if update.advisories:
+        parts.append(_advisory_text(update))
+    return "\n".join(p for p in parts if p)
+
+
 class UpdateItemDelegate(QStyledItemDelegate):
     CARD_MARGIN = 4
     CARD_PADDING = 10
     CARD_RADIUS = 8
+    CARD_HEIGHT = 58
     NAME_FONT_SIZE_DELTA = 1
     ICON_SIZE = 18
     ICON_GAP = 6
@@ -321,12 +710,28 @@ class UpdateItemDelegate(QStyledItemDelegate):
     NEW_DIFF_COLOR = QColor(38, 162, 105)
     RESTART_COLOR = QColor(244, 67, 54)
     RESTART_BG = QColor(244, 67, 54, 25)
+    SEVERITY_COLORS: dict[str, QColor] = {
+        "Critical": QColor(183, 28, 28),
+        "High": QColor(229, 57, 53),
+        "Medium": QColor(245, 124, 0),
+        "Low": QColor(192, 160, 0),
+    }
     REPO_COLORS: dict[str, QColor] = {
         "core": QColor(66, 133, 244),
         "extra": QColor(52, 168, 83),
         "multilib": QColor(251, 188, 4),
         "aur": QColor(171, 71, 188),
+        "flatpak": QColor(0, 150, 136),
+        "fwupd": QColor(121, 85, 72),
     }
+    LAYOUT_CACHE_SIZE = 1024
+    CHROME_CACHE_SIZE = 32
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._layouts: OrderedDict[tuple, _CardLayout] = OrderedDict()
+        self._icon_cache: dict[tuple, dict[str, QRectF]] = {}
+        self._chrome_cache: dict[tuple, QPixmap] = {}
 
     def paint(self, painter: QPainter, option: QStyleOptionViewItem, index):
         data = index.data(Qt.ItemDataRole.UserRole)
@@ -364,197 +769,245 @@ class UpdateItemDelegate(QStyledItemDelegate):
         painter.restore()
 
     def _paint_update_card(self, painter: QPainter, option: QStyleOptionViewItem, update: UpdateInfo):
+        layout = self._card_layout(option, update)
+        selected = bool(option.state & option.state.State_Selected)
+        palette = option.palette
+        highlighted = palette.highlightedText().color()
+        dim_color = palette.placeholderText().color()
+
         painter.save()
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.translate(option.rect.topLeft())
 
-        # Card rect with margin
-        m = self.CARD_MARGIN
-        card_rect = QRectF(
-            option.rect.x() + m,
-            option.rect.y() + m,
-            option.rect.width() - 2 * m,
-            option.rect.height() - 2 * m,
+        # Card background, border and icons come from a shared pre-rendered pixmap
+        painter.drawPixmap(0, 0, self._card_chrome(option, update, layout, selected))
+
+        # Package name (bold, slightly larger)
+        painter.setFont(layout.name_font)
+        painter.setPen(highlighted if selected else palette.text().color())
+        painter.drawStaticText(layout.name_pos, layout.name_text)
+
+        # Repository and restart badges after the package name
+        painter.setFont(layout.badge_font)
+        for badge_path, fill, color, pos, text in layout.badges:
+            painter.fillPath(badge_path, fill)
+            painter.setPen(color)
+            painter.drawStaticText(pos, text)
+
+        # Version line with diff highlighting
+        painter.setFont(layout.version_font)
+        colors = {
+            "dim": dim_color,
+            "old": self.OLD_DIFF_COLOR,
+            "new": self.NEW_DIFF_COLOR,
+        }
+        for role, pos, text in layout.version_spans:
+            painter.setPen(highlighted if selected else colors[role])
+            painter.drawStaticText(pos, text)
+
+        painter.restore()
+
+    def _card_chrome(
+        self,
+        option: QStyleOptionViewItem,
+        update: UpdateInfo,
+        layout: _CardLayout,
+        selected: bool,
+    ) -> QPixmap:
+        """Render the card background and right-side icons once per card shape."""
+        dpr = option.widget.devicePixelRatioF() if option.widget else 1.0
+        key = (
+            bool(update.description), update.has_url, update.is_package,
+            option.rect.width(), option.rect.height(),
+            option.font.key(), option.palette.cacheKey(), selected, dpr,
         )
+        pixmap = self._chrome_cache.get(key)
+        if pixmap is not None:
+            return pixmap
 
-        # Card background (derived from system palette)
-        path = QPainterPath()
-        path.addRoundedRect(card_rect, self.CARD_RADIUS, self.CARD_RADIUS)
+        palette = option.palette
+        pixmap = QPixmap(
+            int(option.rect.width() * dpr), int(option.rect.height() * dpr),
+        )
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
-        if option.state & option.state.State_Selected:
-            painter.fillPath(path, option.palette.highlight())
+        # Card background (derived from system palette)
+        if selected:
+            painter.fillPath(layout.card_path, palette.highlight())
         else:
-            base = option.palette.base().color()
-            mid = option.palette.midlight().color()
-            card_bg = QColor(
-                (base.red() + mid.red()) // 2,
-                (base.green() + mid.green()) // 2,
-                (base.blue() + mid.blue()) // 2,
-            )
-            painter.fillPath(path, card_bg)
-            painter.setPen(QPen(option.palette.mid().color(), 1))
-            painter.drawPath(path)
+            painter.fillPath(layout.card_path, layout.card_bg)
+            painter.setPen(QPen(palette.mid().color(), 1))
+            painter.drawPath(layout.card_path)
+
+        # Right-side icons
+        dim_color = palette.placeholderText().color()
+        icon_pens = {
+            "info": QPen(QColor(66, 133, 244), 1.5),
+            "link": QPen(palette.link().color(), 1.5),
+            "rdeps": QPen(dim_color, 1.5),
+            "deps": QPen(dim_color, 1.5),
+            "remove": QPen(QColor(220, 50, 47), 1.5),
+        }
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for name, font, pos, text in layout.icon_glyphs:
+            painter.setPen(icon_pens[name])
+            painter.drawEllipse(layout.icons[name])
+            painter.setFont(font)
+            painter.drawStaticText(pos, text)
+        painter.end()
+
+        if len(self._chrome_cache) > self.CHROME_CACHE_SIZE:
+            self._chrome_cache.clear()
+        self._chrome_cache[key] = pixmap
+        return pixmap
+
+    def _card_layout(self, option: QStyleOptionViewItem, update: UpdateInfo) -> _CardLayout:
+        """Return the cached text layout for a card, building it on a miss."""
+        key = (
+            update.package, update.old_version, update.new_version, update.repository,
+            bool(update.description), update.has_url, update.is_package,
+            highest_severity(update.advisories) if update.advisories else "",
+            option.rect.width(), option.rect.height(),
+            option.font.key(), option.palette.cacheKey(),
+        )
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self._layouts.move_to_end(key)
+            return layout
+        layout = self._build_card_layout(option, update)
+        self._layouts[key] = layout
+        if len(self._layouts) > self.LAYOUT_CACHE_SIZE:
+            self._layouts.popitem(last=False)
+        return layout
+
+    def _build_card_layout(self, option: QStyleOptionViewItem, update: UpdateInfo) -> _CardLayout:
+        # Everything is relative to the item's top-left corner
+        m = self.CARD_MARGIN
+        card_rect = QRectF(m, m, option.rect.width() - 2 * m, option.rect.height() - 2 * m)
+        layout = _CardLayout()
+
+        layout.card_path.addRoundedRect(card_rect, self.CARD_RADIUS, self.CARD_RADIUS)
+        base = option.palette.base().color()
+        mid = option.palette.midlight().color()
+        layout.card_bg = QColor(
+            (base.red() + mid.red()) // 2,
+            (base.green() + mid.green()) // 2,
+            (base.blue() + mid.blue()) // 2,
+        )
 
         p = self.CARD_PADDING
         x = card_rect.x() + p
         y = card_rect.y() + p
-        w = card_rect.width() - 2 * p
 
-        # Package name (bold, slightly larger)
-        name_font = QFont(option.font)
-        name_font.setBold(True)
-        name_font.setPointSize(name_font.pointSize() + self.NAME_FONT_SIZE_DELTA)
-        painter.setFont(name_font)
-        if option.state & option.state.State_Selected:
-            painter.setPen(option.palette.highlightedText().color())
-        else:
-            painter.setPen(option.palette.text().color())
-        painter.drawText(int(x), int(y), int(w), 20, Qt.AlignmentFlag.AlignLeft, update.package)
-
-        # Badges after the package name
-        badge_font = QFont(option.font)
-        badge_font.setPointSize(badge_font.pointSize() - 2)
-        badge_font.setBold(True)
-        name_fm = painter.fontMetrics()
+        # Package name
+        layout.name_font = QFont(option.font)
+        layout.name_font.setBold(True)
+        layout.name_font.setPointSize(layout.name_font.pointSize() + self.NAME_FONT_SIZE_DELTA)
+        layout.name_text = _static_text(update.package, layout.name_font)
+        layout.name_pos = QPointF(int(x), int(y))
+        name_fm = QFontMetrics(layout.name_font)
         cursor_x = x + name_fm.horizontalAdvance(update.package) + 8
-        painter.setFont(badge_font)
-        badge_fm = painter.fontMetrics()
 
-        # Repository badge
+        # Badges
+        layout.badge_font = QFont(option.font)
+        layout.badge_font.setPointSize(layout.badge_font.pointSize() - 2)
+        layout.badge_font.setBold(True)
+        badge_fm = QFontMetrics(layout.badge_font)
+        badges = []
+        if update.advisories:
+            severity = highest_severity(update.advisories)
+            color = self.SEVERITY_COLORS.get(severity, QColor(128, 128, 128))
+            badges.append((
+                f"security · {severity.lower()}",
+                QColor(color.red(), color.green(), color.blue(), 30),
+                color,
+            ))
         if update.repository:
-            repo_text = update.repository
-            repo_w = badge_fm.horizontalAdvance(repo_text) + 8
-            repo_h = badge_fm.height() + 2
-            repo_rect = QRectF(cursor_x, y + 2, repo_w, repo_h)
-            repo_path = QPainterPath()
-            repo_path.addRoundedRect(repo_rect, 3, 3)
-            repo_color = self.REPO_COLORS.get(update.repository, QColor(128, 128, 128))
-            painter.fillPath(repo_path, QColor(repo_color.red(), repo_color.green(), repo_color.blue(), 25))
-            painter.setPen(repo_color)
-            painter.drawText(
-                int(cursor_x + 4), int(y + 2), int(repo_w), int(repo_h),
-                Qt.AlignmentFlag.AlignCenter, repo_text,
-            )
-            cursor_x += repo_w + 6
-
-        # Restart badge
+            color = self.REPO_COLORS.get(update.repository, QColor(128, 128, 128))
+            badges.append((
+                update.repository,
+                QColor(color.red(), color.green(), color.blue(), 25),
+                color,
+            ))
         if update.package in RESTART_PACKAGES:
-            badge_text = "restart"
-            badge_w = badge_fm.horizontalAdvance(badge_text) + 8
+            badges.append(("restart", self.RESTART_BG, self.RESTART_COLOR))
+        for text, fill, color in badges:
+            text_w = badge_fm.horizontalAdvance(text)
+            badge_w = text_w + 8
             badge_h = badge_fm.height() + 2
-            badge_rect = QRectF(cursor_x, y + 2, badge_w, badge_h)
-            badge_path = QPainterPath()
-            badge_path.addRoundedRect(badge_rect, 3, 3)
-            painter.fillPath(badge_path, self.RESTART_BG)
-            painter.setPen(self.RESTART_COLOR)
-            painter.drawText(
-                int(cursor_x + 4), int(y + 2), int(badge_w), int(badge_h),
-                Qt.AlignmentFlag.AlignCenter, badge_text,
+            path = QPainterPath()
+            path.addRoundedRect(QRectF(cursor_x, y + 2, badge_w, badge_h), 3, 3)
+            # Text is centered in a box shifted 4px right, as drawText() placed it
+            pos = QPointF(
+                int(cursor_x + 4) + (int(badge_w) - text_w) / 2,
+                int(y + 2) + (int(badge_h) - badge_fm.height()) / 2,
             )
+            layout.badges.append((path, fill, color, pos, _static_text(text, layout.badge_font)))
+            cursor_x += badge_w + 6
 
-        # Version line with diff highlighting
-        version_font = QFont(option.font)
-        version_font.setPointSize(version_font.pointSize() - 1)
-        painter.setFont(version_font)
-        fm = painter.fontMetrics()
+        # Version line, split where the two versions start to differ
+        layout.version_font = QFont(option.font)
+        layout.version_font.setPointSize(layout.version_font.pointSize() - 1)
+        fm = QFontMetrics(layout.version_font)
+        diff_idx = _version_diff_index(update.old_version, update.new_version)
+        spans = [
+            ("dim", update.old_version[:diff_idx]),
+            ("old", update.old_version[diff_idx:]),
+            ("dim", "  \u2192  "),
+            ("dim", update.new_version[:diff_idx]),
+            ("new", update.new_version[diff_idx:]),
+        ]
         vx = x
         vy = int(y + 24)
-        vh = 16
-
-        diff_idx = _version_diff_index(update.old_version, update.new_version)
-        old_common = update.old_version[:diff_idx]
-        old_diff = update.old_version[diff_idx:]
-        new_common = update.new_version[:diff_idx]
-        new_diff = update.new_version[diff_idx:]
-
-        selected = bool(option.state & option.state.State_Selected)
-        dim_color = option.palette.placeholderText().color()
-
-        # Old version: common part
-        if old_common:
-            painter.setPen(
-                option.palette.highlightedText().color() if selected else dim_color
-            )
-            painter.drawText(int(vx), vy, int(w), vh, Qt.AlignmentFlag.AlignLeft, old_common)
-            vx += fm.horizontalAdvance(old_common)
-
-        # Old version: differing part (red)
-        if old_diff:
-            painter.setPen(
-                option.palette.highlightedText().color() if selected else self.OLD_DIFF_COLOR
+        for role, text in spans:
+            if not text:
+                continue
+            layout.version_spans.append(
+                (role, QPointF(int(vx), vy), _static_text(text, layout.version_font))
             )
-            painter.drawText(int(vx), vy, int(w), vh, Qt.AlignmentFlag.AlignLeft, old_diff)
-            vx += fm.horizontalAdvance(old_diff)
-
-        # Arrow
-        arrow = "  \u2192  "
-        painter.setPen(
-            option.palette.highlightedText().color() if selected else dim_color
-        )
-        painter.drawText(int(vx), vy, int(w), vh, Qt.AlignmentFlag.AlignLeft, arrow)
-        vx += fm.horizontalAdvance(arrow)
-
-        # New version: common part
-        if new_common:
-            painter.setPen(
-                option.palette.highlightedText().color() if selected else dim_color
-            )
-            painter.drawText(int(vx), vy, int(w), vh, Qt.AlignmentFlag.AlignLeft, new_common)
-            vx += fm.horizontalAdvance(new_common)
-
-        # New version: differing part (green)
-        if new_diff:
-            painter.setPen(
-                option.palette.highlightedText().color() if selected else self.NEW_DIFF_COLOR
-            )
-            painter.drawText(int(vx), vy, int(w), vh, Qt.AlignmentFlag.AlignLeft, new_diff)
+            vx += fm.horizontalAdvance(text)
 
         # Right-side icons
-        icons = self._icon_positions(card_rect, update)
-        icon_color = option.palette.placeholderText().color()
-        painter.setBrush(Qt.BrushStyle.NoBrush)
+        layout.icons = self._icon_positions(card_rect, update)
+        bold_font = QFont(option.font)
+        bold_font.setBold(True)
+        info_font = QFont(option.font)
+        info_font.setPointSize(info_font.pointSize() - 1)
+        info_font.setItalic(True)
+        info_font.setBold(True)
+        glyphs = {
+            "info": (info_font, "i"),
+            "link": (bold_font, "\u2197"),
+            "rdeps": (bold_font, "\u2191"),
+            "deps": (bold_font, "\u2193"),
+            "remove": (bold_font, "\u00d7"),
+        }
+        for name, rect in layout.icons.items():
+            font, glyph = glyphs[name]
+            text = _static_text(glyph, font)
+            size = text.size()
+            pos = QPointF(
+                rect.center().x() - size.width() / 2,
+                rect.center().y() - size.height() / 2,
+            )
+            layout.icon_glyphs.append((name, font, pos, text))
 
-        if "info" in icons:
-            painter.setPen(QPen(QColor(66, 133, 244), 1.5))
-            painter.drawEllipse(icons["info"])
-            info_font = QFont(option.font)
-            info_font.setPointSize(info_font.pointSize() - 1)
-            info_font.setItalic(True)
-            info_font.setBold(True)
-            painter.setFont(info_font)
-            painter.drawText(icons["info"], Qt.AlignmentFlag.AlignCenter, "i")
-
-        if "link" in icons:
-            painter.setPen(QPen(option.palette.link().color(), 1.5))
-            painter.drawEllipse(icons["link"])
-            link_font = QFont(option.font)
-            link_font.setBold(True)
-            painter.setFont(link_font)
-            painter.drawText(icons["link"], Qt.AlignmentFlag.AlignCenter, "\u2197")
-
-        dep_font = QFont(option.font)
-        dep_font.setBold(True)
-        painter.setFont(dep_font)
-        painter.setPen(QPen(icon_color, 1.5))
-        painter.drawEllipse(icons["rdeps"])
-        painter.drawText(icons["rdeps"], Qt.AlignmentFlag.AlignCenter, "\u2191")
-        painter.drawEllipse(icons["deps"])
-        painter.drawText(icons["deps"], Qt.AlignmentFlag.AlignCenter, "\u2193")
-
-        if "remove" in icons:
-            painter.setPen(QPen(QColor(220, 50, 47), 1.5))
-            painter.drawEllipse(icons["remove"])
-            rm_font = QFont(option.font)
-            rm_font.setBold(True)
-            painter.setFont(rm_font)
-            painter.drawText(icons["remove"], Qt.AlignmentFlag.AlignCenter, "\u00d7")
+        return layout
 
-        painter.restore()
+    def invalidate(self):
+        """Drop cached layouts, e.g. after a resize or theme change."""
+        self._layouts.clear()
+        self._icon_cache.clear()
+        self._chrome_cache.clear()
 
     def sizeHint(self, option: QStyleOptionViewItem, index) -> QSize:
         data = index.data(Qt.ItemDataRole.UserRole)
         if isinstance(data, str):
             return QSize(option.rect.width(), 32)
-        return QSize(option.rect.width(), 58)
+        return QSize(option.rect.width(), self.CARD_HEIGHT)
 
     def _icon_positions(self, card_rect: QRectF, data: UpdateInfo) -> dict[str, QRectF]:
         """Compute positions of all right-side icons."""
@@ -569,11 +1022,15 @@ class UpdateItemDelegate(QStyledItemDelegate):
             positions["info"] = QRectF(right_edge, icon_y, sz, sz)
             right_edge -= self.ICON_GAP
 
-        if data.url:
+        if data.has_url:
             right_edge -= sz
             positions["link"] = QRectF(right_edge, icon_y, sz, sz)
             right_edge -= self.ICON_GAP
 
+        if not data.is_package:
+            # Dependencies and removal only apply to pacman packages
+            return positions
+
         right_edge -= sz
         positions["rdeps"] = QRectF(right_edge, icon_y, sz, sz)
         right_edge -= self.ICON_GAP
@@ -596,17 +1053,26 @@ class UpdateItemDelegate(QStyledItemDelegate):
         "remove": "Remove package",
     }
 
+    def _item_icons(self, item_rect: QRectF, data: UpdateInfo) -> dict[str, QRectF]:
+        """Icon rects relative to the item's top-left, cached by card shape."""
+        key = (
+            bool(data.description), data.has_url, data.is_package,
+            item_rect.width(), item_rect.height(),
+        )
+        icons = self._icon_cache.get(key)
+        if icons is None:
+            m = self.CARD_MARGIN
+            card_rect = QRectF(m, m, item_rect.width() - 2 * m, item_rect.height() - 2 * m)
+            icons = self._icon_positions(card_rect, data)
+            self._icon_cache[key] = icons
+        return icons
+
     def helpEvent(self, event, view, option, index):
         if event.type() == QEvent.Type.ToolTip:
             data = index.data(Qt.ItemDataRole.UserRole)
             if isinstance(data, UpdateInfo):
-                m = self.CARD_MARGIN
-                card_rect = QRectF(
-                    option.rect.x() + m, option.rect.y() + m,
-                    option.rect.width() - 2 * m, option.rect.height() - 2 * m,
-                )
-                icons = self._icon_positions(card_rect, data)
-                pos = QPointF(event.pos())
+                icons = self._item_icons(QRectF(option.rect), data)
+                pos = QPointF(event.pos() - option.rect.topLeft())
                 for name, rect in icons.items():
                     if rect.contains(pos):
                         if name == "info":
@@ -616,31 +1082,179 @@ class UpdateItemDelegate(QStyledItemDelegate):
                         if tip:
                             QToolTip.showText(event.globalPos(), tip, view)
                             return True
+                tip = _card_tooltip(data)
+                if tip:
+                    QToolTip.showText(event.globalPos(), tip, view)
+                    return True
                 QToolTip.hideText()
                 return True
         return super().helpEvent(event, view, option, index)
 
     def icon_hit_test(self, item_rect: QRectF, click_pos: QPointF, data: UpdateInfo) -> str | None:
         """Return the icon name ('link', 'deps', 'rdeps') if clicked, or None."""
-        m = self.CARD_MARGIN
-        card_rect = QRectF(
-            item_rect.x() + m, item_rect.y() + m,
-            item_rect.width() - 2 * m, item_rect.height() - 2 * m,
-        )
-        icons = self._icon_positions(card_rect, data)
+        icons = self._item_icons(item_rect, data)
+        pos = click_pos - item_rect.topLeft()
         for name in ("link", "deps", "rdeps", "remove"):
-            if name in icons and icons[name].contains(click_pos):
+            if name in icons and icons[name].contains(pos):
                 return name
         return None
 
 
-class _ClickableUpdateList(QListWidget):
-    """QListWidget that handles icon clicks on update cards."""
+class UpdateListModel(QAbstractListModel):
+    """List model of UpdateInfo rows: security fixes by severity, then restart, then by name.
+
+    set_updates() applies the difference to the current rows (remove, insert,
+    change) so attached views keep their scroll position and selection.
+    """
+
+    def __init__(self, updates: list[UpdateInfo] | None = None, parent=None):
+        super().__init__(parent)
+        self._all: list[UpdateInfo] = _sort_updates(updates or [])
+        self._filter: set[str] | None = None
+        self._rows: list[UpdateInfo] = list(self._all)
+        # Security rank each shown row was sorted with; rows are shared and
+        # re-tagged in place, so the rank is kept separately
+        self._ranks: dict[str, int] = _security_ranks(self._rows)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        update = self._rows[index.row()]
+        if role == Qt.ItemDataRole.UserRole:
+            return update
+        if role == Qt.ItemDataRole.DisplayRole:
+            return update.package
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return QSize(0, UpdateItemDelegate.CARD_HEIGHT)
+        return None
+
+    def updates(self) -> list[UpdateInfo]:
+        """The rows currently shown, after filtering."""
+        return list(self._rows)
+
+    def total_count(self) -> int:
+        return len(self._all)
+
+    def set_updates(self, updates: list[UpdateInfo]):
+        # Kept sorted so filtering only has to drop rows, never re-sort
+        self._all = _sort_updates(updates)
+        self._apply(self._visible())
+
+    def set_filter(self, packages: set[str] | None):
+        """Show only the given packages, or everything when None."""
+        if packages == self._filter:
+            return
+        self._filter = packages
+        self._apply(self._visible())
+
+    def _visible(self) -> list[UpdateInfo]:
+        if self._filter is None:
+            return self._all
+        return [u for u in self._all if u.package in self._filter]
+
+    def _apply(self, new_rows: list[UpdateInfo]):
+        """Diff the shown rows against new_rows, which must already be sorted."""
+        new_keys = {u.package for u in new_rows}
+        new_ranks = _security_ranks(new_rows)
+        old_ranks = self._ranks
+        if old_ranks or new_ranks:
+            # A row whose security rank changed moves, so it is removed and re-inserted
+            new_keys -= {
+                p for p in old_ranks.keys() | new_ranks.keys()
+                if old_ranks.get(p, 0) != new_ranks.get(p, 0)
+            }
+
+        # Remove rows that are gone, in contiguous runs from the bottom up
+        row = len(self._rows) - 1
+        while row >= 0:
+            if self._rows[row].package in new_keys:
+                row -= 1
+                continue
+            end = row
+            while row >= 0 and self._rows[row].package not in new_keys:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, end)
+            del self._rows[row + 1:end + 1]
+            self.endRemoveRows()
+
+        # Both lists now share one sort order, so a single merge pass inserts
+        # the new rows and spots the changed ones
+        changed: list[int] = []
+        row = 0
+        while row < len(new_rows):
+            update = new_rows[row]
+            if row < len(self._rows) and self._rows[row].package == update.package:
+                if self._rows[row] is not update and self._rows[row] != update:
+                    self._rows[row] = update
+                    changed.append(row)
+                row += 1
+                continue
+            # Insert the run of new rows that sorts before the next existing row
+            anchor = self._rows[row].package if row < len(self._rows) else None
+            end = row
+            while end < len(new_rows) and new_rows[end].package != anchor:
+                end += 1
+            self.beginInsertRows(QModelIndex(), row, end - 1)
+            self._rows[row:row] = new_rows[row:end]
+            self.endInsertRows()
+            row = end
+
+        self._ranks = new_ranks
+        if changed:
+            self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]))
+
+
+def _security_rank(update: UpdateInfo) -> int:
+    """0 without advisories, otherwise 1 + the rank of the highest severity fixed."""
+    if not update.advisories:
+        return 0
+    return 1 + severity_rank(highest_severity(update.advisories))
+
+
+def _security_ranks(updates: list[UpdateInfo]) -> dict[str, int]:
+    return {u.package: _security_rank(u) for u in updates if u.advisories}
+
+
+def _sort_updates(updates: list[UpdateInfo]) -> list[UpdateInfo]:
+    return sorted(
+        updates,
+        key=lambda u: (
+            -_security_rank(u) if u.advisories else 0,
+            u.package not in RESTART_PACKAGES,
+            u.package.lower(),
+        ),
+    )
+
+
+class _ClickableUpdateList(QListView):
+    """QListView that handles icon clicks on update cards."""
 
     def __init__(self, parent=None, on_remove: Callable[[str, str], None] | None = None):
         super().__init__(parent)
         self._on_remove = on_remove
 
+    def _invalidate_layouts(self):
+        delegate = self.itemDelegate()
+        if isinstance(delegate, UpdateItemDelegate):
+            delegate.invalidate()
+
+    def resizeEvent(self, event):
+        if event.size().width() != event.oldSize().width():
+            self._invalidate_layouts()
+        super().resizeEvent(event)
+
+    def changeEvent(self, event):
+        if event.type() in (
+            QEvent.Type.PaletteChange,
+            QEvent.Type.FontChange,
+            QEvent.Type.StyleChange,
+        ):
+            self._invalidate_layouts()
+        super().changeEvent(event)
+
     def mouseReleaseEvent(self, event):
         pos = event.position().toPoint()
         index = self.indexAt(pos)
@@ -651,7 +1265,7 @@ class _ClickableUpdateList(QListWidget):
                 if isinstance(delegate, UpdateItemDelegate):
                     rect = QRectF(self.visualRect(index))
                     icon = delegate.icon_hit_test(rect, event.position(), data)
-                    if icon == "link" and data.url:
+                    if icon == "link" and data.has_url:
                         QDesktopServices.openUrl(QUrl(data.url))
                         return
                     if icon == "deps":
@@ -702,43 +1316,71 @@ def _make_update_list(
     parent: QWidget,
     on_remove: Callable[[str, str], None] | None = None,
 ) -> _ClickableUpdateList:
-    """Create a styled QListWidget populated with update cards."""
-    sorted_updates = sorted(
-        updates,
-        key=lambda u: (u.package not in RESTART_PACKAGES, u.package.lower()),
-    )
-    lw = _ClickableUpdateList(parent, on_remove=on_remove)
-    lw.setItemDelegate(UpdateItemDelegate(lw))
-    lw.setSelectionMode(_ClickableUpdateList.SelectionMode.NoSelection)
-    lw.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-    lw.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-    lw.setResizeMode(_ClickableUpdateList.ResizeMode.Adjust)
-    lw.setMouseTracking(True)
-    lw.setStyleSheet("QListWidget { background: transparent; border: none; }")
-    lw.setSpacing(2)
-    for update in sorted_updates:
-        item = QListWidgetItem()
-        item.setData(Qt.ItemDataRole.UserRole, update)
-        item.setSizeHint(QSize(0, 58))
-        lw.addItem(item)
-    return lw
+    """Create a styled list view backed by an UpdateListModel."""
+    lv = _ClickableUpdateList(parent, on_remove=on_remove)
+    lv.setModel(UpdateListModel(updates, lv))
+    lv.setItemDelegate(UpdateItemDelegate(lv))
+    lv.setUniformItemSizes(True)
+    lv.setSelectionMode(_ClickableUpdateList.SelectionMode.NoSelection)
+    lv.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+    lv.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    lv.setResizeMode(_ClickableUpdateList.ResizeMode.Adjust)
+    lv.setMouseTracking(True)
+    lv.setStyleSheet("QListView { background: transparent; border: none; }")
+    lv.setSpacing(2)
+    return lv
+
+
+class _PactreeRunner(QThread):
+    """Run pactree off the GUI thread, for when the local DB cannot be read."""
+
+    finished_text = pyqtSignal(str)
+
+    def __init__(self, package: str, reverse: bool):
+        super().__init__()
+        self.cmd = ["pactree", "-r", package] if reverse else ["pactree", package]
+
+    def run(self):
+        import subprocess
+
+        try:
+            result = subprocess.run(self.cmd, capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                text = result.stdout.rstrip()
+            else:
+                text = result.stderr.strip() or "No results."
+        except FileNotFoundError:
+            text = (
+                "pactree not found.\n"
+                "Install pacman-contrib:\n"
+                "  sudo pacman -S pacman-contrib"
+            )
+        except subprocess.TimeoutExpired:
+            text = "Command timed out."
+        self.finished_text.emit(text)
 
 
 class DependencyTreeDialog(QDialog):
-    """Show the output of pactree for a package."""
+    """Browse a package's dependencies or reverse dependencies as a tree.
 
-    def __init__(self, package: str, reverse: bool = False, parent=None):
-        import subprocess
+    The tree comes from the shared in-memory graph of the local pacman DB and
+    children are added only when a node is expanded. pactree is the fallback
+    when the DB cannot be read or the package is not installed.
+    """
 
+    _PLACEHOLDER_ROLE = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, package: str, reverse: bool = False, parent=None):
         super().__init__(parent)
+        self._package = package
+        self._reverse = reverse
+        self._graph = local_graph()
         self._settings_key = "rdeps_dialog/size" if reverse else "deps_dialog/size"
 
         if reverse:
             self.setWindowTitle(f"Required by: {package}")
-            cmd = ["pactree", "-r", package]
         else:
             self.setWindowTitle(f"Dependencies: {package}")
-            cmd = ["pactree", package]
 
         self.setWindowIcon(create_app_icon())
         self.setMinimumSize(400, 300)
@@ -749,31 +1391,81 @@ class DependencyTreeDialog(QDialog):
 
         layout = QVBoxLayout(self)
 
-        text = QTextEdit()
-        text.setReadOnly(True)
-        text.setFont(QFont("monospace", 10))
-
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                text.setPlainText(result.stdout.rstrip())
-            else:
-                text.setPlainText(result.stderr.strip() or "No results.")
-        except FileNotFoundError:
-            text.setPlainText(
-                "pactree not found.\n"
-                "Install pacman-contrib:\n"
-                "  sudo pacman -S pacman-contrib"
-            )
-        except subprocess.TimeoutExpired:
-            text.setPlainText("Command timed out.")
+        self._tree = QTreeWidget()
+        self._tree.setHeaderHidden(True)
+        self._tree.setUniformRowHeights(True)
+        self._tree.itemExpanded.connect(self._on_item_expanded)
+        layout.addWidget(self._tree)
 
-        layout.addWidget(text)
+        self._text = QTextEdit()
+        self._text.setReadOnly(True)
+        self._text.setFont(QFont("monospace", 10))
+        self._text.hide()
+        layout.addWidget(self._text)
 
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
         buttons.accepted.connect(self.accept)
         layout.addWidget(buttons)
 
+        if self._graph.loaded and not self._graph.is_stale():
+            self._on_graph_loaded(True)
+        else:
+            self._show_text("Loading package database…")
+            loader = GraphLoader(self._graph)
+            loader.loaded.connect(self._on_graph_loaded)
+            _keep_until_finished(loader)
+            loader.start()
+
+    def _on_graph_loaded(self, ok: bool):
+        if not ok or self._package not in self._graph:
+            self._show_text("Running pactree…")
+            runner = _PactreeRunner(self._package, self._reverse)
+            runner.finished_text.connect(self._show_text)
+            _keep_until_finished(runner)
+            runner.start()
+            return
+        self._text.hide()
+        self._tree.show()
+        self._tree.clear()
+        root = self._make_item(self._package, ())
+        self._tree.addTopLevelItem(root)
+        root.setExpanded(True)
+
+    def _show_text(self, text: str):
+        self._tree.hide()
+        self._text.setPlainText(text)
+        self._text.show()
+
+    def _children(self, package: str) -> tuple[str, ...]:
+        if self._reverse:
+            return self._graph.required_by(package)
+        return self._graph.dependencies(package)
+
+    def _make_item(self, package: str, ancestors: tuple[str, ...]) -> QTreeWidgetItem:
+        item = QTreeWidgetItem([package])
+        item.setData(0, Qt.ItemDataRole.UserRole, ancestors + (package,))
+        if package in ancestors:
+            item.setText(0, f"{package} (cycle)")
+            item.setForeground(0, QColor("#888888"))
+        elif package not in self._graph:
+            item.setText(0, f"{package} (not installed)")
+            item.setForeground(0, QColor("#888888"))
+        elif self._children(package):
+            # Stand-in so the expand arrow shows before children exist
+            placeholder = QTreeWidgetItem([""])
+            placeholder.setData(0, self._PLACEHOLDER_ROLE, True)
+            item.addChild(placeholder)
+        return item
+
+    def _on_item_expanded(self, item: QTreeWidgetItem):
+        first = item.child(0)
+        if first is None or not first.data(0, self._PLACEHOLDER_ROLE):
+            return
+        item.takeChild(0)
+        path = item.data(0, Qt.ItemDataRole.UserRole)
+        package = path[-1]
+        item.addChildren([self._make_item(child, path) for child in self._children(package)])
+
     def done(self, result):
         settings = QSettings("yay-sys-tray", "yay-sys-tray")
         settings.setValue(self._settings_key, self.size())
@@ -796,6 +1488,230 @@ def _make_restart_banner() -> QLabel:
     return label
 
 
+def _make_update_button(
+    needs_restart: bool,
+    on_update: Callable[[bool], None],
+    on_update_only: Callable[[], None] | None = None,
+) -> QWidget:
+    """Create "Update Now", or an "Update & Restart" split button when a restart is needed."""
+    if needs_restart:
+        split_btn = QToolButton()
+        split_btn.setText("Update && Restart")
+        split_btn.setPopupMode(QToolButton.ToolButtonPopupMode.MenuButtonPopup)
+        split_btn.clicked.connect(lambda: on_update(True))
+        menu = QMenu(split_btn)
+        menu.addAction(
+            "Update Only (no restart)",
+            on_update_only if on_update_only else lambda: on_update(False),
+        )
+        split_btn.setMenu(menu)
+        return split_btn
+    update_btn = QPushButton("Update Now")
+    update_btn.clicked.connect(lambda: on_update(False))
+    return update_btn
+
+
+class _UpdatesPane(QWidget):
+    """Restart banner, update list and optional update button for one system."""
+
+    def __init__(
+        self,
+        updates: list[UpdateInfo],
+        needs_restart: bool,
+        on_update: Callable[[bool], None] | None = None,
+        on_remove: Callable[[str, str], None] | None = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._on_update = on_update
+        self._needs_restart = needs_restart
+        self.label = ""
+        self.size_text = ""  # download total shown in the tab
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 4, 0, 0)
+
+        self._banner = _make_restart_banner()
+        self._banner.setVisible(needs_restart)
+        layout.addWidget(self._banner)
+
+        self.view = _make_update_list(updates, self, on_remove=on_remove)
+        layout.addWidget(self.view)
+
+        self._btn_row = QHBoxLayout()
+        self._btn_row.addStretch()
+        self._update_btn: QWidget | None = None
+        if on_update:
+            self._update_btn = _make_update_button(needs_restart, on_update)
+            self._btn_row.addWidget(self._update_btn)
+            layout.addLayout(self._btn_row)
+
+    @property
+    def model(self) -> UpdateListModel:
+        return self.view.model()
+
+    def set_updates(self, updates: list[UpdateInfo], needs_restart: bool):
+        self.model.set_updates(updates)
+        self._banner.setVisible(needs_restart)
+        if needs_restart != self._needs_restart and self._update_btn is not None:
+            self._update_btn.deleteLater()
+            self._update_btn = _make_update_button(needs_restart, self._on_update)
+            self._btn_row.addWidget(self._update_btn)
+        self._needs_restart = needs_restart
+
+
+def _tab_text(pane: _UpdatesPane, count: str) -> str:
+    if pane.size_text:
+        return f"{pane.label} ({count}, {pane.size_text})"
+    return f"{pane.label} ({count})"
+
+
+class _HostItem(QTreeWidgetItem):
+    """Host row under a package; stays in name order whichever way packages sort."""
+
+    def __lt__(self, other):
+        tree = self.treeWidget()
+        if tree and tree.header().sortIndicatorOrder() == Qt.SortOrder.DescendingOrder:
+            return self.text(0) > other.text(0)
+        return self.text(0) < other.text(0)
+
+
+class _PackageMatrix(QWidget):
+    """"By package" view: each pending package once, with the hosts that need it.
+
+    Rows are synced from the index only while the view is shown, and only for
+    packages whose hosts changed. Host rows are added when a package is
+    expanded.
+    """
+
+    _HOST_ROLE = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(
+        self,
+        index: UpdateIndex,
+        on_update_hosts: Callable[[list[str]], None] | None = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._index = index
+        self._on_update_hosts = on_update_hosts
+        self._items: dict[str, QTreeWidgetItem] = {}
+        self._synced: dict[str, int] = {}  # package -> index version of its rows
+        self._version = -1
+        self._visible_packages: set[str] | None = None
+
+        layout = QVBoxLayout(self)
+        self._tree = QTreeWidget()
+        self._tree.setColumnCount(3)
+        self._tree.setHeaderLabels(["Package", "Hosts", "Versions"])
+        self._tree.setUniformRowHeights(True)
+        self._tree.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
+        self._tree.setSortingEnabled(True)
+        self._tree.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+        self._tree.itemExpanded.connect(self._on_item_expanded)
+        self._tree.itemSelectionChanged.connect(self._update_button)
+        layout.addWidget(self._tree)
+
+        self._update_btn = None
+        if on_update_hosts is not None:
+            self._update_btn = QPushButton()
+            self._update_btn.clicked.connect(self._launch)
+            row = QHBoxLayout()
+            row.addStretch()
+            row.addWidget(self._update_btn)
+            layout.addLayout(row)
+        self._update_button()
+
+    def showEvent(self, event):
+        self.sync()
+        super().showEvent(event)
+
+    def sync(self):
+        """Bring the rows up to date with the index, if the view is shown."""
+        if not self.isVisible() or self._index.version == self._version:
+            return
+        self._version = self._index.version
+        packages = self._index.packages()
+        self._tree.setSortingEnabled(False)
+        for package in [p for p in self._items if p not in packages]:
+            item = self._items.pop(package)
+            del self._synced[package]
+            self._tree.takeTopLevelItem(self._tree.indexOfTopLevelItem(item))
+
+        new_items = []
+        for package, version in packages.items():
+            if self._synced.get(package) == version:
+                continue
+            self._synced[package] = version
+            item = self._items.get(package)
+            if item is None:
+                item = QTreeWidgetItem([package])
+                item.setChildIndicatorPolicy(
+                    QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator
+                )
+                if package in RESTART_PACKAGES:
+                    item.setForeground(0, QColor(244, 67, 54))
+                self._items[package] = item
+                new_items.append(item)
+                if self._visible_packages is not None:
+                    item.setHidden(package not in self._visible_packages)
+            self._fill_item(item, self._index.hosts_for(package))
+        self._tree.addTopLevelItems(new_items)
+        self._tree.setSortingEnabled(True)
+        self._update_button()
+
+    def _fill_item(self, item: QTreeWidgetItem, hosts: dict[str, tuple[str, str]]):
+        # An int sorts numerically without a Python comparison per row
+        item.setData(1, Qt.ItemDataRole.DisplayRole, len(hosts))
+        versions = sorted({new for _, new in hosts.values()})
+        item.setText(2, ", ".join(versions) if len(versions) <= 2 else f"{len(versions)} versions")
+        if item.childCount():
+            item.takeChildren()
+            if item.isExpanded():
+                self._add_host_rows(item, hosts)
+
+    def _on_item_expanded(self, item: QTreeWidgetItem):
+        if item.parent() is None and item.childCount() == 0:
+            self._add_host_rows(item, self._index.hosts_for(item.text(0)))
+
+    def _add_host_rows(self, item: QTreeWidgetItem, hosts: dict[str, tuple[str, str]]):
+        children = []
+        for host, (old, new) in hosts.items():
+            child = _HostItem([host or "Local", "", f"{old} \u2192 {new}"])
+            child.setData(0, self._HOST_ROLE, host)
+            children.append(child)
+        item.addChildren(children)
+
+    def set_visible_packages(self, packages: set[str] | None):
+        """Hide packages outside the current search, or show all when None."""
+        self._visible_packages = packages
+        for package, item in self._items.items():
+            item.setHidden(packages is not None and package not in packages)
+
+    def selected_hosts(self) -> list[str]:
+        """Remote hosts behind the selected packages or host rows."""
+        hosts: set[str] = set()
+        for item in self._tree.selectedItems():
+            if item.parent() is None:
+                hosts.update(self._index.hosts_for(item.text(0)))
+            else:
+                hosts.add(item.data(0, self._HOST_ROLE))
+        hosts.discard(LOCAL_HOST)
+        return sorted(hosts)
+
+    def _update_button(self):
+        if self._update_btn is None:
+            return
+        hosts = self.selected_hosts()
+        self._update_btn.setText(f"Update Selected Hosts ({len(hosts)})")
+        self._update_btn.setEnabled(bool(hosts))
+        self._update_btn.setToolTip("\n".join(hosts))
+
+    def _launch(self):
+        hosts = self.selected_hosts()
+        if hosts and self._on_update_hosts is not None:
+            self._on_update_hosts(hosts)
+
+
 class UpdatesDialog(QDialog):
     def __init__(
         self,
@@ -804,19 +1720,27 @@ class UpdatesDialog(QDialog):
         on_update: Callable[[bool], None] | None = None,
         on_remote_update: Callable[[str, bool], None] | None = None,
         on_remove: Callable[[str, str], None] | None = None,
+        on_update_all_hosts: Callable[[bool], None] | None = None,
+        index: UpdateIndex | None = None,
+        on_update_hosts: Callable[[list[str], bool], None] | None = None,
         parent=None,
     ):
         super().__init__(parent)
         self.on_update = on_update
+        # The tray keeps the index current; standalone dialogs maintain their own
+        self._owns_index = index is None
+        self._index = index if index is not None else UpdateIndex()
+        self._on_remote_update = on_remote_update
         self._on_remove = on_remove
+        self._on_update_all_hosts = on_update_all_hosts
+        self._on_update_hosts = on_update_hosts
         self._local_needs_restart = False
+        self._use_tabs: bool | None = None
+        self._tabs: QTabWidget | None = None
+        self._panes: dict[str, _UpdatesPane] = {}
+        self._matrix: _PackageMatrix | None = None
+        self._chosen_tab: QWidget | None = None
 
-        remote_hosts = remote_hosts or []
-        remote_with_updates = [h for h in remote_hosts if h.updates]
-        total = len(updates) + sum(len(h.updates) for h in remote_with_updates)
-        use_tabs = len(remote_with_updates) > 0
-
-        self.setWindowTitle(f"Available Updates ({total})")
         self.setWindowIcon(create_app_icon())
         self.setMinimumSize(300, 300)
 
@@ -827,103 +1751,248 @@ class UpdatesDialog(QDialog):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(8, 8, 8, 8)
 
-        if use_tabs:
-            # Tabbed view: one tab per system with updates
-            tabs = QTabWidget()
-
-            if updates:
-                local_needs_restart = any(u.package in RESTART_PACKAGES for u in updates)
-                local_cb = on_update if on_update else None
-                local_tab = self._build_tab(updates, local_needs_restart, local_cb, on_remove=on_remove)
-                local_label = f"Local ({len(updates)})"
-                idx = tabs.addTab(local_tab, local_label)
-                if local_needs_restart:
-                    tabs.setTabToolTip(idx, "Restart required")
-
-            for host in remote_with_updates:
-                remote_cb = None
-                if on_remote_update:
-                    remote_cb = lambda restart, _h=host.hostname: on_remote_update(_h, restart)
-                tab = self._build_tab(host.updates, host.needs_restart, remote_cb)
-                tab_label = f"{host.hostname} ({len(host.updates)})"
-                idx = tabs.addTab(tab, tab_label)
-                if host.needs_restart:
-                    tabs.setTabToolTip(idx, "Restart required")
+        self._summary = QLabel()
+        self._summary.setVisible(False)
+        layout.addWidget(self._summary)
+
+        # Filter bar
+        filter_row = QHBoxLayout()
+        self._search_edit = QLineEdit()
+        self._search_edit.setPlaceholderText("Filter packages (^name for prefix)")
+        self._search_edit.setClearButtonEnabled(True)
+        self._search_edit.textChanged.connect(self._apply_filter)
+        filter_row.addWidget(self._search_edit, 1)
+        self._repo_combo = QComboBox()
+        self._repo_combo.currentIndexChanged.connect(self._apply_filter)
+        filter_row.addWidget(self._repo_combo)
+        self._restart_only_check = QCheckBox("Restart only")
+        self._restart_only_check.toggled.connect(self._apply_filter)
+        filter_row.addWidget(self._restart_only_check)
+        layout.addLayout(filter_row)
+
+        self._body = QVBoxLayout()
+        layout.addLayout(self._body)
+
+        self._btn_layout = QHBoxLayout()
+        self._btn_layout.addStretch()
+        self._btn_widgets: list[QWidget] = []
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        self._btn_layout.addWidget(close_btn)
+        layout.addLayout(self._btn_layout)
 
-            # Style tabs that need restart with red text
-            for i in range(tabs.count()):
-                tooltip = tabs.tabToolTip(i)
-                if tooltip == "Restart required":
-                    tabs.tabBar().setTabTextColor(i, QColor(244, 67, 54))
+        self.refresh(updates, remote_hosts)
 
-            layout.addWidget(tabs)
+    def refresh(self, updates: list[UpdateInfo], remote_hosts: list | None = None):
+        """Apply new check results to the open dialog without rebuilding its lists."""
+        remote_hosts = remote_hosts or []
+        remote_with_updates = [h for h in remote_hosts if h.updates]
+        total = len(updates) + sum(len(h.updates) for h in remote_with_updates)
+        use_tabs = len(remote_with_updates) > 0
+        self.setWindowTitle(f"Available Updates ({total})")
+        sizes = size_summary(
+            updates + [u for h in remote_with_updates for u in h.updates],
+            # Only local updates carry an installed-size change
+            installed_label="installed here" if remote_with_updates else "installed",
+        )
+        self._summary.setText(f"Total: {sizes}")
+        self._summary.setVisible(bool(sizes))
+
+        if self._owns_index:
+            self._index.update_host(LOCAL_HOST, updates)
+            for host in remote_hosts:
+                self._index.update_host(host.hostname, host.updates)
+            self._index.retain_hosts({LOCAL_HOST} | {h.hostname for h in remote_hosts})
+        self._update_repo_facets()
+
+        if use_tabs != self._use_tabs:
+            self._clear_body()
+            self._use_tabs = use_tabs
+            if use_tabs:
+                # Tabbed view: one tab per system with updates
+                self._tabs = QTabWidget()
+                self._tabs.tabBarClicked.connect(self._on_tab_clicked)
+                self._body.addWidget(self._tabs)
+
+        self._local_needs_restart = any(u.package in RESTART_PACKAGES for u in updates)
+        if use_tabs:
+            self._sync_tabs(updates, remote_with_updates)
         else:
             # Single list, no tabs needed
-            needs_restart = any(u.package in RESTART_PACKAGES for u in updates)
-            self._local_needs_restart = needs_restart
-            if needs_restart:
-                layout.addWidget(_make_restart_banner())
-            layout.addWidget(_make_update_list(updates, self, on_remove=on_remove))
-
-        btn_layout = QHBoxLayout()
-        btn_layout.addStretch()
-
-        if on_update and not use_tabs:
-            if self._local_needs_restart:
-                split_btn = QToolButton()
-                split_btn.setText("Update && Restart")
-                split_btn.setPopupMode(QToolButton.ToolButtonPopupMode.MenuButtonPopup)
-                split_btn.clicked.connect(self._launch_update)
-                menu = QMenu(split_btn)
-                menu.addAction("Update Only (no restart)", self._launch_update_no_restart)
-                split_btn.setMenu(menu)
-                btn_layout.addWidget(split_btn)
+            pane = self._panes.get(LOCAL_HOST)
+            if pane is None:
+                pane = _UpdatesPane(updates, self._local_needs_restart, on_remove=self._on_remove)
+                pane.layout().setContentsMargins(0, 0, 0, 0)
+                self._panes[LOCAL_HOST] = pane
+                self._body.addWidget(pane)
             else:
-                update_btn = QPushButton("Update Now")
-                update_btn.clicked.connect(self._launch_update)
-                btn_layout.addWidget(update_btn)
-
-        close_btn = QPushButton("Close")
-        close_btn.clicked.connect(self.close)
-        btn_layout.addWidget(close_btn)
+                pane.set_updates(updates, self._local_needs_restart)
+
+        self._rebuild_buttons(use_tabs, remote_with_updates)
+        self._apply_filter()
+
+    def _update_repo_facets(self):
+        current = self._repo_combo.currentData()
+        self._repo_combo.blockSignals(True)
+        self._repo_combo.clear()
+        self._repo_combo.addItem("All repositories", None)
+        for repo, count in self._index.repositories().items():
+            self._repo_combo.addItem(f"{repo or 'unknown'} ({count})", repo)
+        i = self._repo_combo.findData(current) if current is not None else 0
+        self._repo_combo.setCurrentIndex(max(i, 0))
+        self._repo_combo.blockSignals(False)
+
+    def _apply_filter(self):
+        query = self._search_edit.text()
+        repo = self._repo_combo.currentData()
+        restart_only = self._restart_only_check.isChecked()
+        active = bool(query.strip()) or repo is not None or restart_only
+
+        matches: dict[str, set[str]] = {}
+        if active:
+            for host, package in self._index.search(query, repo, restart_only):
+                matches.setdefault(host, set()).add(package)
+        for key, pane in self._panes.items():
+            pane.model.set_filter(matches.get(key, set()) if active else None)
+
+        if self._tabs is not None:
+            # The matrix is hidden before and shown after the host tabs, so it
+            # never becomes current (and builds its rows) as a side effect
+            matrix_visible = True
+            if self._matrix is not None:
+                packages = set().union(*matches.values()) if active else None
+                self._matrix.set_visible_packages(packages)
+                matrix_visible = packages != set()
+                if not matrix_visible:
+                    self._tabs.setTabVisible(self._tabs.indexOf(self._matrix), False)
+            for pane in self._panes.values():
+                i = self._tabs.indexOf(pane)
+                shown, total = pane.model.rowCount(), pane.model.total_count()
+                count = f"{shown}/{total}" if active else str(total)
+                # Each change re-lays out the tab bar, so skip no-op updates
+                text = _tab_text(pane, count)
+                if self._tabs.tabText(i) != text:
+                    self._tabs.setTabText(i, text)
+                if self._tabs.isTabVisible(i) != (shown > 0 or not active):
+                    self._tabs.setTabVisible(i, shown > 0 or not active)
+            if self._matrix is not None and matrix_visible:
+                self._tabs.setTabVisible(self._tabs.indexOf(self._matrix), True)
+            # Hiding the current tab moves the selection; go back to the
+            # user's tab once it has matches again
+            chosen = self._tabs.indexOf(self._chosen_tab) if self._chosen_tab else 0
+            if chosen >= 0 and self._tabs.isTabVisible(chosen):
+                self._tabs.setCurrentIndex(chosen)
+
+    def _on_tab_clicked(self, index: int):
+        self._chosen_tab = self._tabs.widget(index)
+
+    def _clear_body(self):
+        while self._body.count():
+            item = self._body.takeAt(0)
+            if item.widget() is not None:
+                item.widget().deleteLater()
+        self._tabs = None
+        self._panes = {}
+        self._matrix = None
+        self._chosen_tab = None
+
+    def _sync_tabs(self, updates: list[UpdateInfo], remote_hosts: list):
+        tabs = self._tabs
+        wanted: list[tuple[str, str, list[UpdateInfo], bool]] = []
+        if updates:
+            wanted.append((LOCAL_HOST, "Local", updates, self._local_needs_restart))
+        for host in remote_hosts:
+            wanted.append((host.hostname, host.hostname, host.updates, host.needs_restart))
+
+        wanted_keys = {key for key, *_ in wanted}
+        for key in [k for k in self._panes if k not in wanted_keys]:
+            pane = self._panes.pop(key)
+            tabs.removeTab(tabs.indexOf(pane))
+            pane.deleteLater()
+
+        for position, (key, label, host_updates, needs_restart) in enumerate(wanted):
+            pane = self._panes.get(key)
+            if pane is None:
+                if key == LOCAL_HOST:
+                    on_update, on_remove = self.on_update, self._on_remove
+                else:
+                    on_update, on_remove = None, None
+                    if self._on_remote_update:
+                        cb = self._on_remote_update
+                        on_update = lambda restart, _h=key: cb(_h, restart)
+                pane = _UpdatesPane(host_updates, needs_restart, on_update, on_remove)
+                self._panes[key] = pane
+                tabs.insertTab(position, pane, "")
+            else:
+                pane.set_updates(host_updates, needs_restart)
+                if tabs.indexOf(pane) != position:
+                    tabs.tabBar().moveTab(tabs.indexOf(pane), position)
+
+            pane.label = label
+            download = sum(u.download_size for u in host_updates)
+            pane.size_text = format_size(download) if download else ""
+            text = _tab_text(pane, str(len(host_updates)))
+            if tabs.tabText(position) != text:
+                tabs.setTabText(position, text)
+            # Style tabs that need restart with red text
+            tip = [size_summary(host_updates)]
+            if needs_restart:
+                tip.insert(0, "Restart required")
+            tabs.setTabToolTip(position, "\n".join(t for t in tip if t))
+            tabs.tabBar().setTabTextColor(
+                position,
+                QColor(244, 67, 54) if needs_restart else self.palette().windowText().color(),
+            )
 
-        layout.addLayout(btn_layout)
+        if self._matrix is None:
+            on_update_hosts = None
+            if self._on_update_hosts is not None:
+                on_update_hosts = self._launch_host_updates
+            self._matrix = _PackageMatrix(self._index, on_update_hosts)
+            tabs.addTab(self._matrix, "By package")
+        else:
+            self._matrix.sync()
+
+    def _rebuild_buttons(self, use_tabs: bool, remote_hosts: list):
+        for w in self._btn_widgets:
+            self._btn_layout.removeWidget(w)
+            w.deleteLater()
+        self._btn_widgets = []
+
+        if self.on_update and not use_tabs:
+            self._btn_widgets.append(_make_update_button(
+                self._local_needs_restart,
+                lambda restart: self._launch_update(),
+                self._launch_update_no_restart,
+            ))
+        if self._on_update_all_hosts and remote_hosts:
+            self._btn_widgets.insert(0, self._make_update_all_button(
+                remote_hosts, self._on_update_all_hosts,
+            ))
+        # Keep the buttons between the stretch and Close
+        for i, w in enumerate(self._btn_widgets):
+            self._btn_layout.insertWidget(1 + i, w)
 
-    def _build_tab(
-        self,
-        updates: list[UpdateInfo],
-        needs_restart: bool,
-        on_update: Callable[[bool], None] | None = None,
-        on_remove: Callable[[str, str], None] | None = None,
+    def _make_update_all_button(
+        self, hosts: list, on_update_all_hosts: Callable[[bool], None],
     ) -> QWidget:
-        widget = QWidget()
-        tab_layout = QVBoxLayout(widget)
-        tab_layout.setContentsMargins(0, 4, 0, 0)
-
-        if needs_restart:
-            tab_layout.addWidget(_make_restart_banner())
-
-        tab_layout.addWidget(_make_update_list(updates, widget, on_remove=on_remove))
-
-        if on_update:
-            btn_row = QHBoxLayout()
-            btn_row.addStretch()
-            if needs_restart:
-                split_btn = QToolButton()
-                split_btn.setText("Update && Restart")
-                split_btn.setPopupMode(QToolButton.ToolButtonPopupMode.MenuButtonPopup)
-                split_btn.clicked.connect(lambda: on_update(True))
-                menu = QMenu(split_btn)
-                menu.addAction("Update Only (no restart)", lambda: on_update(False))
-                split_btn.setMenu(menu)
-                btn_row.addWidget(split_btn)
-            else:
-                update_btn = QPushButton("Update Now")
-                update_btn.clicked.connect(lambda: on_update(False))
-                btn_row.addWidget(update_btn)
-            tab_layout.addLayout(btn_row)
+        def launch(restart: bool):
+            on_update_all_hosts(restart)
+            self.close()
 
-        return widget
+        text = f"Update All Hosts ({len(hosts)})"
+        if any(h.needs_restart for h in hosts):
+            split_btn = QToolButton()
+            split_btn.setText(text.replace("&", "&&"))
+            split_btn.setPopupMode(QToolButton.ToolButtonPopupMode.MenuButtonPopup)
+            split_btn.clicked.connect(lambda: launch(False))
+            menu = QMenu(split_btn)
+            menu.addAction("Update All && Restart Where Needed", lambda: launch(True))
+            split_btn.setMenu(menu)
+            return split_btn
+        btn = QPushButton(text)
+        btn.clicked.connect(lambda: launch(False))
+        return btn
 
     def closeEvent(self, event):
         settings = QSettings("yay-sys-tray", "yay-sys-tray")
@@ -935,6 +2004,11 @@ class UpdatesDialog(QDialog):
             self.on_update(self._local_needs_restart)
             self.close()
 
+    def _launch_host_updates(self, hostnames: list[str]):
+        if self._on_update_hosts:
+            self._on_update_hosts(hostnames, False)
+            self.close()
+
     def _launch_update_no_restart(self):
         if self.on_update:
             self.on_update(False)
@@ -942,7 +2016,7 @@ class UpdatesDialog(QDialog):
 
 
 class AboutDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, diagnostics: list[str] | None = None, parent=None):
         super().__init__(parent)
         self.setWindowTitle("About Yay Update Checker")
         self.setWindowIcon(create_app_icon())
@@ -982,6 +2056,13 @@ class AboutDialog(QDialog):
         info.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(info)
 
+        if diagnostics:
+            diag = QLabel("\n".join(diagnostics))
+            diag.setWordWrap(True)
+            diag.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            diag.setStyleSheet("color: gray; font-size: 10px;")
+            layout.addWidget(diag)
+
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
         buttons.accepted.connect(self.accept)
         layout.addWidget(buttons)
@@ -0,0 +1,228 @@
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from yay_sys_tray.config import CACHE_DIR
+from yay_sys_tray.tailscale import SSH_OPTS
+
+FLEET_LOG_DIR = CACHE_DIR / "fleet"
+
+UPGRADE_TIMEOUT = 30 * 60
+REBOOT_WAIT_TIMEOUT = 10 * 60
+REBOOT_POLL_INTERVAL = 10
+
+
+@dataclass
+class FleetResult:
+    succeeded: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    rebooted: list[str] = field(default_factory=list)
+    reboot_failed: dict[str, str] = field(default_factory=dict)  # upgraded, but not rebooted
+    aborted: bool = False
+
+    @property
+    def affected(self) -> list[str]:
+        """Hosts whose state may have changed and need a re-check."""
+        return sorted(set(self.succeeded) | set(self.failed))
+
+
+def host_log_path(hostname: str) -> Path:
+    return FLEET_LOG_DIR / f"{hostname}.log"
+
+
+def _reboot_error(hostname: str, code: int) -> str:
+    """Why 'sudo -n reboot' failed, from the tail of the host log."""
+    try:
+        with open(host_log_path(hostname), errors="replace") as log:
+            refused = "password is required" in log.read()[-4096:]
+    except OSError:
+        refused = False
+    if refused:
+        return "sudo asked for a password (add a NOPASSWD rule for /usr/bin/reboot)"
+    return f"reboot exited with code {code}"
+
+
+class FleetUpdater(QThread):
+    """Upgrade remote hosts in the background, a few at a time.
+
+    Hosts are upgraded with 'sudo -n pacman -Syu --noconfirm' over SSH, so
+    passwordless sudo for pacman is required on each host. Hosts that need a
+    restart are rebooted with 'sudo -n reboot' in a second stage once every
+    upgrade has finished, which needs passwordless sudo for reboot as well.
+    Each stage stops scheduling new hosts after max_failures failures of its
+    own; failed reboots do not count against the upgrades.
+    """
+
+    host_status = pyqtSignal(str, str)  # hostname, status text
+    progress = pyqtSignal(int, int, int)  # done, failed, total
+    rollout_complete = pyqtSignal(object)  # FleetResult
+
+    def __init__(
+        self,
+        hostnames: list[str],
+        reboot_hosts: list[str] | None = None,
+        parallel: int = 4,
+        max_failures: int = 2,
+        timeout: int = 10,
+    ):
+        super().__init__()
+        self.hostnames = hostnames
+        self.reboot_hosts = set(reboot_hosts or [])
+        self.parallel = max(1, parallel)
+        self.max_failures = max(1, max_failures)
+        self.timeout = timeout
+        self._cancelled = threading.Event()
+        self._procs: dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            for proc in self._procs.values():
+                proc.terminate()
+
+    def run(self):
+        result = FleetResult()
+        FLEET_LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+        upgraded = self._run_stage(self.hostnames, self._upgrade_host, result, result.failed)
+        to_reboot = [h for h in upgraded if h in self.reboot_hosts]
+        if to_reboot and not result.aborted:
+            result.rebooted = self._run_stage(
+                to_reboot, self._reboot_host, result, result.reboot_failed, "reboot failed",
+            )
+
+        self.rollout_complete.emit(result)
+
+    def _run_stage(
+        self,
+        hostnames: list[str],
+        task,
+        result: FleetResult,
+        failed: dict[str, str],
+        failure_label: str = "failed",
+    ) -> list[str]:
+        """Run task on every host with bounded concurrency. Returns hosts that succeeded.
+
+        Errors are collected in failed, which is also the stage's failure budget.
+        """
+        ok: list[str] = []
+        pending = list(hostnames)
+        total = len(hostnames)
+        with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+            running = {}
+            while pending or running:
+                while (
+                    pending
+                    and len(running) < self.parallel
+                    and not result.aborted
+                ):
+                    host = pending.pop(0)
+                    running[pool.submit(task, host)] = host
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host = running.pop(future)
+                    error = future.result()
+                    if error is None:
+                        ok.append(host)
+                        self.host_status.emit(host, "done")
+                    else:
+                        failed[host] = error
+                        self.host_status.emit(host, f"{failure_label}: {error}")
+                    if self._cancelled.is_set() or len(failed) >= self.max_failures:
+                        result.aborted = True
+                    self.progress.emit(len(ok), len(failed), total)
+        if result.aborted:
+            result.skipped.extend(pending)
+        result.succeeded.extend(h for h in ok if h not in result.succeeded)
+        return ok
+
+    def _ssh(self, hostname: str, command: str, log, timeout: int) -> int:
+        proc = subprocess.Popen(
+            ["ssh", "-o", f"ConnectTimeout={self.timeout}", *SSH_OPTS, hostname, command],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+        )
+        with self._lock:
+            self._procs[hostname] = proc
+        try:
+            return proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            with self._lock:
+                self._procs.pop(hostname, None)
+
+    def _upgrade_host(self, hostname: str) -> str | None:
+        """Upgrade one host, streaming its output to the host log. Returns an error or None."""
+        if self._cancelled.is_set():
+            return "cancelled"
+        self.host_status.emit(hostname, "updating")
+        try:
+            with open(host_log_path(hostname), "w") as log:
+                log.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} pacman -Syu ===\n")
+                log.flush()
+                code = self._ssh(
+                    hostname, "sudo -n pacman -Syu --noconfirm", log, UPGRADE_TIMEOUT,
+                )
+        except subprocess.TimeoutExpired:
+            return "timed out"
+        except FileNotFoundError:
+            return "ssh not found"
+        except OSError as e:
+            return str(e)
+        if self._cancelled.is_set():
+            return "cancelled"
+        if code != 0:
+            return f"exit code {code}"
+        return None
+
+    def _reboot_host(self, hostname: str) -> str | None:
+        """Reboot one host and wait until it accepts SSH again."""
+        if self._cancelled.is_set():
+            return "cancelled"
+        self.host_status.emit(hostname, "rebooting")
+        try:
+            with open(host_log_path(hostname), "a") as log:
+                log.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} reboot ===\n")
+                log.flush()
+                # The connection drops as the host goes down (ssh exits with 255),
+                # or the session hangs until it times out; the poll below decides.
+                # Any other exit status is the command itself failing.
+                try:
+                    code = self._ssh(hostname, "sudo -n reboot", log, self.timeout + 30)
+                except subprocess.TimeoutExpired:
+                    log.write("=== reboot command timed out ===\n")
+                    code = 0
+                if code not in (0, 255):
+                    return _reboot_error(hostname, code)
+                time.sleep(REBOOT_POLL_INTERVAL)
+                deadline = time.monotonic() + REBOOT_WAIT_TIMEOUT
+                while time.monotonic() < deadline:
+                    if self._cancelled.is_set():
+                        return "cancelled"
+                    try:
+                        if self._ssh(hostname, "true", log, self.timeout + 5) == 0:
+                            log.write("=== host is back ===\n")
+                            return None
+                    except subprocess.TimeoutExpired:
+                        pass
+                    time.sleep(REBOOT_POLL_INTERVAL)
+        except (FileNotFoundError, OSError) as e:
+            return str(e)
+        return "did not come back after reboot"
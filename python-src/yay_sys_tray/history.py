@@ -0,0 +1,257 @@
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from yay_sys_tray.checker import UpdateInfo
+from yay_sys_tray.config import CACHE_DIR
+
+HISTORY_DB = CACHE_DIR / "history.sqlite3"
+
+# Compaction runs at most this often, after a write
+COMPACT_INTERVAL = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS checks (
+    id INTEGER PRIMARY KEY,
+    started INTEGER NOT NULL,
+    local_seconds REAL,
+    remote_seconds REAL,
+    hosts INTEGER NOT NULL,
+    unreachable INTEGER NOT NULL,
+    updates INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY,
+    host_id INTEGER NOT NULL REFERENCES hosts(id),
+    package_id INTEGER NOT NULL REFERENCES packages(id),
+    old_version TEXT NOT NULL,
+    new_version TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,
+    resolved INTEGER
+);
+CREATE INDEX IF NOT EXISTS pending_open ON pending(host_id) WHERE resolved IS NULL;
+CREATE INDEX IF NOT EXISTS pending_package ON pending(package_id, resolved);
+CREATE INDEX IF NOT EXISTS pending_resolved ON pending(resolved) WHERE resolved IS NOT NULL;
+CREATE INDEX IF NOT EXISTS checks_started ON checks(started);
+"""
+
+
+@dataclass
+class CheckStats:
+    started: float
+    local_seconds: float | None = None
+    remote_seconds: float | None = None
+    unreachable: int = 0
+
+
+@dataclass
+class PendingUpdate:
+    host: str
+    package: str
+    old_version: str
+    new_version: str
+    first_seen: float
+
+
+class HistoryStore:
+    """Record check results in SQLite on a single background thread.
+
+    A pending update is stored once as an interval from when it was first
+    seen until a later snapshot of the same host no longer lists the package.
+    A newer version replacing it before anything was installed continues the
+    same interval, so the time to update counts from the first version seen. Checks
+    get one summary row each. Rows older than the retention period are
+    deleted and the file is compacted once a day. With hourly checks on a
+    hundred hosts that keeps the database at a few megabytes.
+
+    Every method returns a Future; the connection lives on the worker thread,
+    so nothing here blocks the caller.
+    """
+
+    def __init__(self, path: Path = HISTORY_DB, retention_days: int = 365):
+        self.path = path
+        self.retention_days = retention_days
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+        self._conn: sqlite3.Connection | None = None
+        self._host_ids: dict[str, int] = {}
+        self._package_ids: dict[str, int] = {}
+        self._last_compact = 0.0
+
+    def close(self) -> None:
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=True)
+
+    def record(
+        self,
+        snapshot: dict[str, list[UpdateInfo]],
+        check: CheckStats | None = None,
+    ) -> Future:
+        """Store the pending updates of every host in snapshot, and the check summary.
+
+        Hosts missing from snapshot (e.g. unreachable ones) keep their open
+        intervals untouched.
+        """
+        # Copy what the worker needs, so later changes to the lists don't race
+        rows = {
+            host: [(u.package, u.old_version, u.new_version) for u in updates]
+            for host, updates in snapshot.items()
+        }
+        return self._executor.submit(self._record, rows, check, time.time())
+
+    def oldest_pending(self, limit: int = 1) -> Future:
+        """The longest-pending updates of each host, oldest first: list[PendingUpdate]."""
+        return self._executor.submit(self._oldest_pending, limit)
+
+    def average_time_to_update(self, package: str | None = None) -> Future:
+        """Mean seconds from first seen to installed, per host, optionally for one package.
+
+        Resolves to dict[str, float].
+        """
+        return self._executor.submit(self._average_time_to_update, package)
+
+    def check_latency(self, since: float) -> Future:
+        """Average (local, remote) check seconds since a timestamp."""
+        return self._executor.submit(self._check_latency, since)
+
+    # -- Worker thread --
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            # Only takes effect while the file is still empty, so it comes
+            # before switching to WAL or creating any table
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0:
+                # A database created without it: a one-off VACUUM rebuilds the file with it
+                conn.execute("VACUUM")
+            self._host_ids = dict(conn.execute("SELECT name, id FROM hosts").fetchall())
+            self._package_ids = dict(conn.execute("SELECT name, id FROM packages").fetchall())
+            self._conn = conn
+        return self._conn
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _id(self, conn: sqlite3.Connection, table: str, cache: dict[str, int], name: str) -> int:
+        row_id = cache.get(name)
+        if row_id is None:
+            conn.execute(f"INSERT OR IGNORE INTO {table}(name) VALUES (?)", (name,))
+            row_id = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+            cache[name] = row_id
+        return row_id
+
+    def _record(self, rows: dict[str, list[tuple[str, str, str]]], check, now: float):
+        conn = self._db()
+        ts = int(now)
+        with conn:
+            for host, updates in rows.items():
+                host_id = self._id(conn, "hosts", self._host_ids, host)
+                open_rows = conn.execute(
+                    "SELECT id, package_id, new_version FROM pending"
+                    " WHERE host_id = ? AND resolved IS NULL",
+                    (host_id,),
+                ).fetchall()
+                current = {pkg_id: (row_id, new) for row_id, pkg_id, new in open_rows}
+                seen = set()
+                inserts = []
+                superseded = []
+                for package, old, new in updates:
+                    pkg_id = self._id(conn, "packages", self._package_ids, package)
+                    seen.add(pkg_id)
+                    row = current.get(pkg_id)
+                    if row is None:
+                        inserts.append((host_id, pkg_id, old, new, ts))
+                    elif row[1] != new:
+                        superseded.append((new, row[0]))
+                closed = [
+                    (ts, row_id) for pkg_id, (row_id, _) in current.items() if pkg_id not in seen
+                ]
+                if superseded:
+                    conn.executemany("UPDATE pending SET new_version = ? WHERE id = ?", superseded)
+                if inserts:
+                    conn.executemany(
+                        "INSERT INTO pending(host_id, package_id, old_version, new_version,"
+                        " first_seen) VALUES (?, ?, ?, ?, ?)",
+                        inserts,
+                    )
+                if closed:
+                    conn.executemany("UPDATE pending SET resolved = ? WHERE id = ?", closed)
+            if check is not None:
+                conn.execute(
+                    "INSERT INTO checks(started, local_seconds, remote_seconds, hosts,"
+                    " unreachable, updates) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        int(check.started), check.local_seconds, check.remote_seconds,
+                        len(rows), check.unreachable, sum(len(u) for u in rows.values()),
+                    ),
+                )
+        if now - self._last_compact >= COMPACT_INTERVAL:
+            self._compact(now)
+
+    def _compact(self, now: float):
+        conn = self._db()
+        cutoff = int(now - self.retention_days * 86400)
+        with conn:
+            conn.execute("DELETE FROM pending WHERE resolved IS NOT NULL AND resolved < ?", (cutoff,))
+            conn.execute("DELETE FROM checks WHERE started < ?", (cutoff,))
+            conn.execute(
+                "DELETE FROM packages WHERE id NOT IN (SELECT DISTINCT package_id FROM pending)"
+            )
+            conn.execute("DELETE FROM hosts WHERE id NOT IN (SELECT DISTINCT host_id FROM pending)")
+        self._package_ids = dict(conn.execute("SELECT name, id FROM packages").fetchall())
+        self._host_ids = dict(conn.execute("SELECT name, id FROM hosts").fetchall())
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._last_compact = now
+
+    def _oldest_pending(self, limit: int) -> list[PendingUpdate]:
+        rows = self._db().execute(
+            """
+            SELECT h.name, p.name, old_version, new_version, first_seen FROM (
+                SELECT host_id, package_id, old_version, new_version, first_seen,
+                       ROW_NUMBER() OVER (PARTITION BY host_id ORDER BY first_seen) AS n
+                FROM pending WHERE resolved IS NULL
+            ) AS o
+            JOIN hosts h ON h.id = o.host_id
+            JOIN packages p ON p.id = o.package_id
+            WHERE n <= ?
+            ORDER BY first_seen, h.name
+            """,
+            (limit,),
+        ).fetchall()
+        return [PendingUpdate(*row) for row in rows]
+
+    def _average_time_to_update(self, package: str | None) -> dict[str, float]:
+        query = (
+            "SELECT h.name, AVG(resolved - first_seen) FROM pending"
+            " JOIN hosts h ON h.id = pending.host_id"
+            " WHERE resolved IS NOT NULL"
+        )
+        params: tuple = ()
+        if package is not None:
+            query += " AND package_id = (SELECT id FROM packages WHERE name = ?)"
+            params = (package,)
+        query += " GROUP BY h.name ORDER BY h.name"
+        return dict(self._db().execute(query, params).fetchall())
+
+    def _check_latency(self, since: float) -> tuple[float | None, float | None]:
+        return self._db().execute(
+            "SELECT AVG(local_seconds), AVG(remote_seconds) FROM checks WHERE started >= ?",
+            (int(since),),
+        ).fetchone()
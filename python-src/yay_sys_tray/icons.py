@@ -11,6 +11,8 @@ GREEN = QColor(76, 175, 80)
 ORANGE = QColor(255, 152, 0)
 BLUE = QColor(33, 150, 243)
 RED = QColor(244, 67, 54)
+PURPLE = QColor(142, 36, 170)
+GREY = QColor(117, 117, 117)
 WHITE = QColor(255, 255, 255)
 
 
@@ -165,6 +167,24 @@ def create_restart_icon(count: int) -> QIcon:
     return QIcon(pixmap)
 
 
+def create_security_icon(count: int) -> QIcon:
+    """Purple circle with the update count — pending updates fix security advisories."""
+    pixmap, painter = _make_pixmap(PURPLE)
+    painter.setPen(QPen(WHITE))
+    text = str(count) if count <= 99 else "99+"
+    if len(text) == 1:
+        font_size = 32
+    elif len(text) == 2:
+        font_size = 26
+    else:
+        font_size = 20
+    font = QFont("sans-serif", font_size, QFont.Weight.Bold)
+    painter.setFont(font)
+    painter.drawText(INSET, INSET, DIAMETER, DIAMETER, Qt.AlignmentFlag.AlignCenter, text)
+    painter.end()
+    return QIcon(pixmap)
+
+
 def create_error_icon() -> QIcon:
     pixmap, painter = _make_pixmap(RED)
     painter.setPen(_white_pen(6))
@@ -174,6 +194,18 @@ def create_error_icon() -> QIcon:
     return QIcon(pixmap)
 
 
+def create_offline_icon() -> QIcon:
+    """Grey circle with a broken link — the network is down, checks are paused."""
+    pixmap, painter = _make_pixmap(GREY)
+    painter.setPen(_white_pen(6))
+    painter.drawLine(16, 38, 26, 28)
+    painter.drawLine(38, 36, 48, 26)
+    painter.setPen(_white_pen(3))
+    painter.drawLine(30, 44, 34, 20)
+    painter.end()
+    return QIcon(pixmap)
+
+
 def create_app_icon() -> QIcon:
     """App window icon: Arch-inspired upward arrow on a blue circle."""
     pixmap, painter = _make_pixmap(QColor(23, 147, 209))
@@ -0,0 +1,205 @@
+import bisect
+from dataclasses import dataclass
+
+from yay_sys_tray.checker import RESTART_PACKAGES, UpdateInfo
+
+# Host key used for the local system's updates
+LOCAL_HOST = ""
+
+
+@dataclass
+class IndexEntry:
+    host: str
+    update: UpdateInfo
+    name: str  # lowercased package name
+    haystack: str  # lowercased name, description and repository
+    restart: bool
+    key: tuple[str, str]  # (host, package)
+
+
+def _make_entry(host: str, update: UpdateInfo) -> IndexEntry:
+    name = update.package.lower()
+    return IndexEntry(
+        host=host,
+        update=update,
+        name=name,
+        haystack=f"{name}\0{update.description.lower()}\0{update.repository.lower()}",
+        restart=update.package in RESTART_PACKAGES,
+        key=(host, update.package),
+    )
+
+
+class UpdateIndex:
+    """Search index over the pending updates of every host.
+
+    Entries are keyed by (host, package) and updated per host as check results
+    arrive, so only changed rows are touched. The same entries are also
+    indexed by package, answering "which hosts still need this update".
+    Queries are whitespace-separated terms that must all match: a plain term
+    matches anywhere in the package name, description or repository, and a
+    term starting with '^' matches the start of the package name.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[str, str], IndexEntry] = {}
+        self._by_host: dict[str, dict[str, IndexEntry]] = {}
+        self._by_package: dict[str, dict[str, IndexEntry]] = {}
+        self._package_versions: dict[str, int] = {}  # bumped when a package's hosts change
+        self._names: list[tuple[str, str, str]] = []  # sorted (name, host, package)
+        self._version = 0
+        self._last_query: tuple | None = None
+        self._last_entries: list[IndexEntry] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update_host(self, host: str, updates: list[UpdateInfo]) -> int:
+        """Replace one host's updates, touching only entries that changed. Returns that count."""
+        current = self._by_host.setdefault(host, {})
+        fresh = {u.package: u for u in updates}
+        removed: list[tuple[str, str, str]] = []
+        added: list[tuple[str, str, str]] = []
+
+        for package in [p for p in current if p not in fresh]:
+            removed.append(self._remove(host, package))
+        for package, update in fresh.items():
+            entry = current.get(package)
+            if entry is not None and entry.update == update:
+                continue
+            if entry is not None:
+                removed.append(self._remove(host, package))
+            entry = _make_entry(host, update)
+            current[package] = entry
+            self._entries[(host, package)] = entry
+            self._by_package.setdefault(package, {})[host] = entry
+            added.append((entry.name, host, package))
+
+        if not current:
+            del self._by_host[host]
+        changed = len(removed) + len(added)
+        if changed > 64:
+            # Large batches (first check, a host going away) re-sort once
+            if removed:
+                gone = set(removed)
+                self._names = [n for n in self._names if n not in gone]
+            # Two sorted runs: timsort merges them in linear time
+            added.sort()
+            self._names += added
+            self._names.sort()
+        else:
+            for key in removed:
+                i = bisect.bisect_left(self._names, key)
+                if i < len(self._names) and self._names[i] == key:
+                    del self._names[i]
+            for key in added:
+                bisect.insort(self._names, key)
+        if changed:
+            self._version += 1
+            for _, _, package in removed + added:
+                if package in self._by_package:
+                    self._package_versions[package] = self._version
+                else:
+                    self._package_versions.pop(package, None)
+        return changed
+
+    def remove_host(self, host: str) -> int:
+        return self.update_host(host, [])
+
+    def retain_hosts(self, hosts: set[str]) -> None:
+        for host in [h for h in self._by_host if h not in hosts]:
+            self.remove_host(host)
+
+    def _remove(self, host: str, package: str) -> tuple[str, str, str]:
+        entry = self._by_host[host].pop(package)
+        del self._entries[(host, package)]
+        hosts = self._by_package[package]
+        del hosts[host]
+        if not hosts:
+            del self._by_package[package]
+        return (entry.name, host, package)
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever any entry changes."""
+        return self._version
+
+    def hosts(self) -> list[str]:
+        return sorted(self._by_host)
+
+    def packages(self) -> dict[str, int]:
+        """Version of each pending package's host set; changes whenever those hosts do."""
+        return self._package_versions
+
+    def hosts_for(self, package: str) -> dict[str, tuple[str, str]]:
+        """Hosts pending an update of package, with their (old, new) versions."""
+        return {
+            host: (entry.update.old_version, entry.update.new_version)
+            for host, entry in sorted(self._by_package.get(package, {}).items())
+        }
+
+    def host_updates(self, host: str) -> list[UpdateInfo]:
+        return [entry.update for entry in self._by_host.get(host, {}).values()]
+
+    def repositories(self) -> dict[str, int]:
+        """Repository facet: number of pending updates per repository."""
+        counts: dict[str, int] = {}
+        for entry in self._entries.values():
+            repo = entry.update.repository
+            counts[repo] = counts.get(repo, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def search(
+        self,
+        query: str = "",
+        repository: str | None = None,
+        restart_only: bool = False,
+    ) -> set[tuple[str, str]]:
+        """Return the (host, package) keys matching the query and facets."""
+        terms = query.lower().split()
+        key = (tuple(terms), repository, restart_only, self._version)
+
+        prefixes = [t[1:] for t in terms if t.startswith("^") and len(t) > 1]
+        substrings = [t for t in terms if not t.startswith("^")]
+
+        # Typing narrows the previous query, so filter its result instead of
+        # scanning everything again
+        last = self._last_query
+        if last is not None and last[1:] == key[1:] and _narrows(last[0], key[0]):
+            entries = self._last_entries
+        else:
+            if prefixes:
+                entries = self._prefix_candidates(max(prefixes, key=len))
+            else:
+                entries = list(self._entries.values())
+            if restart_only:
+                entries = [e for e in entries if e.restart]
+            if repository is not None:
+                entries = [e for e in entries if e.update.repository == repository]
+
+        for prefix in prefixes:
+            entries = [e for e in entries if e.name.startswith(prefix)]
+        for sub in substrings:
+            entries = [e for e in entries if sub in e.haystack]
+
+        self._last_query = key
+        self._last_entries = entries
+        return {e.key for e in entries}
+
+    def _prefix_candidates(self, prefix: str) -> list[IndexEntry]:
+        lo = bisect.bisect_left(self._names, (prefix,))
+        hi = bisect.bisect_left(self._names, (prefix + "\uffff",))
+        return [self._entries[(host, package)] for _, host, package in self._names[lo:hi]]
+
+
+def _narrows(old_terms: tuple[str, ...], new_terms: tuple[str, ...]) -> bool:
+    """True if every match for new_terms is also a match for old_terms."""
+    if len(new_terms) < len(old_terms):
+        return False
+    for old, new in zip(old_terms, new_terms):
+        if old.startswith("^") != new.startswith("^"):
+            return False
+        if old.startswith("^") and not new.startswith(old):
+            return False
+        if not old.startswith("^") and old not in new:
+            return False
+    return True
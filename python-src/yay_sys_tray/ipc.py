@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+from PyQt6.QtCore import QLockFile, QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+
+def runtime_dir() -> Path:
+    return Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir())
+
+
+SOCKET_PATH = runtime_dir() / f"yay-sys-tray-{os.getuid()}.sock"
+LOCK_PATH = runtime_dir() / f"yay-sys-tray-{os.getuid()}.lock"
+
+# Commands accepted on the control socket
+COMMANDS = ("check", "show", "quit", "status", "snapshot")
+
+
+def send_command(command: str, timeout_ms: int = 2000, path: Path = SOCKET_PATH) -> dict | None:
+    """Send a command to the running instance and return its reply.
+
+    Returns None when no instance is listening. Uses blocking socket calls,
+    so it works before (or without) a QApplication.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(str(path))
+    if not socket.waitForConnected(timeout_ms):
+        return None
+    socket.write(command.encode() + b"\n")
+    socket.waitForBytesWritten(timeout_ms)
+    data = b""
+    while not data.endswith(b"\n"):
+        if not socket.waitForReadyRead(timeout_ms):
+            break
+        data += bytes(socket.readAll())
+    socket.disconnectFromServer()
+    try:
+        return json.loads(data)
+    except ValueError:
+        return {"ok": False, "error": "no reply from the running instance"}
+
+
+class InstanceLock:
+    """Make sure only one tray runs per user.
+
+    A QLockFile is held for the life of the process. A lock whose owner is no
+    longer running is stale and taken over; age alone never makes it stale.
+    """
+
+    def __init__(self, path: Path = LOCK_PATH):
+        self._lock = QLockFile(str(path))
+        self._lock.setStaleLockTime(0)
+
+    def acquire(self, timeout_ms: int = 0) -> bool:
+        return self._lock.tryLock(timeout_ms)
+
+    def release(self) -> None:
+        self._lock.unlock()
+
+
+class ControlServer(QObject):
+    """Local socket that accepts one-line commands and answers with one JSON line.
+
+    Each command maps to a handler; its return value becomes 'result' in the
+    reply. Handlers run on the GUI thread, so 'status' is served straight
+    from the in-memory state without starting a check.
+    """
+
+    def __init__(self, handlers: dict[str, Callable[[], object]], path: Path = SOCKET_PATH, parent=None):
+        super().__init__(parent)
+        self.handlers = handlers
+        self.path = path
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+
+    def listen(self) -> bool:
+        # Only called while holding the instance lock, so a leftover socket is stale
+        QLocalServer.removeServer(str(self.path))
+        return self._server.listen(str(self.path))
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self, socket: QLocalSocket):
+        while socket.canReadLine():
+            command = bytes(socket.readLine()).decode(errors="replace").strip()
+            socket.write(json.dumps(self._handle(command)).encode() + b"\n")
+        socket.flush()
+
+    def _handle(self, command: str) -> dict:
+        handler = self.handlers.get(command) if command in COMMANDS else None
+        if handler is None:
+            return {"ok": False, "error": f"unknown command: {command!r}"}
+        try:
+            return {"ok": True, "result": handler()}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
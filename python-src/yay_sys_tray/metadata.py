@@ -0,0 +1,233 @@
+import os
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass
+
+from yay_sys_tray.checker import UpdateInfo, fetch_descriptions
+from yay_sys_tray.prefetch import PREFETCH_DIR
+from yay_sys_tray.syncdb import SyncDatabase, SyncPackage, installed_sizes, pacman_cache_dirs
+
+
+@dataclass(slots=True, frozen=True)
+class PackageMetadata:
+    description: str = ""
+    repository: str = ""
+    arch: str = ""
+    download_size: int = 0
+    installed_delta: int = 0  # against the version installed on this machine
+    filename: str = ""
+
+
+@dataclass
+class CacheStats:
+    entries: int
+    hits: int
+    misses: int
+    lookups: int
+    approx_bytes: int
+
+    def summary(self) -> str:
+        return (
+            f"Metadata cache: {self.entries} entries, ~{self.approx_bytes // 1024} KiB, "
+            f"{self.hits} hits / {self.misses} misses, {self.lookups} pacman lookups"
+        )
+
+
+_EMPTY = PackageMetadata()
+
+_SIZE_UNITS = {"B": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+
+
+def _intern(value: str) -> str:
+    return sys.intern(value) if value else ""
+
+
+def _parse_size(text: str) -> int:
+    """Parse a pacman size such as '1.23 MiB' into bytes."""
+    parts = text.replace(",", ".").split()
+    if len(parts) != 2 or parts[1] not in _SIZE_UNITS:
+        return 0
+    try:
+        return int(float(parts[0]) * _SIZE_UNITS[parts[1]])
+    except ValueError:
+        return 0
+
+
+def _query_sync_db(packages: list[str]) -> dict[str, SyncPackage]:
+    """Run a single 'pacman -Si' for all packages, for when the databases cannot be read."""
+    result = subprocess.run(
+        ["pacman", "-Si"] + packages,
+        capture_output=True, text=True, timeout=10,
+    )
+    records: dict[str, SyncPackage] = {}
+    fields: dict[str, str] = {}
+    for line in result.stdout.splitlines() + [""]:
+        if not line.strip():
+            if "Name" in fields:
+                records.setdefault(fields["Name"], _from_pacman_fields(fields))
+            fields = {}
+            continue
+        if ":" in line and not line.startswith(" "):
+            key, value = line.split(":", 1)
+            fields[key.strip()] = value.strip()
+    return records
+
+
+def _from_pacman_fields(fields: dict[str, str]) -> SyncPackage:
+    return SyncPackage(
+        name=fields["Name"],
+        version=fields.get("Version", ""),
+        repository=fields.get("Repository", ""),
+        arch=fields.get("Architecture", ""),
+        description=fields.get("Description", ""),
+        filename="",
+        csize=_parse_size(fields.get("Download Size", "")),
+        isize=_parse_size(fields.get("Installed Size", "")),
+    )
+
+
+class MetadataCache:
+    """Package metadata shared by the local check and every remote host.
+
+    Records are keyed by (package, version) so that forty hosts reporting the
+    same openssl update trigger one database lookup, and every UpdateInfo for
+    that update points at the same interned strings. Repo packages are read
+    from the sync databases directly; 'pacman -Si' is only the fallback.
+    """
+
+    def __init__(self, sync_db: SyncDatabase | None = None):
+        self._sync_db = sync_db if sync_db is not None else SyncDatabase()
+        self._records: dict[tuple[str, str], PackageMetadata] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._lookups = 0
+
+    def enrich(self, updates: list[UpdateInfo]) -> None:
+        """Fill description, repository, architecture and sizes in place."""
+        if not updates:
+            return
+        with self._lock:
+            missing = {
+                (u.package, u.new_version): u
+                for u in updates
+                if (u.package, u.new_version) not in self._records
+            }
+            self._misses += len(missing)
+            self._hits += len(updates) - len(missing)
+        if missing:
+            fetched = self._fetch(list(missing.values()))
+            with self._lock:
+                # Keys missing from fetched had a failed lookup; the next enrich() tries again
+                for key, record in fetched.items():
+                    self._records.setdefault(key, record)
+
+        with self._lock:
+            records = self._records
+            for u in updates:
+                rec = records.get((u.package, u.new_version), _EMPTY)
+                u.package = _intern(u.package)
+                u.old_version = _intern(u.old_version)
+                u.new_version = _intern(u.new_version)
+                u.description = rec.description
+                if rec.repository:
+                    u.repository = rec.repository
+                    u.arch = rec.arch
+                u.download_size = rec.download_size
+
+    def apply_local(self, updates: list[UpdateInfo], cache_dirs: list[str] | None = None) -> None:
+        """Fill in what only holds for this machine's updates, after enrich().
+
+        Sets the installed-size change against the local database and zeroes
+        the download size of packages already in a local package cache.
+        Remote hosts have their own installed versions and caches, so their
+        updates are left without either.
+        """
+        if cache_dirs is None:
+            cache_dirs = pacman_cache_dirs() + [str(PREFETCH_DIR)]
+        with self._lock:
+            records = self._records
+            for u in updates:
+                rec = records.get((u.package, u.new_version), _EMPTY)
+                u.installed_delta = rec.installed_delta
+                if not u.download_size or not rec.filename:
+                    continue
+                if any(os.path.exists(os.path.join(d, rec.filename)) for d in cache_dirs):
+                    u.download_size = 0
+
+    def retain(self, keys: set[tuple[str, str]]) -> None:
+        """Drop records for updates that are no longer pending anywhere."""
+        with self._lock:
+            self._records = {k: v for k, v in self._records.items() if k in keys}
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            seen: set[int] = set()
+            size = sys.getsizeof(self._records)
+            for key, rec in self._records.items():
+                size += sys.getsizeof(key)
+                for obj in (rec, *key, rec.description, rec.repository, rec.arch, rec.filename):
+                    if id(obj) not in seen:
+                        seen.add(id(obj))
+                        size += sys.getsizeof(obj)
+            return CacheStats(
+                entries=len(self._records),
+                hits=self._hits,
+                misses=self._misses,
+                lookups=self._lookups,
+                approx_bytes=size,
+            )
+
+    def _fetch(self, updates: list[UpdateInfo]) -> dict[tuple[str, str], PackageMetadata]:
+        """Look up metadata for updates, leaving out those whose lookup failed."""
+        fetched: dict[tuple[str, str], PackageMetadata] = {}
+        repo_names = {u.package for u in updates if u.repository != "aur"}
+
+        sync: dict[str, SyncPackage] = {}
+        installed: dict[str, int] = {}
+        sync_failed = False
+        if repo_names:
+            found = self._sync_db.lookup(repo_names)
+            if found is None:
+                try:
+                    found = _query_sync_db(sorted(repo_names))
+                except Exception:
+                    found = {}
+                    sync_failed = True
+                with self._lock:
+                    self._lookups += 1
+            sync = found
+            installed = installed_sizes(repo_names)
+
+        unresolved = [u for u in updates if u.repository == "aur" or u.package not in sync]
+        descs: dict[str, str] | None = {}
+        if unresolved:
+            descs = fetch_descriptions(sorted({u.package for u in unresolved}))
+            with self._lock:
+                self._lookups += 1
+
+        for u in updates:
+            key = (u.package, u.new_version)
+            package = sync.get(u.package) if u.repository != "aur" else None
+            if package:
+                # Repo and description carry over between versions; sizes do not
+                same_version = package.version == u.new_version
+                delta = 0
+                if same_version and package.isize and u.package in installed:
+                    delta = package.isize - installed[u.package]
+                fetched[key] = PackageMetadata(
+                    description=_intern(package.description),
+                    repository=_intern(package.repository),
+                    arch=_intern(package.arch),
+                    download_size=package.csize if same_version else 0,
+                    installed_delta=delta,
+                    filename=package.filename if same_version else "",
+                )
+            elif descs is not None and (u.repository == "aur" or not sync_failed):
+                fetched[key] = PackageMetadata(
+                    description=_intern(descs.get(u.package, "")),
+                    repository=_intern(u.repository),
+                    arch=_intern(u.arch),
+                )
+        return fetched
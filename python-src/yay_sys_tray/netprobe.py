@@ -0,0 +1,168 @@
+import json
+import queue
+import socket
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from yay_sys_tray.syncdb import mirror_urls
+
+# Long enough for a TCP handshake to any reasonable mirror, short enough
+# that an offline check gives up before the spinner is noticed
+PROBE_TIMEOUT = 0.8
+# Mirrors tried at once; the network is up if any of them answers
+MAX_TARGETS = 3
+
+_DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21, "rsync": 873}
+
+
+@dataclass(slots=True, frozen=True)
+class ProbeResult:
+    online: bool
+    detail: str = ""  # why the network counts as down
+    tailnet: str | None = None  # Tailscale BackendState; None if not probed or unknown
+    seconds: float = 0.0
+
+    @property
+    def tailnet_up(self) -> bool:
+        return self.tailnet is None or self.tailnet == "Running"
+
+
+def parse_target(text: str) -> tuple[str, int] | None:
+    """'https://mirror.example/$repo/os/$arch', 'host' or 'host:port' -> (host, port)."""
+    text = text.strip()
+    if not text:
+        return None
+    parts = urlsplit(text if "://" in text else f"//{text}")
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    if not parts.hostname or parts.scheme == "file":
+        return None
+    return parts.hostname, port or _DEFAULT_PORTS.get(parts.scheme, 443)
+
+
+def probe_targets(override: str = "") -> list[tuple[str, int]]:
+    """The configured probe host, or the first few distinct pacman mirror hosts."""
+    if override.strip():
+        target = parse_target(override)
+        return [target] if target else []
+    targets: list[tuple[str, int]] = []
+    for url in mirror_urls():
+        target = parse_target(url)
+        if target and target not in targets:
+            targets.append(target)
+            if len(targets) == MAX_TARGETS:
+                break
+    return targets
+
+
+def _connect(host: str, port: int, timeout: float) -> str | None:
+    """None if the host answered, else why it could not be reached."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return None
+    except ConnectionRefusedError:
+        # A refusal still came back over the network
+        return None
+    except socket.gaierror:
+        return f"cannot resolve {host}"
+    except TimeoutError:
+        return f"{host} did not answer"
+    except OSError as e:
+        return f"{host}: {e.strerror or e}"
+
+
+def tailscale_state(timeout: float) -> str | None:
+    """Tailscale's BackendState ('Running', 'Stopped', 'NeedsLogin', ...).
+
+    None if tailscale is not installed or did not answer in time.
+    """
+    try:
+        result = subprocess.run(
+            ["tailscale", "status", "--json", "--peers=false"],
+            capture_output=True, text=True, timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    try:
+        state = json.loads(result.stdout).get("BackendState")
+    except (ValueError, AttributeError):
+        # 'tailscale status' without a reachable tailscaled prints an error instead
+        return "NotRunning" if result.returncode != 0 else None
+    return state or None
+
+
+def probe(targets: list[tuple[str, int]], tailscale: bool = False,
+          timeout: float = PROBE_TIMEOUT) -> ProbeResult:
+    """Check that the network is usable before the long-running checks start.
+
+    Mirrors are connected to in parallel, and the first one to answer ends
+    the wait. Name resolution has no timeout of its own, so each attempt
+    runs on a daemon thread that is abandoned at the deadline.
+    """
+    start = time.monotonic()
+    answers: queue.Queue = queue.Queue()
+
+    def run(kind: str, func, *args):
+        answers.put((kind, func(*args)))
+
+    jobs = [("mirror", _connect, host, port, timeout) for host, port in targets]
+    if tailscale:
+        jobs.append(("tailscale", tailscale_state, timeout))
+    for kind, func, *args in jobs:
+        threading.Thread(target=run, args=(kind, func, *args), daemon=True).start()
+
+    deadline = start + timeout + 0.1
+    reachable = False
+    errors: list[str] = []
+    state: str | None = None
+    pending = len(jobs)
+    tailscale_pending = tailscale
+    while pending and (tailscale_pending or not reachable):
+        try:
+            kind, value = answers.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        pending -= 1
+        if kind == "tailscale":
+            state, tailscale_pending = value, False
+        elif value is None:
+            reachable = True
+        else:
+            errors.append(value)
+
+    seconds = time.monotonic() - start
+    if targets and not reachable:
+        detail = errors[0] if errors else f"{targets[0][0]} did not answer"
+        return ProbeResult(False, detail, state, seconds)
+    if not targets and tailscale and state not in (None, "Running"):
+        return ProbeResult(False, f"Tailscale is {state}", state, seconds)
+    return ProbeResult(True, "", state, seconds)
+
+
+class ConnectivityProbe(QThread):
+    """Run probe() off the GUI thread. An unexpected failure counts as online."""
+
+    probed = pyqtSignal(object)  # ProbeResult
+
+    def __init__(self, target: str = "", mirrors: bool = True, tailscale: bool = False,
+                 timeout: float = PROBE_TIMEOUT):
+        super().__init__()
+        self.target = target
+        self.mirrors = mirrors  # fall back to pacman's mirrors when no target is set
+        self.tailscale = tailscale
+        self.timeout = timeout
+
+    def run(self):
+        try:
+            targets = probe_targets(self.target) if self.target or self.mirrors else []
+            result = probe(targets, self.tailscale, self.timeout)
+        except Exception:
+            result = ProbeResult(True)
+        self.probed.emit(result)
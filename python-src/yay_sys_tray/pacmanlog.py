@@ -0,0 +1,206 @@
+import re
+import subprocess
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from yay_sys_tray.checker import (
+    RESTART_PACKAGES,
+    RebootInfo,
+    UpdateInfo,
+    check_reboot_needed,
+    source_error,
+)
+from yay_sys_tray.tailscale import SSH_OPTS, HostResult
+
+PACMAN_LOG = Path("/var/log/pacman.log")
+
+# How much of a remote log to fetch when looking for the last upgrade
+REMOTE_TAIL_BYTES = 1024 * 1024
+
+# [2024-05-01T10:00:00+0200] [ALPM] upgraded openssl (3.3.0-1 -> 3.3.1-1)
+_CHANGE_LINE = re.compile(
+    r"\[ALPM\] (installed|upgraded|downgraded|reinstalled|removed) (\S+) \((.*)\)\s*$"
+)
+# [2024-05-01T10:00:00+0200] [PACMAN] Running 'pacman -S -y -u --config /etc/pacman.conf --'
+_RUNNING_LINE = re.compile(r"\[PACMAN\] Running '([^']*)'")
+
+
+@dataclass
+class PackageChange:
+    action: str  # installed, upgraded, downgraded, reinstalled or removed
+    package: str
+    version: str  # version now installed; the removed version for 'removed'
+
+
+@dataclass
+class ReconcileResult:
+    hostname: str
+    changes: list[PackageChange] = field(default_factory=list)
+    reboot_info: RebootInfo | None = None
+    error: str | None = None
+    log_offset: int = 0  # local log offset the next read starts from
+    # Source name -> fresh updates / error, for the sources re-checked after
+    # an upgrade that chained their update commands
+    source_updates: dict[str, list[UpdateInfo]] = field(default_factory=dict)
+    source_errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def rechecked(self) -> set[str]:
+        return set(self.source_updates) | set(self.source_errors)
+
+
+def parse_changes(lines) -> list[PackageChange]:
+    """Extract package transactions from pacman.log lines."""
+    changes = []
+    for line in lines:
+        m = _CHANGE_LINE.search(line)
+        if m is None:
+            continue
+        action, package, versions = m.groups()
+        version = versions.rsplit(" -> ", 1)[-1].strip()
+        changes.append(PackageChange(action, package, version))
+    return changes
+
+
+def log_size(path: Path = PACMAN_LOG) -> int:
+    """Current size of the log, used as the offset to read new entries from."""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def read_changes(path: Path, offset: int) -> tuple[list[PackageChange], int]:
+    """Parse complete lines appended since offset. Returns the changes and the new offset.
+
+    A log smaller than offset has been rotated and is read from the start.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        if f.tell() < offset:
+            offset = 0
+        f.seek(offset)
+        data = f.read()
+    # Leave a partially written last line for the next read
+    end = data.rfind(b"\n") + 1
+    lines = data[:end].decode("utf-8", errors="replace").splitlines()
+    return parse_changes(lines), offset + end
+
+
+def is_sysupgrade(line: str) -> bool:
+    """True for a log line recording a 'pacman -Syu' in any spelling.
+
+    Matches -Syu, -Syyu, -Suy, '-S -y -u' and '--sync --sysupgrade' alike.
+    """
+    m = _RUNNING_LINE.search(line)
+    if not m:
+        return False
+    sync = upgrade = False
+    for arg in m.group(1).split()[1:]:
+        if arg == "--":
+            break
+        if arg == "--sync":
+            sync = True
+        elif arg == "--sysupgrade":
+            upgrade = True
+        elif arg.startswith("-") and not arg.startswith("--"):
+            sync = sync or "S" in arg
+            upgrade = upgrade or "u" in arg
+    return sync and upgrade
+
+
+def changes_since_last_upgrade(log_text: str) -> list[PackageChange]:
+    """Changes made by the most recent 'pacman -Syu' recorded in the log text."""
+    lines = log_text.splitlines()
+    start = 0
+    for i in range(len(lines) - 1, -1, -1):
+        if is_sysupgrade(lines[i]):
+            start = i
+            break
+    return parse_changes(lines[start:])
+
+
+def apply_changes(updates: list[UpdateInfo], changes: list[PackageChange]) -> list[UpdateInfo]:
+    """Drop updates that the changes have installed or made moot.
+
+    An update is done when its package was removed or now sits at the pending
+    version. A package moved to some other version stays pending with the new
+    installed version as its old version.
+    """
+    latest: dict[str, PackageChange] = {}
+    for change in changes:
+        latest[change.package] = change
+    remaining = []
+    for u in updates:
+        change = latest.get(u.package)
+        if change is None:
+            remaining.append(u)
+        elif change.action == "removed" or change.version == u.new_version:
+            continue
+        else:
+            remaining.append(replace(u, old_version=change.version))
+    return remaining
+
+
+def reconcile_host(host: HostResult, changes: list[PackageChange]) -> HostResult:
+    updates = apply_changes(host.updates, changes)
+    restart_pkgs = [u.package for u in updates if u.package in RESTART_PACKAGES]
+    return replace(
+        host,
+        updates=updates,
+        needs_restart=len(restart_pkgs) > 0,
+        restart_packages=restart_pkgs,
+    )
+
+
+class Reconciler(QThread):
+    """Find out what an upgrade just changed, without a full update check.
+
+    For the local system this reads pacman.log from the offset reached by the
+    previous read and re-checks the running kernel, plus any sources (e.g.
+    Flatpak, firmware) whose updates pacman.log knows nothing about. For a
+    remote host it reads the tail of the host's log over SSH and takes the
+    entries from the last 'pacman -Syu' onwards.
+    """
+
+    reconciled = pyqtSignal(object)  # ReconcileResult
+
+    def __init__(self, hostname: str, log_offset: int = 0, timeout: int = 10, sources=()):
+        super().__init__()
+        self.hostname = hostname
+        self.log_offset = log_offset
+        self.timeout = timeout
+        self.sources = list(sources)  # sources.UpdateSource instances to re-check
+
+    def run(self):
+        result = ReconcileResult(hostname=self.hostname)
+        try:
+            if self.hostname:
+                result.changes = self._remote_changes()
+            else:
+                result.changes, result.log_offset = read_changes(PACMAN_LOG, self.log_offset)
+                result.reboot_info = check_reboot_needed()
+                for source in self.sources:
+                    try:
+                        result.source_updates[source.name] = source.check()
+                    except Exception as e:
+                        result.source_errors[source.name] = source_error(source, e)
+        except subprocess.TimeoutExpired:
+            result.error = "timed out"
+        except Exception as e:
+            result.error = str(e)
+        self.reconciled.emit(result)
+
+    def _remote_changes(self) -> list[PackageChange]:
+        proc = subprocess.run(
+            [
+                "ssh", "-o", f"ConnectTimeout={self.timeout}", *SSH_OPTS,
+                self.hostname, f"tail -c {REMOTE_TAIL_BYTES} {PACMAN_LOG}",
+            ],
+            capture_output=True, text=True, timeout=self.timeout + 30,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip() or f"ssh exit code {proc.returncode}")
+        return changes_since_last_upgrade(proc.stdout)
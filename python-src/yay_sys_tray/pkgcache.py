@@ -0,0 +1,308 @@
+import json
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from functools import cmp_to_key
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from yay_sys_tray.advisories import vercmp
+from yay_sys_tray.config import CACHE_DIR
+from yay_sys_tray.syncdb import installed_versions, pacman_cache_dirs
+
+INDEX_FILE = CACHE_DIR / "pkgcache.json"
+
+# filename -> (inode, size, mtime)
+_Files = dict[str, tuple[int, int, float]]
+
+
+def split_package_file(filename: str) -> tuple[str, str, str] | None:
+    """'glibc-2.39-1-x86_64.pkg.tar.zst' -> ('glibc', '2.39-1', 'x86_64')."""
+    stem, sep, _ = filename.partition(".pkg.tar")
+    parts = stem.rsplit("-", 3)
+    if not sep or len(parts) != 4:
+        return None
+    name, version, release, arch = parts
+    return name, f"{version}-{release}", arch
+
+
+@dataclass
+class CacheReport:
+    files: int = 0
+    total_size: int = 0
+    # Versions beyond the newest N of a package that is still installed
+    reclaimable: list[str] = field(default_factory=list)
+    reclaimable_size: int = 0
+    # Every version of a package that is no longer installed
+    orphaned: list[str] = field(default_factory=list)
+    orphaned_size: int = 0
+
+    @property
+    def clean_paths(self) -> list[str]:
+        return self.reclaimable + self.orphaned
+
+    @property
+    def clean_size(self) -> int:
+        return self.reclaimable_size + self.orphaned_size
+
+
+class PackageCacheIndex:
+    """Persistent index of the files in pacman's package cache directories.
+
+    A directory whose mtime is unchanged is not read at all. Otherwise it is
+    listed, and only files that are new or whose inode changed are stat()ed:
+    names, types and inode numbers all come from readdir, so a cache of tens
+    of thousands of packages costs one directory listing per change. The
+    index is saved between runs, so this holds from the first scan after a
+    restart.
+    """
+
+    def __init__(self, path: Path = INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirs: dict[str, tuple[float, _Files]] | None = None  # dir -> (mtime, files)
+        self._dirty = False
+        self.last_stats = 0  # files stat()ed by the last scan
+        # (name, arch) -> (versions, newest first); most packages' versions
+        # do not change between reports, so their order is not recomputed
+        self._order: dict[tuple[str, str], tuple[frozenset[str], list[str]]] = {}
+        self._generation = 0  # bumped on every change to the index
+        self._last_report: tuple[int, int, dict[str, str], CacheReport] | None = None
+
+    def _ensure_loaded(self):
+        if self._dirs is not None:
+            return
+        self._dirs = {}
+        try:
+            data = json.loads(self.path.read_text())
+            for d, entry in data.get("dirs", {}).items():
+                # The index is user-writable and its names end up in a privileged
+                # 'rm', so anything that is not a plain package file name is dropped
+                files = {
+                    name: tuple(info) for name, info in entry["files"].items()
+                    if os.sep not in name and split_package_file(name) is not None
+                }
+                self._dirs[d] = (entry["mtime"], files)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._dirs = {}
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._dirs is None:
+                return
+            data = {
+                "dirs": {
+                    d: {"mtime": mtime, "files": files}
+                    for d, (mtime, files) in self._dirs.items()
+                }
+            }
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, separators=(",", ":")))
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+    def scan(self, dirs: list[str]) -> None:
+        """Bring the index up to date with dirs."""
+        with self._lock:
+            self._ensure_loaded()
+            known = dict(self._dirs)
+        stats = 0
+        changed = False
+        for d in dirs:
+            try:
+                mtime = os.stat(d).st_mtime
+            except OSError:
+                continue
+            if d in known and known[d][0] == mtime:
+                continue
+            old = known[d][1] if d in known else {}
+            files: _Files = {}
+            try:
+                with os.scandir(d) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        # In-progress downloads grow in place and are renamed when done
+                        if ".pkg.tar" not in name or name.endswith(".part"):
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        previous = old.get(name)
+                        if previous is not None and previous[0] == entry.inode():
+                            files[name] = previous
+                            continue
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        stats += 1
+                        files[name] = (st.st_ino, st.st_size, st.st_mtime)
+            except OSError:
+                continue
+            known[d] = (mtime, files)
+            changed = True
+        # Directories no longer configured drop out of the index
+        for d in set(known) - set(dirs):
+            del known[d]
+            changed = True
+        with self._lock:
+            if changed:
+                self._dirs = known
+                self._dirty = True
+                self._generation += 1
+            self.last_stats = stats
+
+    def forget(self, paths: list[str]) -> int:
+        """Drop paths that no longer exist from the index. Returns their total size."""
+        freed = 0
+        with self._lock:
+            self._ensure_loaded()
+            for path in paths:
+                if os.path.lexists(path):
+                    continue
+                d, name = os.path.split(path)
+                entry = self._dirs.get(d)
+                if entry is not None and name in entry[1]:
+                    freed += entry[1].pop(name)[1]
+                    self._dirty = True
+                    self._generation += 1
+        return freed
+
+    def report(self, keep: int, installed: dict[str, str]) -> CacheReport:
+        """Sizes, plus what a clean would remove under a keep-N-versions policy.
+
+        The installed version is always kept, even if it is not among the
+        newest N (e.g. after a downgrade). Signatures go with their package.
+        If neither the index nor the installed packages changed, the previous
+        report is returned as is.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            last = self._last_report
+            if last is not None and last[:3] == (self._generation, keep, installed):
+                return last[3]
+            generation = self._generation
+            dirs = {d: dict(files) for d, (_, files) in self._dirs.items()}
+        report = CacheReport()
+        groups: dict[tuple[str, str], dict[str, list[str]]] = {}
+        for d, files in dirs.items():
+            for filename, (_, size, _) in files.items():
+                report.files += 1
+                report.total_size += size
+                if filename.endswith(".sig"):
+                    continue
+                parsed = split_package_file(filename)
+                if parsed is None:
+                    continue
+                name, version, arch = parsed
+                path = os.path.join(d, filename)
+                groups.setdefault((name, arch), {}).setdefault(version, []).append(path)
+
+        def remove(paths: list[str], into: list[str]) -> int:
+            size = 0
+            for path in paths:
+                d, filename = os.path.split(path)
+                files = dirs[d]
+                into.append(path)
+                size += files[filename][1]
+                if filename + ".sig" in files:
+                    into.append(path + ".sig")
+                    size += files[filename + ".sig"][1]
+            return size
+
+        newest_first = cmp_to_key(lambda a, b: vercmp(b, a))
+        order: dict[tuple[str, str], tuple[frozenset[str], list[str]]] = {}
+        for key, versions in groups.items():
+            current = installed.get(key[0])
+            if current is None:
+                for paths in versions.values():
+                    report.orphaned_size += remove(paths, report.orphaned)
+                continue
+            if len(versions) <= keep:
+                continue
+            cached = self._order.get(key)
+            if cached is None or cached[0] != versions.keys():
+                cached = (frozenset(versions), sorted(versions, key=newest_first))
+            order[key] = cached
+            for version in cached[1][keep:]:
+                if version != current:
+                    report.reclaimable_size += remove(versions[version], report.reclaimable)
+        self._order = order
+        self._last_report = (generation, keep, dict(installed), report)
+        return report
+
+
+class CacheScanner(QThread):
+    """Update the package cache index and report on it."""
+
+    scanned = pyqtSignal(object)  # CacheReport
+
+    def __init__(self, index: PackageCacheIndex, keep: int = 3, dirs: list[str] | None = None):
+        super().__init__()
+        self.index = index
+        self.keep = keep
+        self.dirs = dirs
+
+    def run(self):
+        try:
+            self.index.scan(self.dirs or pacman_cache_dirs())
+            self.index.save()
+            report = self.index.report(self.keep, installed_versions())
+        except Exception:
+            return
+        self.scanned.emit(report)
+
+
+class CacheCleaner(QThread):
+    """Remove package files picked from the index, with one privileged 'rm'.
+
+    Only paths directly inside one of the cache directories are passed on.
+    The index is updated from the removed paths rather than by rescanning.
+    """
+
+    cleaned = pyqtSignal(int, str)  # bytes freed, error ("" on success)
+
+    def __init__(self, index: PackageCacheIndex, paths: list[str], dirs: list[str] | None = None):
+        super().__init__()
+        self.index = index
+        self.paths = paths
+        self.dirs = dirs
+
+    def _allowed(self) -> list[str]:
+        allowed = {os.path.realpath(d) for d in self.dirs or pacman_cache_dirs()}
+        return [
+            p for p in self.paths
+            if os.path.realpath(os.path.dirname(p)) in allowed
+            and split_package_file(os.path.basename(p)) is not None
+        ]
+
+    def run(self):
+        error = ""
+        paths = self._allowed()
+        if len(paths) != len(self.paths):
+            error = f"Skipped {len(self.paths) - len(paths)} path(s) outside the package cache"
+        if not paths:
+            self.cleaned.emit(0, error or "Nothing to remove")
+            return
+        try:
+            result = subprocess.run(
+                ["pkexec", "xargs", "-0", "rm", "-f", "--"],
+                input="".join(f"{p}\0" for p in paths),
+                capture_output=True, text=True, timeout=300,
+            )
+            if result.returncode != 0:
+                error = result.stderr.strip() or f"rm exited with {result.returncode}"
+        except FileNotFoundError as e:
+            error = f"Command not found: {e.filename}"
+        except subprocess.TimeoutExpired:
+            error = "Cleaning the package cache timed out"
+        except Exception as e:
+            error = str(e)
+        freed = self.index.forget(paths)
+        self.index.save()
+        self.cleaned.emit(freed, error)
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+POWER_SUPPLY = Path("/sys/class/power_supply")
+# sysfs has no change notification; reading a few small files a minute costs nothing
+POLL_SECONDS = 60
+
+
+@dataclass(slots=True, frozen=True)
+class PowerState:
+    on_battery: bool = False
+    battery_percent: int | None = None  # system batteries only, not e.g. a mouse
+    metered: bool = False
+
+    @property
+    def constrained(self) -> bool:
+        return self.on_battery or self.metered
+
+    def describe(self) -> str:
+        """'on battery (23%), metered connection'; '' when unconstrained."""
+        parts = []
+        if self.on_battery:
+            level = f" ({self.battery_percent}%)" if self.battery_percent is not None else ""
+            parts.append(f"on battery{level}")
+        if self.metered:
+            parts.append("metered connection")
+        return ", ".join(parts)
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return ""
+
+
+class SysfsPower:
+    """AC and battery state from the kernel's power_supply class."""
+
+    def __init__(self, root: Path = POWER_SUPPLY):
+        self.root = root
+
+    def read(self) -> tuple[bool, int | None]:
+        """(running on battery, charge of the system batteries in percent or None)."""
+        try:
+            supplies = sorted(self.root.iterdir())
+        except OSError:
+            return False, None
+        batteries: list[int] = []
+        discharging = False
+        external = False  # a mains, USB or USB-C supply reports its state
+        plugged_in = False
+        for supply in supplies:
+            kind = _read(supply / "type")
+            if kind == "Battery":
+                # Peripherals (mice, headsets) report scope=Device
+                if _read(supply / "scope") == "Device":
+                    continue
+                discharging = discharging or _read(supply / "status") == "Discharging"
+                capacity = _read(supply / "capacity")
+                batteries.append(int(capacity) if capacity.isdigit() else -1)
+                continue
+            online = _read(supply / "online")
+            if online:
+                external = True
+                plugged_in = plugged_in or online == "1"
+        levels = [b for b in batteries if b >= 0]
+        percent = round(sum(levels) / len(levels)) if levels else None
+        if plugged_in or not batteries:
+            return False, percent
+        # AC is unplugged; without an AC entry to ask, the battery's own status decides
+        return external or discharging, percent
+
+
+class NetworkManagerMetered(QObject):
+    """NetworkManager's metered flag for the primary connection, via QNetworkInformation.
+
+    Reads False when NetworkManager is not running or Qt lacks the backend.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._info = None
+        try:
+            from PyQt6.QtNetwork import QNetworkInformation
+
+            if QNetworkInformation.loadBackendByName("networkmanager"):
+                self._info = QNetworkInformation.instance()
+                self._info.isMeteredChanged.connect(lambda _metered: self.changed.emit())
+        except (ImportError, AttributeError):
+            self._info = None
+
+    def read(self) -> bool:
+        return bool(self._info is not None and self._info.isMetered())
+
+
+class PowerMonitor(QObject):
+    """Battery and metered-connection state, with a signal when it changes.
+
+    The power supplies are polled; NetworkManager reports metered changes as
+    they happen. Both sources can be swapped for fakes: power needs read()
+    returning (on_battery, percent), network read() returning bool and
+    optionally a changed signal.
+    """
+
+    changed = pyqtSignal(object)  # PowerState
+
+    def __init__(self, power=None, network=None, poll_seconds: float = POLL_SECONDS, parent=None):
+        super().__init__(parent)
+        self.power = power or SysfsPower()
+        # Created on start(): loading the NetworkManager backend talks to D-Bus
+        self.network = network
+        self.state = PowerState()
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(poll_seconds * 1000))
+        self._timer.timeout.connect(self.refresh)
+        self._watched = None  # the network source whose changed signal is connected
+
+    @property
+    def active(self) -> bool:
+        return self._timer.isActive()
+
+    def start(self) -> None:
+        if self.active:
+            return
+        if self.network is None:
+            self.network = NetworkManagerMetered(self)
+        if self.network is not self._watched and hasattr(self.network, "changed"):
+            self.network.changed.connect(self.refresh)
+            self._watched = self.network
+        self._timer.start()
+        self.refresh()
+
+    def stop(self) -> None:
+        """Stop watching; the state reads as unconstrained until started again."""
+        self._timer.stop()
+        self.state = PowerState()
+
+    def refresh(self) -> PowerState:
+        if not self.active:
+            return self.state
+        try:
+            on_battery, percent = self.power.read()
+            metered = bool(self.network.read())
+        except Exception:
+            on_battery, percent, metered = False, None, False
+        state = PowerState(on_battery, percent, metered)
+        if state != self.state:
+            self.state = state
+            self.changed.emit(state)
+        return state
@@ -0,0 +1,254 @@
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from yay_sys_tray.config import CACHE_DIR
+from yay_sys_tray.syncdb import checkupdates_db, pacman_cache_dirs
+from yay_sys_tray.tailscale import SSH_OPTS
+
+PREFETCH_DIR = CACHE_DIR / "pkg"
+
+
+@dataclass
+class PrefetchResult:
+    downloaded_bytes: int = 0
+    total_bytes: int = 0
+    files: int = 0
+    errors: list[str] = field(default_factory=list)
+    hosts_done: list[str] = field(default_factory=list)
+    host_errors: dict[str, str] = field(default_factory=dict)
+    cancelled: bool = False
+
+
+def cachedir_args() -> list[str]:
+    """Extra pacman/yay arguments so upgrades pick up prefetched packages.
+
+    The system cache dirs come first so pacman keeps downloading into them;
+    the prefetch dir is only read from.
+    """
+    if not PREFETCH_DIR.is_dir() or not any(PREFETCH_DIR.iterdir()):
+        return []
+    args = []
+    for d in pacman_cache_dirs() + [str(PREFETCH_DIR)]:
+        args += ["--cachedir", d]
+    return args
+
+
+def clear_prefetch_dir() -> None:
+    """Remove prefetched packages once an upgrade has consumed them."""
+    try:
+        entries = list(PREFETCH_DIR.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            entry.unlink()
+        except OSError:
+            continue
+
+
+def list_pending_downloads(dbpath: str) -> list[tuple[str, int]]:
+    """Return (url, size) for every package a sysupgrade would download."""
+    result = subprocess.run(
+        [
+            "pacman", "-Sup", "--print-format", "%l %s",
+            "--dbpath", dbpath, "--logfile", "/dev/null",
+        ],
+        capture_output=True, text=True, timeout=30,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "pacman -Sup failed")
+    downloads = []
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and "://" in parts[0]:
+            try:
+                downloads.append((parts[0], int(parts[1])))
+            except ValueError:
+                continue
+    return downloads
+
+
+def remote_prefetch_command(rate_kib: int = 0) -> str:
+    """Shell command that downloads a remote host's pending packages into its cache.
+
+    Unlimited, that is 'checkupdates -d'. With a limit, checkupdates only syncs
+    its temporary database and pacman downloads from it through a copy of the
+    host's pacman.conf whose XferCommand is curl capped at rate_kib.
+    """
+    if rate_kib <= 0:
+        return "nice -n 19 checkupdates -d"
+    xfer = f"XferCommand = /usr/bin/curl -L -f -C - --retry 2 --limit-rate {rate_kib}k -o %o %u"
+    return (
+        """conf=$(mktemp) && trap 'rm -f "$conf"' EXIT"""
+        f""" && sed -e '/^XferCommand/d' -e '/^\\[options\\]/a {xfer}' /etc/pacman.conf > "$conf" """
+        # checkupdates: exit 0 = updates, exit 2 = no updates, exit 1 = error
+        """&& { nice -n 19 checkupdates > /dev/null; [ $? -ne 1 ]; }"""
+        """ && db="${CHECKUPDATES_DB:-${TMPDIR:-/tmp}/checkup-db-$(id -u)}" """
+        """&& nice -n 19 sudo -n pacman -Suw --noconfirm --config "$conf" --dbpath "$db" """
+        """--logfile /dev/null"""
+    )
+
+
+class Prefetcher(QThread):
+    """Download pending packages ahead of "Update Now".
+
+    Local repo packages are fetched with curl at idle priority into
+    ~/.cache/yay-sys-tray/pkg, using the database checkupdates just synced.
+    Remote hosts run 'checkupdates -d' over SSH, which needs passwordless sudo
+    for pacman on the host; with a rate limit, pacman downloads through curl
+    capped at the same rate on each host (see remote_prefetch_command).
+    """
+
+    progress = pyqtSignal(int, int)  # downloaded bytes, total bytes
+    prefetch_complete = pyqtSignal(object)  # PrefetchResult
+
+    def __init__(
+        self,
+        local: bool = True,
+        hostnames: list[str] | None = None,
+        parallel: int = 2,
+        rate_kib: int = 0,
+        timeout: int = 10,
+    ):
+        super().__init__()
+        self.local = local
+        self.hostnames = hostnames or []
+        self.parallel = max(1, parallel)
+        self.rate_kib = rate_kib
+        self.timeout = timeout
+        self._cancelled = threading.Event()
+        self._procs: set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+        self._result = PrefetchResult()
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            for proc in self._procs:
+                proc.terminate()
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+            if self.local:
+                try:
+                    self._prefetch_local(pool)
+                except FileNotFoundError as e:
+                    self._result.errors.append(f"Command not found: {e.filename}")
+                except Exception as e:
+                    self._result.errors.append(str(e))
+            for future in [pool.submit(self._prefetch_host, h) for h in self.hostnames]:
+                future.result()
+        self._result.cancelled = self._cancelled.is_set()
+        self.prefetch_complete.emit(self._result)
+
+    def _run(self, cmd: list[str], timeout: int) -> subprocess.CompletedProcess:
+        if self._cancelled.is_set():
+            raise InterruptedError("cancelled")
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL, text=True,
+        )
+        with self._lock:
+            self._procs.add(proc)
+        try:
+            out, err = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+        finally:
+            with self._lock:
+                self._procs.discard(proc)
+        return subprocess.CompletedProcess(cmd, proc.returncode, out, err)
+
+    def _prefetch_local(self, pool: ThreadPoolExecutor):
+        dbpath = checkupdates_db()
+        if dbpath is None:
+            self._result.errors.append("checkupdates database not found")
+            return
+        downloads = list_pending_downloads(dbpath)
+        cached = set()
+        for d in pacman_cache_dirs() + [str(PREFETCH_DIR)]:
+            try:
+                cached.update(os.listdir(d))
+            except OSError:
+                continue
+
+        result = self._result
+        result.total_bytes = sum(size for _, size in downloads)
+        pending = []
+        for url, size in downloads:
+            if url.rsplit("/", 1)[-1] in cached:
+                result.downloaded_bytes += size
+            else:
+                pending.append((url, size))
+        self.progress.emit(result.downloaded_bytes, result.total_bytes)
+        if not pending:
+            return
+
+        PREFETCH_DIR.mkdir(parents=True, exist_ok=True)
+        for future in [pool.submit(self._download, url, size) for url, size in pending]:
+            future.result()
+
+    def _download(self, url: str, size: int):
+        filename = url.rsplit("/", 1)[-1]
+        cmd = ["nice", "-n", "19", "curl", "-fsSL", "--retry", "2"]
+        if self.rate_kib > 0:
+            # The limit is for the whole prefetch, so split it across workers
+            cmd += ["--limit-rate", f"{max(1, self.rate_kib // self.parallel)}k"]
+        try:
+            # Signatures are tiny; fetch them alongside in case the DB lacks them
+            for name, src in ((filename, url), (f"{filename}.sig", f"{url}.sig")):
+                target = PREFETCH_DIR / name
+                partial = target.with_name(name + ".part")
+                proc = self._run(cmd + ["-o", str(partial), src], timeout=3600)
+                if proc.returncode != 0:
+                    partial.unlink(missing_ok=True)
+                    if name == filename:
+                        raise RuntimeError(f"{filename}: curl exit code {proc.returncode}")
+                    continue
+                partial.rename(target)
+        except InterruptedError:
+            return
+        except Exception as e:
+            with self._lock:
+                self._result.errors.append(str(e))
+            return
+        with self._lock:
+            self._result.downloaded_bytes += size
+            self._result.files += 1
+            done, total = self._result.downloaded_bytes, self._result.total_bytes
+        self.progress.emit(done, total)
+
+    def _prefetch_host(self, hostname: str):
+        try:
+            proc = self._run(
+                [
+                    "ssh", "-o", f"ConnectTimeout={self.timeout}",
+                    *SSH_OPTS, hostname, remote_prefetch_command(self.rate_kib),
+                ],
+                timeout=3600,
+            )
+            # checkupdates: exit 0 = updates, exit 2 = no updates, exit 1 = error
+            if proc.returncode in (0, 2):
+                error = None
+            else:
+                error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else (
+                    f"exit code {proc.returncode}"
+                )
+        except InterruptedError:
+            return
+        except subprocess.TimeoutExpired:
+            error = "timed out"
+        except Exception as e:
+            error = str(e)
+        with self._lock:
+            if error is None:
+                self._result.hosts_done.append(hostname)
+            else:
+                self._result.host_errors[hostname] = error
@@ -0,0 +1,187 @@
+import json
+import re
+import shutil
+import subprocess
+import sys
+from abc import ABC, abstractmethod
+
+from yay_sys_tray.checker import UpdateInfo, parse_update_output
+
+# flatpak prints sizes the way g_format_size() does: decimal units
+_SIZE_UNITS = {"bytes": 1, "byte": 1, "kb": 1000, "mb": 1000**2, "gb": 1000**3, "tb": 1000**4}
+_SIZE_RE = re.compile(r"([\d.,]+)\s*([a-zA-Z]+)")
+
+
+class SourceError(Exception):
+    """A source's check failed; the message is what the user sees."""
+
+
+class UpdateSource(ABC):
+    """One place updates come from.
+
+    check() runs on a worker thread alongside the other sources and returns
+    items whose repository is the source's name, unless they are pacman
+    packages (pacman = True), whose repository and sizes are then filled in
+    from the sync databases. A source whose command is not installed is
+    skipped rather than reported as failing.
+    """
+
+    name = ""
+    label = ""
+    command = ""  # must be on PATH for the source to be available
+    timeout = 120  # seconds the check may take
+    pacman = False
+    required = False  # a failure fails the whole check instead of being listed
+
+    def available(self) -> bool:
+        return not self.command or shutil.which(self.command) is not None
+
+    @abstractmethod
+    def check(self) -> list[UpdateInfo]:
+        """Pending updates; raises SourceError when the source cannot be read."""
+
+    def update_command(self, noconfirm: bool = False) -> list[str] | None:
+        """Command that applies this source's updates; None if 'yay -Syu' already does."""
+        return None
+
+    def _run(self, args: list[str]) -> subprocess.CompletedProcess:
+        return subprocess.run(args, capture_output=True, text=True, timeout=self.timeout)
+
+
+class RepoSource(UpdateSource):
+    name = "repo"
+    label = "Repositories"
+    required = True
+    pacman = True
+
+    def check(self) -> list[UpdateInfo]:
+        # checkupdates syncs a temp database copy, so results are always fresh
+        result = self._run(["checkupdates"])
+        # checkupdates: exit 0 = updates, exit 2 = no updates, exit 1 = error
+        if result.returncode == 1:
+            raise SourceError(f"checkupdates error: {result.stderr.strip()}")
+        if result.returncode == 0:
+            return parse_update_output(result.stdout)
+        return []
+
+
+class AurSource(UpdateSource):
+    name = "aur"
+    label = "AUR"
+    command = "yay"
+    pacman = True
+
+    def check(self) -> list[UpdateInfo]:
+        result = self._run(["yay", "-Qua"])
+        # yay -Qua: exit 0 = updates, exit 1 = no updates
+        if result.returncode != 0 or not result.stdout.strip():
+            return []
+        updates = parse_update_output(result.stdout)
+        for u in updates:
+            u.repository = "aur"
+        return updates
+
+
+def parse_flatpak_size(text: str) -> int:
+    """'12.3 MB' -> 12300000; 0 if unreadable."""
+    match = _SIZE_RE.search(text.replace("\xa0", " "))
+    if not match:
+        return 0
+    try:
+        value = float(match.group(1).replace(",", "."))
+    except ValueError:
+        return 0
+    return int(value * _SIZE_UNITS.get(match.group(2).lower(), 0))
+
+
+class FlatpakSource(UpdateSource):
+    name = "flatpak"
+    label = "Flatpak"
+    command = "flatpak"
+    timeout = 60
+
+    def check(self) -> list[UpdateInfo]:
+        installed = self._run(["flatpak", "list", "--columns=application,branch,version,active"])
+        if installed.returncode != 0:
+            raise SourceError(installed.stderr.strip() or "flatpak list failed")
+        current: dict[tuple[str, str], str] = {}
+        for line in installed.stdout.splitlines():
+            fields = line.split("\t")
+            if len(fields) == 4:
+                app, branch, version, commit = fields
+                current[(app, branch)] = version or commit[:12]
+
+        remote = self._run([
+            "flatpak", "remote-ls", "--updates",
+            "--columns=application,branch,version,commit,description,download-size",
+        ])
+        if remote.returncode != 0:
+            raise SourceError(remote.stderr.strip() or "flatpak remote-ls failed")
+        updates = []
+        for line in remote.stdout.splitlines():
+            fields = line.split("\t")
+            if len(fields) != 6:
+                continue
+            app, branch, version, commit, description, size = fields
+            # Runtimes are installed in several branches side by side
+            package = app if branch in ("stable", "master", "") else f"{app}//{branch}"
+            updates.append(UpdateInfo(
+                package=package,
+                old_version=current.get((app, branch), ""),
+                new_version=version or commit[:12],
+                description=description,
+                repository=sys.intern(self.name),
+                download_size=parse_flatpak_size(size),
+            ))
+        return updates
+
+    def update_command(self, noconfirm: bool = False) -> list[str] | None:
+        return ["flatpak", "update"] + (["-y"] if noconfirm else [])
+
+
+class FwupdSource(UpdateSource):
+    name = "fwupd"
+    label = "Firmware (fwupd)"
+    command = "fwupdmgr"
+    timeout = 30
+
+    def check(self) -> list[UpdateInfo]:
+        result = self._run(["fwupdmgr", "get-updates", "--json"])
+        # exit 2: nothing to do (no updatable devices or no updates)
+        if result.returncode == 2:
+            return []
+        if result.returncode != 0:
+            raise SourceError(result.stderr.strip() or f"fwupdmgr exited with {result.returncode}")
+        try:
+            devices = json.loads(result.stdout).get("Devices", [])
+        except (ValueError, AttributeError):
+            raise SourceError("fwupdmgr returned unreadable output") from None
+        updates = []
+        for device in devices:
+            releases = device.get("Releases") or []
+            if not releases or not device.get("Name"):
+                continue
+            release = releases[0]  # newest first
+            updates.append(UpdateInfo(
+                package=device["Name"],
+                old_version=device.get("Version", ""),
+                new_version=release.get("Version", ""),
+                description=release.get("Summary", ""),
+                repository=sys.intern(self.name),
+                download_size=int(release.get("Size") or 0),
+            ))
+        return updates
+
+    def update_command(self, noconfirm: bool = False) -> list[str] | None:
+        return ["fwupdmgr", "update"] + (["-y"] if noconfirm else [])
+
+
+SOURCES: dict[str, type[UpdateSource]] = {
+    source.name: source for source in (RepoSource, AurSource, FlatpakSource, FwupdSource)
+}
+
+
+def create_sources(names: str) -> list[UpdateSource]:
+    """Sources for a 'repo,aur,...' config value, in registry order; unknown names are ignored."""
+    wanted = {n.strip() for n in names.split(",")}
+    return [cls() for name, cls in SOURCES.items() if name in wanted]
@@ -0,0 +1,81 @@
+from dataclasses import dataclass, field
+
+from yay_sys_tray.checker import UpdateInfo
+from yay_sys_tray.index import LOCAL_HOST
+
+StateKey = tuple[str, str, str]  # (host, package, new_version)
+
+
+@dataclass(slots=True)
+class StateDiff:
+    added: set[StateKey] = field(default_factory=set)
+    removed: set[StateKey] = field(default_factory=set)
+    modified: set[StateKey] = field(default_factory=set)  # same key, other old version
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+class UpdateState:
+    """Pending updates of every host, keyed by (host, package, new_version).
+
+    apply() returns what changed since the previous snapshot, so callers can
+    notify about exactly the new entries and skip work when nothing moved.
+    Hosts that are known but missing from a snapshot (unreachable this time)
+    keep their last entries, so they do not count as new once the host is
+    back.
+    """
+
+    def __init__(self):
+        self._entries: dict[StateKey, str] = {}  # key -> old_version
+        self._by_host: dict[str, set[StateKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def apply(self, snapshot: dict[str, list[UpdateInfo]], known_hosts: set[str]) -> StateDiff:
+        diff = StateDiff()
+        for host in [h for h in self._by_host if h not in known_hosts]:
+            keys = self._by_host.pop(host)
+            diff.removed |= keys
+            for key in keys:
+                del self._entries[key]
+
+        for host, updates in snapshot.items():
+            fresh = {(host, u.package, u.new_version): u.old_version for u in updates}
+            current = self._by_host.get(host, set())
+            for key in current - fresh.keys():
+                diff.removed.add(key)
+                del self._entries[key]
+            for key, old in fresh.items():
+                previous = self._entries.get(key)
+                if previous is None:
+                    diff.added.add(key)
+                elif previous != old:
+                    diff.modified.add(key)
+                self._entries[key] = old
+            if fresh:
+                self._by_host[host] = set(fresh)
+            else:
+                self._by_host.pop(host, None)
+        return diff
+
+
+def describe_updates(keys: set[StateKey], limit: int = 3) -> str:
+    """Name the packages behind keys, e.g. 'openssl 3.3.1-1 (local, web1), linux 6.9-1 (db1)'."""
+    hosts_by_update: dict[tuple[str, str], list[str]] = {}
+    for host, package, version in keys:
+        hosts_by_update.setdefault((package, version), []).append(host)
+    ordered = sorted(hosts_by_update.items(), key=lambda item: (-len(item[1]), item[0]))
+    parts = []
+    for (package, version), hosts in ordered[:limit]:
+        if len(hosts) > 3:
+            where = f"{len(hosts)} hosts"
+        else:
+            where = ", ".join("local" if h == LOCAL_HOST else h for h in sorted(hosts))
+        parts.append(f"{package} {version} ({where})")
+    text = ", ".join(parts)
+    if len(ordered) > limit:
+        text += f" and {len(ordered) - limit} more"
+    return text
@@ -0,0 +1,312 @@
+import bz2
+import gzip
+import lzma
+import os
+import subprocess
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from yay_sys_tray.depgraph import desc_sections
+
+PACMAN_DB = Path("/var/lib/pacman")
+PACMAN_CONF = Path("/etc/pacman.conf")
+DEFAULT_CACHE_DIRS = ["/var/cache/pacman/pkg"]
+
+
+@dataclass(slots=True, frozen=True)
+class SyncPackage:
+    name: str
+    version: str
+    repository: str
+    arch: str
+    description: str
+    filename: str
+    csize: int  # compressed (download) size
+    isize: int  # installed size
+
+
+def pacman_cache_dirs() -> list[str]:
+    """Return the CacheDir entries from pacman.conf."""
+    try:
+        result = subprocess.run(
+            ["pacman-conf", "CacheDir"], capture_output=True, text=True, timeout=5,
+        )
+        dirs = [d.rstrip("/") for d in result.stdout.split() if d]
+        if result.returncode == 0 and dirs:
+            return dirs
+    except Exception:
+        pass
+    return list(DEFAULT_CACHE_DIRS)
+
+
+def checkupdates_db() -> str | None:
+    """Locate the temporary sync database refreshed by the last checkupdates run."""
+    if os.environ.get("CHECKUPDATES_DB"):
+        return os.environ["CHECKUPDATES_DB"]
+    tmp = os.environ.get("TMPDIR", "/tmp")
+    for suffix in (str(os.getuid()), os.environ.get("USER", "")):
+        path = Path(tmp) / f"checkup-db-{suffix}"
+        if suffix and (path / "sync").is_dir():
+            return str(path)
+    return None
+
+
+def database_path() -> Path:
+    """The checkupdates database if there is one, since it holds the versions on offer.
+
+    Its 'local' entry links to pacman's local database, so both are found
+    under the same path.
+    """
+    dbpath = checkupdates_db()
+    return Path(dbpath) if dbpath else PACMAN_DB
+
+
+def repo_order(conf: Path = PACMAN_CONF) -> list[str]:
+    """Repository names in pacman.conf order; the first repo with a package wins."""
+    try:
+        text = conf.read_text(errors="replace")
+    except OSError:
+        return []
+    repos = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("[") and line.endswith("]") and line != "[options]":
+            repos.append(line[1:-1])
+    return repos
+
+
+def mirror_urls(conf: Path = PACMAN_CONF) -> list[str]:
+    """Server URLs in the order pacman tries them, following Include lines."""
+    try:
+        lines = conf.read_text(errors="replace").splitlines()
+    except OSError:
+        return []
+    urls: list[str] = []
+    included: set[str] = set()
+    section = ""
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1]
+            continue
+        key, _, value = (part.strip() for part in line.partition("="))
+        if section == "options" or not value:
+            continue
+        if key == "Server":
+            urls.append(value)
+        elif key == "Include" and value not in included:
+            # Every repo usually includes the same mirrorlist; read it once
+            included.add(value)
+            try:
+                for entry in Path(value).read_text(errors="replace").splitlines():
+                    key, _, url = (part.strip() for part in entry.split("#", 1)[0].partition("="))
+                    if key == "Server" and url:
+                        urls.append(url)
+            except OSError:
+                continue
+    return list(dict.fromkeys(urls))
+
+
+def _first_int(values: list[str] | None) -> int:
+    try:
+        return int(values[0]) if values else 0
+    except ValueError:
+        return 0
+
+
+class DatabaseError(Exception):
+    pass
+
+
+def _open_db(path: Path):
+    """Open a repo database as an uncompressed, streaming tar."""
+    with open(path, "rb") as f:
+        magic = f.read(6)
+    if magic[:2] == b"\x1f\x8b":
+        return gzip.open(path, "rb")
+    if magic[:4] == b"\x28\xb5\x2f\xfd":
+        try:
+            from compression import zstd  # Python 3.14+
+        except ImportError:
+            raise DatabaseError("zstd databases need Python 3.14") from None
+        return zstd.open(path, "rb")
+    if magic == b"\xfd7zXZ\x00":
+        return lzma.open(path, "rb")
+    if magic[:3] == b"BZh":
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _pax_path(records: bytes) -> str | None:
+    for record in records.split(b"\n"):
+        _, _, field = record.partition(b" ")
+        if field.startswith(b"path="):
+            return field[5:].decode(errors="replace")
+    return None
+
+
+def _tar_files(stream, wanted: Callable[[str], bool]):
+    """Yield (name, content) for the regular files in a tar stream that wanted() accepts.
+
+    Only the header fields pacman's databases use are decoded, which is
+    several times faster than tarfile, and the archive is streamed rather
+    than decompressed into memory at once.
+    """
+    long_name: str | None = None
+    while True:
+        header = stream.read(512)
+        if len(header) < 512 or header[0] == 0:
+            break  # end-of-archive blocks
+        try:
+            size = int(header[124:136].strip(b"\0 ") or b"0", 8)
+        except ValueError:
+            raise DatabaseError("corrupt tar header") from None
+        kind = header[156:157]
+        padded = (size + 511) // 512 * 512
+        if kind == b"x":
+            long_name = _pax_path(stream.read(padded)[:size]) or long_name
+            continue
+        if kind == b"L":
+            long_name = stream.read(padded)[:size].rstrip(b"\0").decode(errors="replace")
+            continue
+        if kind not in (b"0", b"\0"):
+            long_name = None
+            stream.read(padded)
+            continue
+        if long_name is not None:
+            name, long_name = long_name, None
+        else:
+            name = header[:100].split(b"\0", 1)[0].decode(errors="replace")
+            prefix = header[345:500].split(b"\0", 1)[0]
+            if prefix and header[257:262] == b"ustar":
+                name = f"{prefix.decode(errors='replace')}/{name}"
+        content = stream.read(padded)
+        if wanted(name):
+            yield name, content[:size]
+
+
+def _wanted_desc(names: set[str]) -> Callable[[str], bool]:
+    def wanted(member: str) -> bool:
+        return member.endswith("/desc") and member[:-5].rsplit("-", 2)[0] in names
+    return wanted
+
+
+def read_sync_db(path: Path, repository: str, names: set[str]) -> dict[str, SyncPackage]:
+    """Read the requested packages from one repo database in a single pass.
+
+    A sync database is a compressed tar with a 'name-version-release/desc'
+    entry per package; entries for other packages are skipped undecoded.
+    """
+    found: dict[str, SyncPackage] = {}
+    with _open_db(path) as stream:
+        for _, content in _tar_files(stream, _wanted_desc(names)):
+            sections = desc_sections(content.decode(errors="replace"))
+            name = (sections.get("%NAME%") or [""])[0]
+            if not name:
+                continue
+            found[name] = SyncPackage(
+                name=name,
+                version=(sections.get("%VERSION%") or [""])[0],
+                repository=repository,
+                arch=(sections.get("%ARCH%") or [""])[0],
+                description=(sections.get("%DESC%") or [""])[0],
+                filename=(sections.get("%FILENAME%") or [""])[0],
+                csize=_first_int(sections.get("%CSIZE%")),
+                isize=_first_int(sections.get("%ISIZE%")),
+            )
+    return found
+
+
+def installed_sizes(names: set[str], dbpath: Path | None = None) -> dict[str, int]:
+    """Installed size of each requested package, from the local database."""
+    local = (dbpath or database_path()) / "local"
+    sizes: dict[str, int] = {}
+    try:
+        entries = [e.name for e in os.scandir(local) if e.is_dir()]
+    except OSError:
+        return sizes
+    for entry in entries:
+        if entry.rsplit("-", 2)[0] not in names:
+            continue
+        try:
+            sections = desc_sections((local / entry / "desc").read_text(errors="replace"))
+        except OSError:
+            continue
+        name = (sections.get("%NAME%") or [""])[0]
+        if name:
+            sizes[name] = _first_int(sections.get("%SIZE%"))
+    return sizes
+
+
+def installed_versions(dbpath: Path | None = None) -> dict[str, str]:
+    """Name -> version of every installed package, from the local database's entry names."""
+    versions: dict[str, str] = {}
+    try:
+        entries = [e.name for e in os.scandir((dbpath or PACMAN_DB) / "local") if e.is_dir()]
+    except OSError:
+        return versions
+    for entry in entries:
+        parts = entry.rsplit("-", 2)
+        if len(parts) == 3:
+            versions[parts[0]] = f"{parts[1]}-{parts[2]}"
+    return versions
+
+
+class SyncDatabase:
+    """Package metadata and sizes read straight from pacman's sync databases.
+
+    A lookup reads each repo database once, keeping only the packages asked
+    for. Results are kept per database file until it changes, so the remote
+    check that follows a local one only reads the databases again if it asks
+    for packages the first pass did not look for.
+    """
+
+    def __init__(self, dbpath: Path | None = None):
+        self.dbpath = dbpath  # None: database_path() at lookup time
+        self._lock = threading.Lock()
+        # db file -> ((mtime, size), names looked for, packages found)
+        self._cache: dict[Path, tuple[tuple[float, int], set[str], dict[str, SyncPackage]]] = {}
+
+    def lookup(self, names: set[str]) -> dict[str, SyncPackage] | None:
+        """Find names across all repos, or None if no database could be read."""
+        sync_dir = (self.dbpath or database_path()) / "sync"
+        try:
+            files = {p.stem: p for p in sync_dir.glob("*.db")}
+        except OSError:
+            return None
+        order = [r for r in repo_order() if r in files]
+        order += sorted(set(files) - set(order))
+        found: dict[str, SyncPackage] = {}
+        readable = False
+        for repo in order:
+            packages = self._read(files[repo], repo, names)
+            if packages is None:
+                continue
+            readable = True
+            for name, package in packages.items():
+                found.setdefault(name, package)
+        return found if readable else None
+
+    def _read(self, path: Path, repository: str, names: set[str]) -> dict[str, SyncPackage] | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime, st.st_size)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            if names <= cached[1]:
+                return cached[2]
+            names = names | cached[1]
+        try:
+            packages = read_sync_db(path, repository, names)
+        except Exception:
+            # Unreadable, or e.g. a zstd database on a Python without zstd support
+            return None
+        with self._lock:
+            self._cache[path] = (stamp, names, packages)
+        return packages
+
@@ -1,11 +1,17 @@
 import json
+import math
+import os
+import select
 import subprocess
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 
 from PyQt6.QtCore import QThread, pyqtSignal
 
 from yay_sys_tray.checker import RESTART_PACKAGES, UpdateInfo, parse_update_output
+from yay_sys_tray.config import CACHE_DIR
 
 SSH_OPTS = [
     "-o", "ServerAliveInterval=5",
@@ -14,23 +20,51 @@ SSH_OPTS = [
     "-o", "StrictHostKeyChecking=no",
 ]
 
+LATENCY_FILE = CACHE_DIR / "host-latency.json"
+# Hosts not checked for this long are dropped from the latency history
+LATENCY_RETENTION = 30 * 86400
+# Learned command limits never go below this: checkupdates' database sync varies
+COMMAND_TIMEOUT_MIN = 15
+# The remote command prints an empty line first, which marks the end of connecting
+REMOTE_COMMAND = "echo; checkupdates"
 
-@dataclass
+
+@dataclass(slots=True)
 class HostResult:
     hostname: str
     updates: list[UpdateInfo] = field(default_factory=list)
     needs_restart: bool = False
     restart_packages: list[str] = field(default_factory=list)
     error: str | None = None
+    # Seconds to log in, and to run checkupdates; None if that stage did not finish
+    connect_seconds: float | None = None
+    command_seconds: float | None = None
+    # Gave up waiting: to log in if connect_seconds is None, else for checkupdates
+    timed_out: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class RemoteCheckResult:
     hosts: list[HostResult]
 
 
+def tags_from_status(data: dict) -> list[str]:
+    """Get all unique tag names (without 'tag:' prefix) from 'tailscale status --json'."""
+    tags: set[str] = set()
+    for peer in data.get("Peer", {}).values():
+        for tag in peer.get("Tags") or []:
+            if tag.startswith("tag:"):
+                tags.add(tag[4:])
+            else:
+                tags.add(tag)
+    return sorted(tags)
+
+
 def discover_all_tags() -> list[str]:
-    """Get all unique tag names (without 'tag:' prefix) from Tailscale peers."""
+    """Get all unique tag names (without 'tag:' prefix) from Tailscale peers.
+
+    Raises RuntimeError with a message for the user when tailscale fails.
+    """
     try:
         result = subprocess.run(
             ["tailscale", "status", "--json"],
@@ -38,20 +72,39 @@ def discover_all_tags() -> list[str]:
             text=True,
             timeout=15,
         )
-        if result.returncode != 0:
-            return []
-        data = json.loads(result.stdout)
-        peers = data.get("Peer", {})
-        tags: set[str] = set()
-        for peer in peers.values():
-            for tag in peer.get("Tags") or []:
-                if tag.startswith("tag:"):
-                    tags.add(tag[4:])
-                else:
-                    tags.add(tag)
-        return sorted(tags)
-    except Exception:
-        return []
+    except FileNotFoundError:
+        raise RuntimeError("tailscale not found") from None
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("tailscale status timed out") from None
+    if result.returncode != 0:
+        msg = result.stderr.strip().splitlines()
+        raise RuntimeError(msg[-1] if msg else f"tailscale exit code {result.returncode}")
+    return tags_from_status(json.loads(result.stdout))
+
+
+# Tags seen by the last successful discovery, so Settings can show them at once
+_tag_cache: list[str] | None = None
+
+
+def cached_tags() -> list[str] | None:
+    return _tag_cache
+
+
+class TagDiscoverer(QThread):
+    """Run 'tailscale status --json' in the background and collect peer tags."""
+
+    tags_found = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def run(self):
+        global _tag_cache
+        try:
+            tags = discover_all_tags()
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        _tag_cache = tags
+        self.tags_found.emit(tags)
 
 
 def discover_peers(tags: list[str]) -> list[str]:
@@ -81,65 +134,265 @@ def discover_peers(tags: list[str]) -> list[str]:
     return sorted(hostnames)
 
 
-def check_host(hostname: str, timeout: int) -> HostResult:
-    """SSH into a host and run checkupdates to check for updates."""
+def check_host(hostname: str, timeout: float, command_timeout: float | None = None) -> HostResult:
+    """SSH into a host and run checkupdates to check for updates.
+
+    timeout bounds logging in; command_timeout (default timeout + 30)
+    bounds checkupdates once logged in.
+    """
+    if command_timeout is None:
+        command_timeout = timeout + 30
+    ssh_opts = [
+        "-o", f"ConnectTimeout={math.ceil(timeout)}",
+        *SSH_OPTS,
+    ]
+    start = time.monotonic()
     try:
-        ssh_opts = [
-            "-o", f"ConnectTimeout={timeout}",
-            *SSH_OPTS,
-        ]
-        result = subprocess.run(
-            ["ssh", *ssh_opts, hostname, "checkupdates"],
-            capture_output=True,
-            text=True,
-            timeout=timeout + 30,
+        proc = subprocess.Popen(
+            ["ssh", *ssh_opts, hostname, REMOTE_COMMAND],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
         )
+    except FileNotFoundError:
+        return HostResult(hostname=hostname, error="ssh not found")
+    except Exception as e:
+        return HostResult(hostname=hostname, error=str(e))
+
+    connect = None
+    try:
+        # The marker line arrives once the session is up; EOF means ssh gave up
+        ready, _, _ = select.select([proc.stdout], [], [], timeout)
+        if not ready:
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+        # One raw byte, so nothing is left in a buffer communicate() does not read
+        first = os.read(proc.stdout.fileno(), 1)
+        if first:
+            connect = time.monotonic() - start
+        remaining = command_timeout - (time.monotonic() - start - (connect or 0.0))
+        out, err = proc.communicate(timeout=max(remaining, 0.1))
+        stdout = (first.strip(b"\n") + out).decode(errors="replace")
+        stderr = err.decode(errors="replace")
+        command = time.monotonic() - start - connect if connect is not None else None
         # checkupdates: exit 0 = updates, exit 2 = no updates, exit 1 = error
-        if result.returncode == 0 and result.stdout.strip():
-            updates = parse_update_output(result.stdout)
+        if proc.returncode == 0 and stdout.strip():
+            updates = parse_update_output(stdout)
             restart_pkgs = [u.package for u in updates if u.package in RESTART_PACKAGES]
             return HostResult(
                 hostname=hostname,
                 updates=updates,
                 needs_restart=len(restart_pkgs) > 0,
                 restart_packages=restart_pkgs,
+                connect_seconds=connect,
+                command_seconds=command,
             )
-        return HostResult(hostname=hostname)
+        # ssh itself exits with 255 (unreachable, refused, auth failed)
+        if proc.returncode not in (0, 2):
+            msg = stderr.strip().splitlines()
+            return HostResult(
+                hostname=hostname,
+                error=msg[-1] if msg else f"exit code {proc.returncode}",
+                connect_seconds=connect,
+            )
+        return HostResult(hostname=hostname, connect_seconds=connect, command_seconds=command)
     except subprocess.TimeoutExpired:
-        return HostResult(hostname=hostname, error="Connection timed out")
-    except FileNotFoundError:
-        return HostResult(hostname=hostname, error="ssh not found")
+        proc.kill()
+        proc.communicate()
+        if connect is None:
+            return HostResult(hostname=hostname, error="Connection timed out", timed_out=True)
+        return HostResult(
+            hostname=hostname,
+            error=f"checkupdates timed out after {command_timeout:.0f} seconds",
+            connect_seconds=connect,
+            timed_out=True,
+        )
     except Exception as e:
+        proc.kill()
+        proc.communicate()
         return HostResult(hostname=hostname, error=str(e))
 
 
+@dataclass(slots=True)
+class _Estimate:
+    """Smoothed time and variation, as in TCP's retransmission timer (RFC 6298)."""
+
+    srtt: float
+    rttvar: float
+
+    @classmethod
+    def first(cls, sample: float) -> "_Estimate":
+        return cls(sample, sample / 2)
+
+    def add(self, sample: float) -> None:
+        self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - sample)
+        self.srtt = 0.875 * self.srtt + 0.125 * sample
+
+    @property
+    def limit(self) -> float:
+        return self.srtt + 4 * self.rttvar
+
+
+def _backed_off(estimate: _Estimate | None, limit: float) -> _Estimate:
+    """The estimate after a timeout at limit: its own limit becomes at least twice that."""
+    estimate = estimate or _Estimate.first(limit)
+    estimate.srtt = max(estimate.srtt, limit)
+    estimate.rttvar = max(estimate.rttvar, limit / 4)
+    return estimate
+
+
+@dataclass(slots=True, frozen=True)
+class HostTimeouts:
+    connect: float
+    command: float
+
+
+class HostLatency:
+    """Per-host login and checkupdates times, learned across checks and restarts.
+
+    A host's timeouts are its smoothed time plus four times the variation,
+    so a host on the LAN is given up on within a couple of seconds while a
+    distant one keeps the time it needs. A login or command that times out
+    raises that limit to at least double the one it ran into, so a slow but
+    healthy host is only cut off once. Hosts without history get the
+    configured maximum.
+    """
+
+    def __init__(self, path=LATENCY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # hostname -> (connect, command, last seen)
+        self._hosts: dict[str, tuple[_Estimate | None, _Estimate | None, float]] | None = None
+        self._dirty = False
+
+    def _ensure_loaded(self):
+        if self._hosts is not None:
+            return
+        self._hosts = {}
+        try:
+            data = json.loads(self.path.read_text())
+            for host, entry in data.items():
+                connect, command = (
+                    _Estimate(*entry[key]) if entry.get(key) else None
+                    for key in ("connect", "command")
+                )
+                self._hosts[host] = (connect, command, float(entry["seen"]))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._hosts = {}
+
+    def timeouts(self, hostname: str, connect_min: float, connect_max: float,
+                 command_max: float) -> HostTimeouts:
+        with self._lock:
+            self._ensure_loaded()
+            connect, command, _ = self._hosts.get(hostname, (None, None, 0.0))
+            connect_limit = connect.limit if connect else connect_max
+            command_limit = command.limit if command else connect_max + 30
+        return HostTimeouts(
+            connect=min(max(connect_limit, connect_min), connect_max),
+            command=min(max(command_limit, COMMAND_TIMEOUT_MIN), command_max),
+        )
+
+    def record(self, result: HostResult, limits: HostTimeouts) -> None:
+        """Learn from one check_host() result, run with the given timeouts."""
+        with self._lock:
+            self._ensure_loaded()
+            connect, command, _ = self._hosts.get(result.hostname, (None, None, 0.0))
+            if result.connect_seconds is not None:
+                if connect is None:
+                    connect = _Estimate.first(result.connect_seconds)
+                else:
+                    connect.add(result.connect_seconds)
+            if result.command_seconds is not None and not result.error:
+                if command is None:
+                    command = _Estimate.first(result.command_seconds)
+                else:
+                    command.add(result.command_seconds)
+            elif result.timed_out and result.connect_seconds is not None:
+                # Logged in, then ran out of time: back off like TCP does
+                command = _backed_off(command, limits.command)
+            if result.timed_out and result.connect_seconds is None:
+                connect = _backed_off(connect, limits.connect)
+            self._hosts[result.hostname] = (connect, command, time.time())
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._hosts is None:
+                return
+            cutoff = time.time() - LATENCY_RETENTION
+            data = {
+                host: {
+                    "connect": [round(connect.srtt, 3), round(connect.rttvar, 3)] if connect else None,
+                    "command": [round(command.srtt, 3), round(command.rttvar, 3)] if command else None,
+                    "seen": round(seen),
+                }
+                for host, (connect, command, seen) in self._hosts.items()
+                if seen >= cutoff
+            }
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, separators=(",", ":")))
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+
 class TailscaleChecker(QThread):
     check_complete = pyqtSignal(object)  # RemoteCheckResult
     check_error = pyqtSignal(str)
 
-    def __init__(self, tags: list[str], timeout: int):
+    def __init__(
+        self,
+        tags: list[str],
+        timeout: int,
+        metadata=None,
+        hostnames: list[str] | None = None,
+        latency: HostLatency | None = None,
+        timeout_min: int | None = None,
+        command_timeout: int | None = None,
+    ):
         super().__init__()
         self.tags = tags
+        # Explicit hosts to re-check; skips peer discovery when given
+        self.hostnames = hostnames
         self.timeout = timeout
+        # Shared MetadataCache: one lookup per (package, version) across the fleet
+        self.metadata = metadata
+        # Learned per-host timeouts, between timeout_min and timeout to log in
+        # and up to command_timeout for checkupdates; fixed timeouts without it
+        self.latency = latency
+        self.timeout_min = timeout_min if timeout_min is not None else timeout
+        self.command_timeout = command_timeout if command_timeout is not None else timeout + 30
 
     def run(self):
         try:
-            hostnames = discover_peers(self.tags)
+            hostnames = self.hostnames or discover_peers(self.tags)
             if not hostnames:
                 self.check_complete.emit(RemoteCheckResult(hosts=[]))
                 return
 
             results = []
             max_workers = min(len(hostnames), 8)
+            limits = {
+                h: self.latency.timeouts(h, self.timeout_min, self.timeout, self.command_timeout)
+                if self.latency is not None else HostTimeouts(self.timeout, self.timeout + 30)
+                for h in hostnames
+            }
             with ThreadPoolExecutor(max_workers=max_workers) as pool:
                 futures = {
-                    pool.submit(check_host, h, self.timeout): h
+                    pool.submit(check_host, h, limits[h].connect, limits[h].command): h
                     for h in hostnames
                 }
                 for future in as_completed(futures):
                     results.append(future.result())
+            if self.latency is not None:
+                for r in results:
+                    self.latency.record(r, limits[r.hostname])
+                self.latency.save()
 
             results.sort(key=lambda r: r.hostname)
+            if self.metadata is not None:
+                self.metadata.enrich([u for r in results for u in r.updates])
             self.check_complete.emit(RemoteCheckResult(hosts=results))
         except FileNotFoundError:
             self.check_error.emit("tailscale command not found")
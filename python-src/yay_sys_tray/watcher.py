@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+from yay_sys_tray.depgraph import LOCAL_DB
+from yay_sys_tray.pacmanlog import PACMAN_LOG
+
+DB_LOCK = Path("/var/lib/pacman/db.lck")
+
+
+class PacmanWatcher(QObject):
+    """Notice pacman transactions made outside the tray.
+
+    Watches pacman.log and the local DB directory (inotify under the hood) and
+    reports once a burst of events has settled and pacman has released its
+    lock, so a long transaction produces a single notification.
+    """
+
+    log_appended = pyqtSignal()
+    db_changed = pyqtSignal()
+
+    DEBOUNCE_MS = 1500
+
+    def __init__(
+        self,
+        log_path: Path = PACMAN_LOG,
+        db_path: Path = LOCAL_DB,
+        lock_path: Path = DB_LOCK,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.log_path = log_path
+        self.db_path = db_path
+        self.lock_path = lock_path
+        self._log_dirty = False
+        self._db_dirty = False
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watch()
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self._flush)
+
+    def _watch(self):
+        for path in (str(self.log_path), str(self.db_path)):
+            if path not in self._watcher.files() + self._watcher.directories():
+                if Path(path).exists():
+                    self._watcher.addPath(path)
+
+    def _on_file_changed(self, path: str):
+        # Rotation replaces the log, which drops it from the watch list
+        self._watch()
+        self._log_dirty = True
+        self._debounce.start(self.DEBOUNCE_MS)
+
+    def _on_directory_changed(self, path: str):
+        self._db_dirty = True
+        self._debounce.start(self.DEBOUNCE_MS)
+
+    def _flush(self):
+        if self.lock_path.exists():
+            # Transaction still running; look again once it has settled
+            self._debounce.start(self.DEBOUNCE_MS)
+            return
+        log_dirty, db_dirty = self._log_dirty, self._db_dirty
+        self._log_dirty = self._db_dirty = False
+        if db_dirty:
+            self.db_changed.emit()
+        if log_dirty:
+            self.log_appended.emit()